@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for errlypy's capture path.
+
+Run with ``python -m benchmarks --output results.json`` and compare against a
+saved run with ``python -m benchmarks --compare baseline.json``.
+"""
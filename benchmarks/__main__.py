@@ -0,0 +1,61 @@
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict
+
+from benchmarks import capture, django_queries, gcpause, profiler, runner, wire
+
+SUITES: Dict[str, Callable[[], Dict[str, Callable[[], Any]]]] = {
+    "capture": capture.build_benchmarks,
+    "wire": wire.build_benchmarks,
+    "profiler": profiler.build_benchmarks,
+    "gc": gcpause.build_benchmarks,
+    "django": django_queries.build_benchmarks,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Suites to run")
+    parser.add_argument("-k", dest="keyword", help="Only run benchmarks containing this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds per repeat")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Relative slowdown counted as a regression"
+    )
+    args = parser.parse_args()
+
+    benchmarks = {}
+    for suite in args.suite or sorted(SUITES):
+        for name, operation in SUITES[suite]().items():
+            if args.keyword is None or args.keyword in name:
+                benchmarks[f"{suite}.{name}"] = operation
+
+    results = runner.run(
+        benchmarks,
+        repeat=args.repeat,
+        min_time=args.min_time,
+        progress=lambda name: print(f"running {name}", file=sys.stderr),
+    )
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+
+    if not args.compare:
+        print(runner.format_results(results))
+        return 0
+
+    with open(args.compare) as fp:
+        baseline = json.load(fp)
+
+    rows = runner.compare(results, baseline, threshold=args.threshold)
+    print(runner.format_comparison(rows))
+
+    return 1 if any(row["status"] == "slower" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Benchmarks for the individual stages of a capture."""
+
+import json
+import traceback
+from functools import partial
+from types import TracebackType
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.cases import build_cases
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.client.urllib import URLLibClient
+from errlypy.exception import CollapsedFrames, FrameDetail, ParsedExceptionDto
+from errlypy.exception.budget import CaptureBudget
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.exception.stack import FrameWalk, extract_frame_details
+from errlypy.internal.config import CaptureConfig
+from errlypy.internal.encoder import DataclassJsonEncoder
+from errlypy.models.ingest import IngestRequest
+
+Operation = Callable[[], Any]
+
+
+def _extract_stack(
+    exc_traceback: TracebackType,
+) -> Tuple[List[FrameDetail], List[CollapsedFrames], int]:
+    walk = FrameWalk(CaptureConfig.max_frames).walk(traceback.walk_tb(exc_traceback))
+    return extract_frame_details(walk, CaptureBudget(CaptureConfig.time_budget))
+
+
+def _pipeline(
+    callback: Callable[..., ParsedExceptionDto],
+    http_client: HTTPClient,
+    sink: DryRunClient,
+    exc_info: Tuple[Any, Any, TracebackType],
+) -> None:
+    """Capture, scrub, transform and serialize one event, as dry mode does."""
+    parsed = callback(*exc_info)
+    sink.post(
+        "api/v1/ingest", IngestRequest(events=[http_client._transform_to_ingest_event(parsed)])
+    )
+
+
+def build_benchmarks() -> Dict[str, Operation]:
+    """Returns ``{name: operation}`` for every stage and scenario."""
+    http_client = HTTPClient(
+        # Nothing is submitted, so the client never sends anything
+        client=URLLibClient("http://127.0.0.1", "benchmark"),
+        environment="benchmark",
+    )
+    callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+    sink = DryRunClient(capacity=1)
+    benchmarks: Dict[str, Operation] = {}
+
+    for case, (exc_type, exc_value, exc_traceback) in build_cases().items():
+        parsed = callback(exc_type, exc_value, exc_traceback)
+        request = IngestRequest(events=[http_client._transform_to_ingest_event(parsed)])
+
+        benchmarks[f"callback.{case}"] = partial(callback, exc_type, exc_value, exc_traceback)
+        benchmarks[f"stack_extract.{case}"] = partial(_extract_stack, exc_traceback)
+        benchmarks[f"transform.{case}"] = partial(http_client._transform_to_ingest_event, parsed)
+        benchmarks[f"encode.{case}"] = partial(json.dumps, request, cls=DataclassJsonEncoder)
+        benchmarks[f"pipeline.{case}"] = partial(
+            _pipeline, callback, http_client, sink, (exc_type, exc_value, exc_traceback)
+        )
+
+    return benchmarks
@@ -0,0 +1,74 @@
+"""Exception scenarios the capture benchmarks run against."""
+
+import sys
+from types import TracebackType
+from typing import Callable, Dict, Tuple, Type
+
+ExcInfo = Tuple[Type[BaseException], BaseException, TracebackType]
+
+DEEP_STACK_DEPTH = 500
+
+
+def _exc_info(fn: Callable[[], None]) -> ExcInfo:
+    try:
+        fn()
+    except Exception:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        assert exc_type is not None and exc_value is not None and exc_traceback is not None
+        return exc_type, exc_value, exc_traceback
+
+    raise AssertionError("scenario did not raise")
+
+
+def _recurse(depth: int, leaf: Callable[[], None]) -> None:
+    counter = depth  # noqa: F841
+    if depth <= 0:
+        leaf()
+    else:
+        _recurse(depth - 1, leaf)
+
+
+def _raise_value_error() -> None:
+    raise ValueError("benchmark failure")
+
+
+# A function with 200 real locals; generated because writing it out is noise
+_MANY_LOCALS_SOURCE = (
+    "def raise_with_many_locals():\n"
+    + "".join(f"    local_{index} = {index}\n" for index in range(200))
+    + "    raise ValueError('many locals')\n"
+)
+_many_locals_namespace: Dict[str, Callable[[], None]] = {}
+exec(_MANY_LOCALS_SOURCE, _many_locals_namespace)
+_raise_with_many_locals = _many_locals_namespace["raise_with_many_locals"]
+
+
+def _raise_with_large_locals() -> None:
+    payload = "x" * 100_000  # noqa: F841
+    rows = [{"id": index, "name": f"row {index}"} for index in range(2_000)]  # noqa: F841
+    mapping = {index: str(index) * 10 for index in range(2_000)}  # noqa: F841
+    raise ValueError("large locals")
+
+
+def _raise_chained() -> None:
+    try:
+        try:
+            _recurse(20, _raise_value_error)
+        except ValueError as exc:
+            raise KeyError("lookup failed") from exc
+    except KeyError as exc:
+        raise RuntimeError("request failed") from exc
+
+
+def build_cases() -> Dict[str, ExcInfo]:
+    """Builds every scenario once; the tracebacks keep their frames alive."""
+    return {
+        "shallow": _exc_info(_raise_value_error),
+        "deep": _exc_info(lambda: _recurse(DEEP_STACK_DEPTH, _raise_value_error)),
+        "many_locals": _exc_info(_raise_with_many_locals),
+        "large_locals": _exc_info(_raise_with_large_locals),
+        "deep_large_locals": _exc_info(
+            lambda: _recurse(DEEP_STACK_DEPTH, _raise_with_large_locals)
+        ),
+        "chained": _exc_info(_raise_chained),
+    }
@@ -0,0 +1,53 @@
+"""Cost of recording the SQL of a request, measured on the Django test site."""
+
+from functools import partial
+from typing import Any, Callable, Dict
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.load import apps
+
+Operation = Callable[[], Any]
+
+QUERY_COUNTS = (1, 20, 100)
+
+
+def _request(application: Callable, path: str, query_string: str) -> None:
+    environ: Dict[str, Any] = {
+        "PATH_INFO": path,
+        "QUERY_STRING": query_string,
+        "REQUEST_METHOD": "GET",
+    }
+    setup_testing_defaults(environ)
+    body = application(environ, lambda status, headers, exc_info=None: None)
+    for _ in body:
+        pass
+    body.close()
+
+
+def build_benchmarks() -> Dict[str, Operation]:
+    application = apps.django_application()
+
+    from django.db import connection
+
+    from errlypy.django import queries
+
+    queries.install(connection)
+
+    def plain(query_string: str) -> None:
+        _request(application, apps.DJANGO_QUERIES_PATH, query_string)
+
+    def recorded(query_string: str) -> None:
+        token = queries.start_recording()
+        try:
+            _request(application, apps.DJANGO_QUERIES_PATH, query_string)
+        finally:
+            queries.stop_recording(token)
+
+    benchmarks: Dict[str, Operation] = {
+        "normalize.cached": lambda: queries.normalize("SELECT %s AS author_id"),
+    }
+    for count in QUERY_COUNTS:
+        query_string = f"count={count}"
+        benchmarks[f"request.queries_{count}.plain"] = partial(plain, query_string)
+        benchmarks[f"request.queries_{count}.recorded"] = partial(recorded, query_string)
+    return benchmarks
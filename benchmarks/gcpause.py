@@ -0,0 +1,35 @@
+"""Cost the GC monitor adds to every collection and to every event."""
+
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.gcmonitor import GCMonitor
+from errlypy.models.ingest import IngestEvent
+
+Operation = Callable[[], Any]
+
+
+def build_benchmarks() -> Dict[str, Operation]:
+    monitor = GCMonitor(HTTPClient(client=DryRunClient(), environment="benchmark"))
+    info = {"generation": 0, "collected": 0, "uncollectable": 0}
+
+    def collection() -> None:
+        # What gc.callbacks runs around a collection
+        monitor._callback("start", info)
+        monitor._callback("stop", info)
+
+    # A full history of recent collections to choose from
+    for _ in range(monitor._recent.maxlen or 0):
+        collection()
+
+    now = datetime.now()
+
+    def attach() -> None:
+        monitor.attach(IngestEvent(message="timeout", environment="benchmark", timestamp=now))
+
+    return {
+        "callback.collection": collection,
+        "attach.event": attach,
+    }
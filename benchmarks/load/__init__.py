@@ -0,0 +1,8 @@
+"""
+End-to-end load harness.
+
+Drives the Django test site and a FastAPI app in-process under concurrent
+traffic while errlypy delivers to a local stub ingest server that can inject
+latency, 5xx responses and connection resets. Run ``python -m benchmarks.load
+--help`` for the knobs.
+"""
@@ -0,0 +1,59 @@
+import argparse
+import json
+import sys
+
+from benchmarks.load.harness import FRAMEWORKS, LoadConfig, run_scenario
+from benchmarks.load.stub_server import Faults
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--framework", action="append", choices=FRAMEWORKS)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Share of failing requests")
+    parser.add_argument("--ingest-latency", type=float, default=0.0, help="Seconds per ingest POST")
+    parser.add_argument("--ingest-5xx-rate", type=float, default=0.0, help="Share of 503 answers")
+    parser.add_argument("--ingest-reset-rate", type=float, default=0.0, help="Share of TCP resets")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    config = LoadConfig(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    faults = Faults(
+        latency=args.ingest_latency,
+        error_rate=args.ingest_5xx_rate,
+        reset_rate=args.ingest_reset_rate,
+        seed=args.seed,
+    )
+
+    reports = []
+    for framework in args.framework or FRAMEWORKS:
+        print(f"running {framework}", file=sys.stderr)
+        reports.append(run_scenario(framework, config, faults))
+
+    for report in reports:
+        baseline, instrumented, events = report["baseline"], report["errlypy"], report["events"]
+        print(
+            f"{report['framework']:<8} "
+            f"p50 {baseline['p50_ms']:.2f} -> {instrumented['p50_ms']:.2f} ms  "
+            f"p99 {baseline['p99_ms']:.2f} -> {instrumented['p99_ms']:.2f} ms  "
+            f"cpu share {report['cpu_share']:.1%}  "
+            f"events {events['delivered']}/{events['captured']} delivered, "
+            f"{events['dropped_queue_full']} dropped, {events['lost_in_transport']} lost"
+        )
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(reports, fp, indent=2, sort_keys=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
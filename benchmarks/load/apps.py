@@ -0,0 +1,43 @@
+"""Applications under load: the Django test site and a small FastAPI app."""
+
+import os
+from typing import Any, Callable
+
+OK_PATH = "/ok"
+ERROR_PATH = "/error"
+
+DJANGO_OK_PATH = "/view-ok/"
+DJANGO_ERROR_PATH = "/view-zero-division/"
+# Runs ``count`` queries of the same shape
+DJANGO_QUERIES_PATH = "/view-queries/"
+
+
+def django_application() -> Callable[..., Any]:
+    """Returns the WSGI application of ``tests/django/mysite`` with DEBUG off."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.django.mysite.settings")
+
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    # Debug 500 pages would dominate the measurement
+    settings.DEBUG = False
+
+    return application
+
+
+def fastapi_application() -> Any:
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.get(OK_PATH)
+    async def ok() -> dict:
+        return {"status": "ok"}
+
+    @app.get(ERROR_PATH)
+    async def error() -> dict:
+        payload = {"items": list(range(10))}
+        return {"value": payload["missing"]}
+
+    return app
@@ -0,0 +1,259 @@
+"""Traffic drivers and the scenario runner behind ``python -m benchmarks.load``."""
+
+import asyncio
+import json
+import logging
+import random
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.load import apps
+from benchmarks.load.stub_server import Faults
+
+LOAD_API_KEY = "errly_load_" + "0" * 64
+FRAMEWORKS = ("django", "fastapi")
+
+
+@dataclass
+class LoadConfig:
+    requests: int = 2000
+    concurrency: int = 16
+    error_rate: float = 0.1
+    warmup: int = 50
+    flush_timeout: float = 30.0
+    seed: int = 0
+
+
+class StubServerProcess:
+    """Runs the stub ingest server in a child process so its CPU isn't counted."""
+
+    def __init__(self, faults: Faults) -> None:
+        self._faults = faults
+        self._process: Optional[subprocess.Popen] = None
+        self.url = ""
+
+    def __enter__(self) -> "StubServerProcess":
+        command = [
+            sys.executable,
+            "-m",
+            "benchmarks.load.stub_server",
+            f"--latency={self._faults.latency}",
+            f"--error-rate={self._faults.error_rate}",
+            f"--reset-rate={self._faults.reset_rate}",
+        ]
+        if self._faults.seed is not None:
+            command.append(f"--seed={self._faults.seed}")
+
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        assert self._process.stdout is not None
+        self.url = self._process.stdout.readline().strip()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait(timeout=10)
+
+    def stats(self) -> Dict[str, int]:
+        with urllib.request.urlopen(f"{self.url}/stats") as response:
+            return json.loads(response.read())
+
+    def reset_stats(self) -> None:
+        request = urllib.request.Request(f"{self.url}/stats", method="DELETE")
+        with urllib.request.urlopen(request):
+            pass
+
+
+def build_plan(config: LoadConfig, ok_path: str, error_path: str) -> List[str]:
+    rng = random.Random(config.seed)
+    return [
+        error_path if rng.random() < config.error_rate else ok_path for _ in range(config.requests)
+    ]
+
+
+def drive_wsgi(application: Callable, paths: List[str], concurrency: int) -> List[float]:
+    def call(path: str) -> float:
+        environ: Dict[str, Any] = {"PATH_INFO": path, "REQUEST_METHOD": "GET"}
+        setup_testing_defaults(environ)
+
+        start = time.perf_counter()
+        body = application(environ, lambda status, headers, exc_info=None: None)
+        try:
+            for _ in body:
+                pass
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(call, paths))
+
+
+def drive_asgi(application: Callable, paths: List[str], concurrency: int) -> List[float]:
+    async def call(path: str, semaphore: asyncio.Semaphore) -> float:
+        async with semaphore:
+            done = asyncio.Event()
+            request_sent = False
+
+            async def receive() -> Dict[str, Any]:
+                nonlocal request_sent
+                if not request_sent:
+                    request_sent = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await done.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.body" and not message.get("more_body"):
+                    done.set()
+
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": b"",
+                "root_path": "",
+                "headers": [(b"host", b"loadtest")],
+                "client": ("127.0.0.1", 50000),
+                "server": ("loadtest", 80),
+            }
+
+            start = time.perf_counter()
+            try:
+                await application(scope, receive, send)
+            except Exception:
+                pass  # servers re-raise after the 500 has been sent
+            finally:
+                done.set()
+            return time.perf_counter() - start
+
+    async def main() -> List[float]:
+        semaphore = asyncio.Semaphore(concurrency)
+        return list(await asyncio.gather(*(call(path, semaphore) for path in paths)))
+
+    return asyncio.run(main())
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_phase(drive: Callable[[List[str]], List[float]], paths: List[str]) -> Dict[str, float]:
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    latencies = drive(paths)
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    return {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "cpu_s": cpu,
+        "wall_s": wall,
+    }
+
+
+def _thread_cpu(thread: Optional[Any]) -> float:
+    if thread is None or thread.ident is None or not hasattr(time, "pthread_getcpuclockid"):
+        return 0.0
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+    except OSError:
+        return 0.0
+
+
+def run_scenario(framework: str, config: LoadConfig, faults: Faults) -> Dict[str, Any]:
+    """
+    Runs the same request plan twice, without and with errlypy, and reports
+    latency, delivery and how much extra CPU the instrumented run used.
+    """
+    from errlypy.fastapi.module import FastAPIModule
+    from errlypy.lib import Errly, ModuleController
+
+    if framework == "django":
+        application = apps.django_application()
+        error_path = apps.DJANGO_ERROR_PATH
+        paths = build_plan(config, apps.DJANGO_OK_PATH, error_path)
+        warmup = [apps.DJANGO_OK_PATH] * config.warmup
+
+        def make_driver() -> Callable[[List[str]], List[float]]:
+            return lambda p: drive_wsgi(application, p, config.concurrency)
+
+    else:
+        error_path = apps.ERROR_PATH
+        paths = build_plan(config, apps.OK_PATH, error_path)
+        warmup = [apps.OK_PATH] * config.warmup
+
+        def make_driver() -> Callable[[List[str]], List[float]]:
+            # Middleware can't be added once an app has served requests, so
+            # every phase gets a fresh instance.
+            app = apps.fastapi_application()
+            controller = Errly._module_controller
+            if isinstance(controller, ModuleController):
+                module = controller.get_module(FastAPIModule)
+                if module is not None:
+                    module.register_app(app)
+            return lambda p: drive_asgi(app, p, config.concurrency)
+
+    # Transport failures are expected here and would flood the output
+    logging.getLogger("errlypy").setLevel(logging.CRITICAL)
+
+    drive = make_driver()
+    drive(warmup)
+    baseline = run_phase(drive, paths)
+
+    with StubServerProcess(faults) as server:
+        Errly.init(url=server.url, api_key=LOAD_API_KEY, environment="loadtest")
+        controller = Errly._module_controller
+        assert isinstance(controller, ModuleController)
+        http_client = controller.http_client
+
+        drive = make_driver()
+        drive(warmup)
+        server.reset_stats()
+        instrumented = run_phase(drive, paths)
+
+        drain_start = time.perf_counter()
+        flushed = Errly.flush(timeout=config.flush_timeout)
+        drain = time.perf_counter() - drain_start
+
+        worker = http_client._worker
+        worker_cpu = _thread_cpu(worker._thread)
+        dropped = worker.dropped
+        Errly.close(timeout=config.flush_timeout)
+
+        ingest = server.stats()
+
+    captured = paths.count(error_path)
+    extra_cpu = max(0.0, instrumented["cpu_s"] - baseline["cpu_s"])
+
+    return {
+        "framework": framework,
+        "baseline": baseline,
+        "errlypy": instrumented,
+        "cpu_share": extra_cpu / instrumented["cpu_s"] if instrumented["cpu_s"] else 0.0,
+        "worker_cpu_s": worker_cpu,
+        "drain_s": drain,
+        "flushed": flushed,
+        "events": {
+            "captured": captured,
+            "delivered": ingest["events"],
+            "dropped_queue_full": dropped,
+            "lost_in_transport": max(0, captured - ingest["events"] - dropped),
+        },
+        "ingest": ingest,
+    }
@@ -0,0 +1,169 @@
+"""Local stand-in for the Errly ingest API with fault injection."""
+
+import argparse
+import contextlib
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+@dataclass
+class Faults:
+    latency: float = 0.0
+    error_rate: float = 0.0
+    reset_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+@dataclass
+class IngestStats:
+    requests: int = 0
+    events: int = 0
+    errors: int = 0
+    resets: int = 0
+
+
+class _IngestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubIngestServer"
+
+    def do_GET(self) -> None:
+        if self.path == "/stats":
+            self._respond(200, self.server.snapshot())
+        else:
+            self._respond(404, {"message": "not found"})
+
+    def do_DELETE(self) -> None:
+        if self.path == "/stats":
+            self.server.reset_stats()
+            self._respond(200, {})
+        else:
+            self._respond(404, {"message": "not found"})
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        fault = self.server.next_fault()
+
+        if self.server.faults.latency:
+            time.sleep(self.server.faults.latency)
+
+        if fault == "reset":
+            self.server.record(resets=1)
+            # SO_LINGER with a zero timeout turns close() into a TCP RST
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            self.connection.close()
+            self.close_connection = True
+            return
+
+        if fault == "error":
+            self.server.record(requests=1, errors=1)
+            self._respond(503, {"message": "injected failure"})
+            return
+
+        events = len(json.loads(body).get("events", []))
+        self.server.record(requests=1, events=events)
+        self._respond(200, {"success": True, "processed_count": events})
+
+    def _respond(self, status: int, payload: Dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def finish(self) -> None:
+        # The socket may have been reset on purpose
+        with contextlib.suppress(OSError):
+            super().finish()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class StubIngestServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, faults: Optional[Faults] = None, host: str = "127.0.0.1") -> None:
+        super().__init__((host, 0), _IngestHandler)
+        self._host = host
+        self.faults = faults or Faults()
+        self.stats = IngestStats()
+        self._random = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self._host}:{self.server_port}"
+
+    def next_fault(self) -> Optional[str]:
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.faults.reset_rate:
+            return "reset"
+        if roll < self.faults.reset_rate + self.faults.error_rate:
+            return "error"
+        return None
+
+    def record(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return asdict(self.stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = IngestStats()
+
+    def start(self) -> "StubIngestServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-ingest", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load.stub_server",
+        description="Fake ingest API. GET /stats returns counters, DELETE /stats resets them.",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every POST")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 503 responses")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Share of TCP resets")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = StubIngestServer(
+        Faults(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            reset_rate=args.reset_rate,
+            seed=args.seed,
+        )
+    )
+    # The harness reads the URL from the first line of output
+    print(server.url, flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Cost of one sampling profiler sample, and the CPU share it amounts to."""
+
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.profiler import SamplingProfiler
+
+Operation = Callable[[], Any]
+
+# Threads parked while sampling, as in a busy threaded web server
+THREAD_COUNTS = (1, 8, 32)
+BENCHMARK_THREADS = 8
+STACK_DEPTH = 40
+DEFAULT_INTERVAL = 0.1
+
+
+def _park(depth: int, ready: threading.Barrier, release: threading.Event) -> None:
+    if depth:
+        _park(depth - 1, ready, release)
+        return
+
+    ready.wait()
+    release.wait()
+
+
+def _parked_threads(count: int) -> threading.Event:
+    """Starts ``count`` daemon threads waiting ``STACK_DEPTH`` frames deep."""
+    release = threading.Event()
+    ready = threading.Barrier(count + 1)
+    for _ in range(count):
+        threading.Thread(target=_park, args=(STACK_DEPTH, ready, release), daemon=True).start()
+    ready.wait()
+    return release
+
+
+def build_benchmarks() -> Dict[str, Operation]:
+    profiler = SamplingProfiler(HTTPClient(client=DryRunClient(), environment="benchmark"))
+    # The threads stay parked for the rest of the process
+    _parked_threads(BENCHMARK_THREADS)
+    return {f"sample.threads_{BENCHMARK_THREADS}": profiler.sample}
+
+
+def sample_costs(samples: int = 200) -> Dict[int, float]:
+    """Returns ``{threads: CPU seconds per sample}`` with that many parked threads."""
+    profiler = SamplingProfiler(HTTPClient(client=DryRunClient(), environment="benchmark"))
+    costs = {}
+    for count in THREAD_COUNTS:
+        release = _parked_threads(count)
+        start = time.thread_time()
+        for _ in range(samples):
+            profiler.sample()
+        costs[count] = (time.thread_time() - start) / samples
+        release.set()
+    return costs
+
+
+def main() -> int:
+    print(f"{'threads':>8} {'per sample':>12} {'overhead':>10}  (at {DEFAULT_INTERVAL}s)")
+    for count, cost in sample_costs().items():
+        print(f"{count:>8} {cost * 1e6:>10.0f}us {cost / DEFAULT_INTERVAL:>10.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
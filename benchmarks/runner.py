@@ -0,0 +1,132 @@
+"""Timing, JSON serialization and baseline comparison for benchmark results."""
+
+import gc
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+RESULTS_VERSION = 1
+
+
+def measure(operation: Callable[[], Any], repeat: int = 5, min_time: float = 0.05) -> Dict:
+    """
+    Times ``operation`` like ``timeit``: the loop count is grown until one
+    repeat takes at least ``min_time`` seconds, then ``repeat`` runs are taken.
+    GC is disabled while timing so collections don't land on random samples.
+    """
+    loops = 1
+    while True:
+        elapsed = _time_loops(operation, loops)
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples_us = [_time_loops(operation, loops) / loops * 1e6 for _ in range(repeat)]
+
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "min_us": min(samples_us),
+        "median_us": statistics.median(samples_us),
+        "mean_us": statistics.fmean(samples_us),
+        "stdev_us": statistics.stdev(samples_us) if repeat > 1 else 0.0,
+    }
+
+
+def _time_loops(operation: Callable[[], Any], loops: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def run(
+    benchmarks: Dict[str, Callable[[], Any]],
+    repeat: int = 5,
+    min_time: float = 0.05,
+    progress: Callable[[str], None] = lambda name: None,
+) -> Dict:
+    results = {}
+    for name, operation in benchmarks.items():
+        progress(name)
+        results[name] = measure(operation, repeat=repeat, min_time=min_time)
+
+    return {
+        "version": RESULTS_VERSION,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.1) -> List[Dict]:
+    """
+    Compares medians of two result documents. A benchmark regresses when it is
+    more than ``threshold`` (relative) slower than the baseline.
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            rows.append({"name": name, "status": "new", "ratio": None})
+            continue
+
+        ratio = result["median_us"] / previous["median_us"] if previous["median_us"] else None
+        if ratio is None:
+            status = "unknown"
+        elif ratio > 1 + threshold:
+            status = "slower"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "same"
+
+        rows.append(
+            {
+                "name": name,
+                "status": status,
+                "ratio": ratio,
+                "baseline_us": previous["median_us"],
+                "current_us": result["median_us"],
+            }
+        )
+
+    return rows
+
+
+def format_results(results: Dict) -> str:
+    lines = [f"{'benchmark':<40} {'median':>12} {'min':>12} {'stdev':>10}"]
+    for name, result in results["benchmarks"].items():
+        lines.append(
+            f"{name:<40} {_format_us(result['median_us']):>12} "
+            f"{_format_us(result['min_us']):>12} {_format_us(result['stdev_us']):>10}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    lines = [f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>8}  status"]
+    for row in rows:
+        if row["ratio"] is None:
+            lines.append(f"{row['name']:<40} {'':>12} {'':>12} {'':>8}  {row['status']}")
+            continue
+        lines.append(
+            f"{row['name']:<40} {_format_us(row['baseline_us']):>12} "
+            f"{_format_us(row['current_us']):>12} {row['ratio']:>7.2f}x  {row['status']}"
+        )
+    return "\n".join(lines)
+
+
+def _format_us(value: float) -> str:
+    if value >= 1000:
+        return f"{value / 1000:.2f} ms"
+    return f"{value:.2f} us"
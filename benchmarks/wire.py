@@ -0,0 +1,65 @@
+"""Size and speed of the JSON and binary wire formats for captured events."""
+
+import json
+import sys
+from functools import partial
+from typing import Any, Callable, Dict
+
+from benchmarks.cases import build_cases
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.internal.wire import decode_binary, encode_binary, encode_json
+from errlypy.models.ingest import IngestRequest
+
+Operation = Callable[[], Any]
+
+# Events per request, as the worker sends them under load
+BATCH_SIZE = 50
+
+
+def build_requests() -> Dict[str, IngestRequest]:
+    """One full batch of events per exception scenario."""
+    http_client = HTTPClient(client=DryRunClient(), environment="benchmark")
+    callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+
+    return {
+        case: IngestRequest(
+            events=[http_client._transform_to_ingest_event(callback(*exc_info))] * BATCH_SIZE
+        )
+        for case, exc_info in build_cases().items()
+    }
+
+
+def build_benchmarks() -> Dict[str, Operation]:
+    benchmarks: Dict[str, Operation] = {}
+
+    for case, request in build_requests().items():
+        json_body, binary_body = encode_json(request), encode_binary(request)
+
+        benchmarks[f"encode_json.{case}"] = partial(encode_json, request)
+        benchmarks[f"encode_binary.{case}"] = partial(encode_binary, request)
+        benchmarks[f"decode_json.{case}"] = partial(json.loads, json_body)
+        benchmarks[f"decode_binary.{case}"] = partial(decode_binary, binary_body)
+
+    return benchmarks
+
+
+def payload_sizes() -> Dict[str, Dict[str, int]]:
+    """Returns ``{case: {"json": bytes, "binary": bytes}}``."""
+    return {
+        case: {"json": len(encode_json(request)), "binary": len(encode_binary(request))}
+        for case, request in build_requests().items()
+    }
+
+
+def main() -> int:
+    print(f"{'case':<20} {'json':>12} {'binary':>12} {'ratio':>8}")
+    for case, sizes in payload_sizes().items():
+        ratio = sizes["binary"] / sizes["json"]
+        print(f"{case:<20} {sizes['json']:>12} {sizes['binary']:>12} {ratio:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import contextlib
+import json
+import logging
+import os
+import socket
+import stat
+import time
+from typing import Any, Dict, List, Optional
+
+from errlypy.client.agent import default_socket_path
+from errlypy.internal.config import HTTPErrorConfig
+from errlypy.internal.metrics import registry
+from errlypy.internal.wire import MAGIC, decode_binary, encode_json
+
+logger = logging.getLogger(__name__)
+
+# Largest datagram accepted; AgentClient splits batches beyond the (smaller)
+# default socket send buffer, so this is never the limiting factor
+_MAX_DATAGRAM = 1 << 20
+
+
+class Agent:
+    """
+    Host-local collector: receives serialized batches from every process on
+    the host over a Unix datagram socket and delivers them through a single
+    client in larger, optionally compressed batches.
+
+    One thread receives and delivers in turn; while a batch is being posted,
+    incoming datagrams wait in the socket's receive buffer. The socket gets
+    ``mode``, so by default only processes of the agent's user can write to
+    it.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        path: Optional[str] = None,
+        max_batch_size: int = 500,
+        flush_interval: float = 1.0,
+        receive_buffer: int = 4 << 20,
+        mode: int = 0o600,
+    ) -> None:
+        self._client = client
+        self._path = path if path is not None else default_socket_path()
+        self._mode = mode
+        self._max_batch_size = max_batch_size
+        self._flush_interval = flush_interval
+        self._receive_buffer = receive_buffer
+        self._socket: Optional[socket.socket] = None
+        self._batch: List[Dict[str, Any]] = []
+        self._stopped = False
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def bind(self) -> None:
+        """
+        Creates the socket, replacing one left behind by a previous agent of
+        the same user. A missing directory is created with mode 0700.
+
+        Raises:
+            PermissionError: The directory could be written to by another
+                user, or the socket there belongs to one
+        """
+        directory = os.path.dirname(os.path.abspath(self._path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        _check_directory(directory)
+
+        try:
+            existing = os.lstat(self._path)
+        except FileNotFoundError:
+            pass
+        else:
+            if stat.S_ISSOCK(existing.st_mode):
+                if existing.st_uid != os.getuid():
+                    raise PermissionError(f"{self._path} belongs to another user")
+                os.unlink(self._path)
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._receive_buffer)
+        # Created without any access for others, so nobody can connect before
+        # the chmod; the umask is process-wide but only held for the bind
+        previous_umask = os.umask(0o177)
+        try:
+            self._socket.bind(self._path)
+        finally:
+            os.umask(previous_umask)
+        os.chmod(self._path, self._mode)
+        self._socket.settimeout(self._flush_interval)
+
+    def serve_forever(self) -> None:
+        """Receives and delivers until ``stop`` is called, then flushes."""
+        if self._socket is None:
+            self.bind()
+
+        buffer = bytearray(_MAX_DATAGRAM)
+        last_flush = time.monotonic()
+        while not self._stopped:
+            self.receive(buffer)
+
+            if (
+                len(self._batch) >= self._max_batch_size
+                or time.monotonic() - last_flush >= self._flush_interval
+            ):
+                self.flush()
+                last_flush = time.monotonic()
+
+        # Take in what was written before stopping
+        assert self._socket is not None
+        self._socket.settimeout(0)
+        while self.receive(buffer):
+            pass
+        self.flush()
+
+    def receive(self, buffer: bytearray) -> bool:
+        """
+        Waits up to the flush interval for one datagram, JSON or binary, and
+        queues its events. Returns False if none arrived.
+        """
+        assert self._socket is not None
+        try:
+            size = self._socket.recv_into(buffer)
+        except (socket.timeout, BlockingIOError):
+            return False
+
+        datagram = bytes(buffer[:size])
+        try:
+            if datagram.startswith(MAGIC):
+                # Queued in the JSON shape, like the datagrams of JSON clients
+                datagram = encode_json(decode_binary(datagram))
+            events = json.loads(datagram)["events"]
+        except (ValueError, KeyError, TypeError):
+            registry.inc("agent_invalid_datagrams")
+            logger.debug("Ignoring invalid datagram", exc_info=True)
+            return True
+
+        registry.inc("agent_events_received", len(events))
+        self._batch.extend(events)
+        return True
+
+    def flush(self) -> None:
+        while self._batch:
+            batch = self._batch[: self._max_batch_size]
+            del self._batch[: self._max_batch_size]
+            try:
+                self._client.post(HTTPErrorConfig.endpoint, {"events": batch})
+            except Exception:
+                logger.debug("Unable to deliver Errly batch", exc_info=True)
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self._path)
+        self._client.close()
+
+
+def _check_directory(directory: str) -> None:
+    """
+    Refuses a directory that another user could swap the socket in: it must
+    belong to the agent's user or root, and if others can write to it, it
+    must be sticky like ``/tmp`` so they can't remove what isn't theirs.
+    """
+    info = os.stat(directory)
+    if info.st_uid not in (os.getuid(), 0):
+        raise PermissionError(f"{directory} belongs to another user")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH) and not info.st_mode & stat.S_ISVTX:
+        raise PermissionError(f"{directory} is writable by other users")
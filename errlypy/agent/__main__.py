@@ -0,0 +1,60 @@
+import argparse
+import logging
+import os
+import signal
+import sys
+
+from errlypy.agent import Agent
+from errlypy.client.agent import default_socket_path
+from errlypy.client.urllib import URLLibClient
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m errlypy.agent",
+        description="Collects events from every process on this host and delivers them to Errly",
+    )
+    parser.add_argument("--socket", default=default_socket_path(), help="Unix socket to listen on")
+    parser.add_argument(
+        "--socket-mode",
+        type=lambda value: int(value, 8),
+        default=0o600,
+        help="Permissions of the socket, in octal; 600 lets only this user write to it",
+    )
+    parser.add_argument("--url", default=os.environ.get("ERRLY_URL"), help="Errly API base URL")
+    parser.add_argument(
+        "--api-key", default=os.environ.get("ERRLY_API_KEY"), help="Defaults to $ERRLY_API_KEY"
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="Events per request")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="Seconds")
+    parser.add_argument("--no-compress", action="store_true", help="Send plain JSON bodies")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not args.url or not args.api_key:
+        parser.error("--url and --api-key (or $ERRLY_URL and $ERRLY_API_KEY) are required")
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    agent = Agent(
+        URLLibClient(args.url, args.api_key, compress=not args.no_compress),
+        path=args.socket,
+        max_batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+        mode=args.socket_mode,
+    )
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: agent.stop())
+
+    agent.bind()
+    print(f"errlypy agent listening on {agent.path}", file=sys.stderr)
+    try:
+        agent.serve_forever()
+    finally:
+        agent.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
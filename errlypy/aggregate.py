@@ -0,0 +1,166 @@
+import hashlib
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime
+from types import TracebackType
+from typing import Any, Dict, Iterable, List, Optional
+
+from errlypy import capture
+from errlypy.client import HTTPClient
+from errlypy.exception import ParsedExceptionDto
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.internal.metrics import registry
+from errlypy.models.ingest import ErrorLevel
+
+
+def fingerprint(exc: BaseException) -> str:
+    """
+    Identifies "the same error": the exception type and the code locations
+    of its traceback. Messages are left out so e.g. a validation error
+    mentioning a different record ID still groups together.
+    """
+    digest = hashlib.sha1(f"{type(exc).__module__}.{type(exc).__qualname__}".encode())
+    tb: Optional[TracebackType] = exc.__traceback__
+    for frame, lineno in traceback.walk_tb(tb):
+        code = frame.f_code
+        digest.update(f"\n{code.co_filename}:{code.co_name}:{lineno}".encode())
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class _Group:
+    """One fingerprint: a single parsed sample plus counters."""
+
+    sample: ParsedExceptionDto
+    count: int
+    first_seen: float
+    last_seen: float
+
+
+class Aggregator:
+    """
+    Groups exceptions by fingerprint and reports one summary event per group.
+
+    Only the first exception of a group is parsed; later ones only bump its
+    counter and last-seen time, so memory per fingerprint is one sample
+    regardless of how often it occurs, and at most ``max_fingerprints``
+    groups are kept (further new fingerprints are only counted). Summaries
+    are emitted by ``flush``, when the ``with`` block exits and, if
+    ``interval`` is set, on the first capture after it elapsed.
+    """
+
+    def __init__(
+        self,
+        http_client: Optional[HTTPClient],
+        level: ErrorLevel = ErrorLevel.ERROR,
+        tags: Optional[Dict[str, str]] = None,
+        interval: Optional[float] = None,
+        max_fingerprints: int = 100,
+    ) -> None:
+        self._http_client = http_client
+        self._level = level
+        self._tags = dict(tags) if tags else {}
+        self._interval = interval
+        self._max_fingerprints = max_fingerprints
+        self._groups: Dict[str, _Group] = {}
+        self._overflow = 0
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> "Aggregator":
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        # An exception escaping the block is reported on its own as usual
+        self.flush()
+
+    def capture_exception(self, exc: Optional[BaseException] = None) -> str:
+        """Records ``exc`` (default: the one being handled); returns its fingerprint."""
+        if exc is None:
+            exc = sys.exc_info()[1]
+            if exc is None:
+                raise ValueError("No exception to capture")
+
+        key = fingerprint(exc)
+        now = time.time()
+
+        new_group = False
+        with self._lock:
+            group = self._groups.get(key)
+            if group is not None:
+                group.count += 1
+                group.last_seen = now
+            elif len(self._groups) >= self._max_fingerprints:
+                self._overflow += 1
+                registry.inc("exceptions_ungrouped")
+            else:
+                new_group = True
+
+        if new_group:
+            # Parsed outside the lock; it may take up to the capture budget
+            sample = self._parse(exc)
+            with self._lock:
+                group = self._groups.get(key)
+                if group is None:
+                    self._groups[key] = _Group(sample, 1, now, now)
+                else:
+                    # Another thread sampled it first
+                    group.count += 1
+                    group.last_seen = max(group.last_seen, now)
+
+        registry.inc("exceptions_aggregated")
+
+        if self._interval is not None and time.monotonic() - self._last_flush >= self._interval:
+            self.flush()
+
+        return key
+
+    def capture_many(self, exceptions: Iterable[BaseException]) -> None:
+        for exc in exceptions:
+            self.capture_exception(exc)
+
+    def flush(self) -> List[str]:
+        """Queues one summary event per fingerprint seen since the last flush."""
+        with self._lock:
+            groups, self._groups = self._groups, {}
+            overflow, self._overflow = self._overflow, 0
+            self._last_flush = time.monotonic()
+
+        if self._http_client is None:
+            return []
+
+        event_ids = []
+        for key, group in groups.items():
+            extra: Dict[str, Any] = {
+                "aggregate": {
+                    "fingerprint": key,
+                    "count": group.count,
+                    "first_seen": datetime.fromtimestamp(group.first_seen).isoformat(),
+                    "last_seen": datetime.fromtimestamp(group.last_seen).isoformat(),
+                }
+            }
+            if overflow:
+                # Occurrences of fingerprints beyond max_fingerprints
+                extra["aggregate"]["ungrouped"] = overflow
+                overflow = 0
+            event_ids.append(
+                capture.submit(
+                    self._http_client,
+                    group.sample.content,
+                    self._level,
+                    {**self._tags, "aggregated": "true"},
+                    extra,
+                    exception=group.sample,
+                    timestamp=datetime.fromtimestamp(group.last_seen),
+                )
+            )
+
+        return event_ids
+
+    @staticmethod
+    def _parse(exc: BaseException) -> ParsedExceptionDto:
+        callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+        return callback(type(exc), exc, exc.__traceback__)
@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from types import TracebackType
-from typing import Any, Optional, Type, Union
+from typing import TYPE_CHECKING, Any, List, Optional, Type, Union
 
 from errlypy.exception import ParsedExceptionDto
 
+if TYPE_CHECKING:
+    from errlypy.client import HTTPClient
+
 
 class ExceptionCallback(ABC):
     _next_callback: Optional["ExceptionCallback"] = None
@@ -52,9 +55,7 @@ class IPlugin(ABC):
 class IUninitializedModule(ABC):
     @classmethod
     @abstractmethod
-    def setup(
-        cls, base_url: str, api_key: str, environment: str = "production"
-    ) -> Union["IModule", "IUninitializedModule"]:
+    def setup(cls, http_client: "HTTPClient") -> Union["IModule", "IUninitializedModule"]:
         pass
 
 
@@ -76,6 +77,15 @@ class IUninitializedModuleController(ABC):
 
 class IModuleController(ABC):
     _registry: OrderedDict[type, IPlugin]
+    _modules: List[IModule]
+
+    @abstractmethod
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        pass
+
+    @abstractmethod
+    def close(self, timeout: Optional[float] = None) -> bool:
+        pass
 
     @abstractmethod
     def revert(self) -> IUninitializedModuleController:
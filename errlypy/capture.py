@@ -0,0 +1,110 @@
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from errlypy.client import HTTPClient
+from errlypy.exception import ParsedExceptionDto
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.internal.config import CaptureConfig
+from errlypy.internal.encoder import detach
+from errlypy.models.ingest import ErrorLevel, IngestEvent
+
+
+@dataclass(frozen=True)
+class _CaptureSnapshot:
+    """Everything a manually captured event is built from, taken at call time."""
+
+    event_id: str
+    timestamp: datetime
+    level: ErrorLevel
+    message: str
+    tags: Dict[str, str]
+    extra: Dict[str, Any]
+    exception: Optional[ParsedExceptionDto] = None
+
+
+def capture_exception(
+    http_client: HTTPClient,
+    exc: BaseException,
+    level: ErrorLevel,
+    tags: Optional[Dict[str, str]],
+    extra: Optional[Dict[str, Any]],
+    future: "Optional[Future[bool]]" = None,
+) -> str:
+    """
+    Parses ``exc`` on the calling thread and queues its event; returns the
+    event ID. The parse is bounded by the capture time budget and the result
+    holds no reference to the exception, its traceback or frames.
+    """
+    callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+    parsed = callback(type(exc), exc, exc.__traceback__)
+
+    return submit(http_client, parsed.content, level, tags, extra, future, parsed)
+
+
+def capture_message(
+    http_client: HTTPClient,
+    message: str,
+    level: ErrorLevel,
+    tags: Optional[Dict[str, str]],
+    extra: Optional[Dict[str, Any]],
+    future: "Optional[Future[bool]]" = None,
+) -> str:
+    """Queues an event for ``message``; returns the event ID."""
+    scrubber = CaptureConfig.scrubber
+    if scrubber is not None:
+        message = scrubber.scrub_text(message)
+
+    return submit(http_client, message, level, tags, extra, future)
+
+
+def submit(
+    http_client: HTTPClient,
+    message: str,
+    level: ErrorLevel,
+    tags: Optional[Dict[str, str]],
+    extra: Optional[Dict[str, Any]],
+    future: "Optional[Future[bool]]" = None,
+    exception: Optional[ParsedExceptionDto] = None,
+    timestamp: Optional[datetime] = None,
+) -> str:
+    """Queues an event built from already captured data; returns the event ID."""
+    # Deep copied, so later changes by the caller don't leak into the queued
+    # event, and made JSON-safe now rather than failing the batch later
+    extra = detach(extra) if extra else {}
+    tags = dict(tags) if tags else {}
+    scrubber = CaptureConfig.scrubber
+    if scrubber is not None:
+        extra = scrubber.scrub_mapping(extra)
+        tags = scrubber.scrub_mapping(tags)
+
+    snapshot = _CaptureSnapshot(
+        event_id=uuid4().hex,
+        timestamp=timestamp or datetime.now(),
+        level=level,
+        message=message,
+        tags=tags,
+        extra=extra,
+        exception=exception,
+    )
+    http_client.submit(partial(_build_event, http_client, snapshot), future, level)
+
+    return snapshot.event_id
+
+
+def _build_event(http_client: HTTPClient, snapshot: _CaptureSnapshot) -> IngestEvent:
+    if snapshot.exception is not None:
+        event = http_client._transform_to_ingest_event(snapshot.exception)
+    else:
+        event = IngestEvent(message=snapshot.message, environment=http_client.environment)
+
+    event.event_id = snapshot.event_id
+    event.level = snapshot.level
+    event.timestamp = snapshot.timestamp
+    event.tags.update(snapshot.tags)
+    event.extra.update(snapshot.extra)
+
+    return event
@@ -1,36 +1,171 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future
 from datetime import datetime
-from typing import ClassVar, Optional
-
-import aiohttp
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
 
+from errlypy.client.agent import AgentClient
+from errlypy.client.dry import DryRunClient
+from errlypy.client.fanout import Destination, FanOutClient
 from errlypy.client.urllib import URLLibClient
+from errlypy.client.worker import BatchWorker, EventFactory, _remaining
 from errlypy.django.events import OnDjangoExceptionHasBeenParsedEvent
-from errlypy.internal.config import HTTPErrorConfig
+from errlypy.exception import CollapsedFrames
+from errlypy.internal.config import CaptureConfig, HTTPErrorConfig
+from errlypy.internal.metrics import registry
 from errlypy.models.ingest import ErrorLevel, IngestEvent, IngestRequest
 
+logger = logging.getLogger(__name__)
+
+Transport = Union[URLLibClient, DryRunClient, AgentClient, FanOutClient]
+
+# Adds context to an event; called on the worker thread once it is built
+EventProcessor = Callable[[IngestEvent], None]
+
 
 class UninitializedHTTPClient:
     @classmethod
-    def setup(cls, base_url: str, api_key: str, environment: str = "production") -> "HTTPClient":
-        return HTTPClient(client=URLLibClient(base_url, api_key), environment=environment)
+    def setup(
+        cls,
+        base_url: str,
+        api_key: str,
+        environment: str = "production",
+        timeout: float = 30,
+        dry_mode: bool = False,
+        dry_mode_path: Optional[str] = None,
+        dry_mode_capacity: int = 1000,
+        agent_socket: Optional[str] = None,
+        wire_format: str = "json",
+        compress: bool = False,
+        destinations: Sequence[Destination] = (),
+        max_retries: int = 3,
+    ) -> "HTTPClient":
+        client: Transport
+        if dry_mode:
+            client = DryRunClient(
+                path=dry_mode_path, capacity=dry_mode_capacity, wire_format=wire_format
+            )
+        elif agent_socket is not None:
+            client = AgentClient(agent_socket, wire_format=wire_format)
+        else:
+            client = URLLibClient(
+                base_url, api_key, timeout=timeout, compress=compress, wire_format=wire_format
+            )
+            if destinations:
+                client = FanOutClient(
+                    [(base_url, client)]
+                    + [
+                        (
+                            destination.name or destination.url,
+                            URLLibClient(
+                                destination.url,
+                                destination.api_key,
+                                timeout=timeout,
+                                compress=compress,
+                                wire_format=wire_format,
+                            ),
+                        )
+                        for destination in destinations
+                    ],
+                    max_retries=max_retries,
+                )
+
+        return HTTPClient(client=client, environment=environment)
 
 
 class HTTPClient:
-    _instance: ClassVar[Optional["HTTPClient"]] = None
-    _client: URLLibClient
-    _environment: str
+    """
+    Transport shared by every integration: one connection, one worker queue and
+    one batch stream per ``ModuleController``.
+    """
 
-    def __new__(cls, *args, **kwargs) -> "HTTPClient":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    _client: Transport
+    _environment: str
+    _worker: BatchWorker
+    _processors: Tuple[EventProcessor, ...]
 
-    def __init__(self, client: URLLibClient, environment: str = "production") -> None:
+    def __init__(self, client: Transport, environment: str = "production") -> None:
         self._client = client
         self._environment = environment
+        self._worker = BatchWorker(client)
+        # Replaced, never changed, so submit reads it without the lock
+        self._processors = ()
+        self._processors_lock = threading.Lock()
+        _http_clients.add(self)
+
+    @property
+    def environment(self) -> str:
+        return self._environment
+
+    @property
+    def transport(self) -> Transport:
+        return self._client
+
+    def submit(
+        self,
+        factory: EventFactory,
+        future: "Optional[Future[bool]]" = None,
+        level: ErrorLevel = ErrorLevel.ERROR,
+    ) -> bool:
+        """Hands an event factory to the background worker for batched delivery"""
+        processors = self._processors
+        if processors:
+            factory = partial(_process_event, factory, processors)
+        return self._worker.submit(factory, future, level)
+
+    def add_event_processor(self, processor: EventProcessor) -> None:
+        """Runs ``processor`` on every event built from now on"""
+        with self._processors_lock:
+            self._processors = (*self._processors, processor)
+
+    def remove_event_processor(self, processor: EventProcessor) -> None:
+        with self._processors_lock:
+            self._processors = tuple(
+                registered for registered in self._processors if registered != processor
+            )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flushed = self._worker.flush(timeout)
+        if isinstance(self._client, FanOutClient):
+            # The worker only handed the batches to the destination queues
+            flushed = self._client.flush(_remaining(deadline)) and flushed
+        return flushed
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Delivers queued events, stops the worker and closes the connection"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        closed = self._worker.close(timeout)
+        if isinstance(self._client, FanOutClient):
+            closed = self._client.close(_remaining(deadline)) and closed
+        else:
+            self._client.close()
+        return closed
+
+    def reset_after_fork(self) -> None:
+        self._worker.reset_after_fork()
+        self._client.reset_after_fork()
+
+    def enqueue(self, data) -> None:
+        """Queues a parsed exception event; it is transformed and sent by the worker"""
+        # Taken now: the worker may only build the event seconds later
+        self.submit(
+            partial(
+                self._transform_to_ingest_event,
+                data.data,
+                timestamp=datetime.now(),
+                event_id=data.event_id.hex,
+            )
+        )
 
     @classmethod
     async def send_through_aiohttp(cls, data):
+        import aiohttp
+
         async with aiohttp.ClientSession(headers=cls.headers) as session:
             session.post(cls.url, json=data)
 
@@ -51,15 +186,27 @@ class HTTPClient:
                 data,
             )
 
-    def _transform_to_ingest_event(self, parsed_exception) -> IngestEvent:
-        """Transform ParsedExceptionDto to IngestEvent"""
+    def _transform_to_ingest_event(
+        self,
+        parsed_exception,
+        timestamp: Optional[datetime] = None,
+        event_id: Optional[str] = None,
+    ) -> IngestEvent:
+        """Transform ParsedExceptionDto to IngestEvent, captured at ``timestamp``"""
         # Collect stack trace from frames
         stack_trace_lines = []
-        for frame in parsed_exception.frames:
+        collapsed = {run.index: run for run in parsed_exception.collapsed}
+        for index, frame in enumerate(parsed_exception.frames):
+            if index in collapsed:
+                stack_trace_lines.append(self._describe_collapsed(collapsed[index]))
             line = f'  File "{frame.filename}", line {frame.lineno}, in {frame.function}'
             stack_trace_lines.append(line)
             if frame.line:
                 stack_trace_lines.append(f"    {frame.line}")
+        if len(parsed_exception.frames) in collapsed:
+            stack_trace_lines.append(
+                self._describe_collapsed(collapsed[len(parsed_exception.frames)])
+            )
 
         stack_trace = "\n".join(stack_trace_lines) if stack_trace_lines else None
 
@@ -71,15 +218,70 @@ class HTTPClient:
             tags["last_file"] = parsed_exception.frames[-1].filename
             tags["error_function"] = parsed_exception.frames[-1].function
 
+        extra: Dict[str, Any] = {
+            # The real depth of the stack; frames_kept is what stack_trace shows
+            "frame_count": parsed_exception.depth or len(parsed_exception.frames),
+            "frames_kept": len(parsed_exception.frames),
+        }
+        if parsed_exception.skipped_stages:
+            # The capture ran over its time budget and left these out
+            extra["capture_skipped"] = parsed_exception.skipped_stages
+            extra["truncated_frames"] = parsed_exception.truncated_frames
+        if parsed_exception.context:
+            # Added by integrations after the capture scrubbed the rest
+            scrubber = CaptureConfig.scrubber
+            context = parsed_exception.context
+            extra.update(scrubber.scrub_mapping(context) if scrubber is not None else context)
+
         return IngestEvent(
             message=parsed_exception.content,
             environment=self._environment,  # Use from configuration
             level=ErrorLevel.ERROR,
             stack_trace=stack_trace,
             tags=tags,
-            extra={"frame_count": len(parsed_exception.frames)},
-            timestamp=datetime.now(),
+            extra=extra,
+            timestamp=timestamp or datetime.now(),
+            event_id=event_id,
+        )
+
+    @staticmethod
+    def _describe_collapsed(run: CollapsedFrames) -> str:
+        if not run.repeat_of:
+            return f"  [{run.count} frames omitted]"
+        if run.repeat_of == 1:
+            return f"  [Previous frame repeated {run.count} more times]"
+        return (
+            f"  [Previous {run.repeat_of} frames repeated {run.count // run.repeat_of} more times]"
         )
 
     def notify(self, event: OnDjangoExceptionHasBeenParsedEvent):
         self.send_through_urllib(event)
+
+
+def _process_event(
+    factory: EventFactory, processors: Tuple[EventProcessor, ...]
+) -> Optional[IngestEvent]:
+    event = factory()
+    if event is None:
+        return None
+
+    for processor in processors:
+        try:
+            processor(event)
+        except Exception:
+            # Missing context is better than a lost event
+            registry.inc("event_processor_errors")
+            logger.debug("Errly event processor failed", exc_info=True)
+    return event
+
+
+_http_clients: "weakref.WeakSet[HTTPClient]" = weakref.WeakSet()
+
+
+def _reset_http_clients_after_fork() -> None:
+    for http_client in list(_http_clients):
+        http_client.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_http_clients_after_fork)
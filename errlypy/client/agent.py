@@ -0,0 +1,109 @@
+import errno
+import logging
+import os
+import socket
+import tempfile
+import time
+from typing import Any, List, Optional
+
+from errlypy.internal.metrics import metric_name, registry
+from errlypy.internal.wire import WIRE_FORMATS
+from errlypy.models.ingest import IngestRequest
+
+logger = logging.getLogger(__name__)
+
+_SOCKET_NAME = "errlypy-agent.sock"
+
+_DROPPED_AGENT_BUSY = metric_name("events_dropped", reason="agent_busy")
+_DROPPED_AGENT_DOWN = metric_name("events_dropped", reason="agent_unavailable")
+_DROPPED_TOO_LARGE = metric_name("events_dropped", reason="too_large")
+
+
+def default_socket_path() -> str:
+    """
+    Where the agent listens unless told otherwise: the user's runtime
+    directory (``$XDG_RUNTIME_DIR``), or else a directory of the user's own
+    in the temp directory, which the agent creates with mode 0700. Other
+    users can't bind or replace a socket in either.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, _SOCKET_NAME)
+    return os.path.join(tempfile.gettempdir(), f"errlypy-{os.getuid()}", _SOCKET_NAME)
+
+
+class AgentClient:
+    """
+    Transport that hands serialized batches to a host-local ``errlypy.agent``.
+
+    Every batch is written as one datagram to the agent's Unix socket without
+    blocking: if the agent is not running or its receive buffer is full the
+    batch is dropped, so a slow or missing agent never stalls the process.
+    Batches too large for a single datagram are written event by event.
+    Datagrams are encoded in ``wire_format``; the agent reads either format.
+    """
+
+    def __init__(self, path: Optional[str] = None, wire_format: str = "json") -> None:
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(
+                f"Unknown wire format {wire_format!r}, expected one of {list(WIRE_FORMATS)}"
+            )
+        self._path = path if path is not None else default_socket_path()
+        _, self._encode = WIRE_FORMATS[wire_format]
+        self._socket: Optional[socket.socket] = None
+
+    def post(self, url, data) -> Optional[str]:
+        start = time.perf_counter()
+        payload = self._encode(data)
+        registry.observe("serialize_seconds", time.perf_counter() - start)
+
+        try:
+            sent = self._write(payload)
+        except OSError as exc:
+            if exc.errno != errno.EMSGSIZE:
+                raise
+            sent = self._write_split(data)
+
+        return "" if sent else None
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def reset_after_fork(self) -> None:
+        # Datagram sockets are safe to share, but each process gets its own
+        # so closing one never affects the other
+        self._socket = None
+
+    def _write_split(self, data: Any) -> bool:
+        events: List[Any] = getattr(data, "events", [])
+        sent = bool(events)
+        for event in events:
+            payload = self._encode(IngestRequest(events=[event]))
+            try:
+                sent = self._write(payload) and sent
+            except OSError as exc:
+                if exc.errno != errno.EMSGSIZE:
+                    raise
+                registry.inc(_DROPPED_TOO_LARGE)
+                sent = False
+        return sent
+
+    def _write(self, payload: bytes) -> bool:
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.setblocking(False)
+
+        try:
+            self._socket.sendto(payload, self._path)
+        except BlockingIOError:
+            registry.inc(_DROPPED_AGENT_BUSY)
+            return False
+        except (FileNotFoundError, ConnectionRefusedError):
+            registry.inc(_DROPPED_AGENT_DOWN)
+            logger.debug(f"No errlypy agent listening on {self._path}")
+            return False
+
+        registry.inc("bytes_sent", len(payload))
+        return True
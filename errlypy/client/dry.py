@@ -0,0 +1,101 @@
+import collections
+import json
+import struct
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional
+
+from errlypy.internal.metrics import registry
+from errlypy.internal.wire import WIRE_FORMATS, decode_binary, encode_json
+
+# Binary batches are written to the file sink with their length in front
+_LENGTH = struct.Struct(">I")
+
+
+class DryRunClient:
+    """
+    Transport used in dry mode: batches are serialized exactly as for the
+    network, in the configured ``wire_format``, then kept in memory or
+    appended to a file instead of being sent.
+
+    Without ``path`` the last ``capacity`` batches are kept in a ring; with a
+    ``path`` every batch is appended to it, as one line for JSON and
+    length-prefixed for the binary format. ``batches`` reads back the bodies
+    that would have been sent, ``events`` the events decoded from them.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, capacity: int = 1000, wire_format: str = "json"
+    ) -> None:
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(
+                f"Unknown wire format {wire_format!r}, expected one of {list(WIRE_FORMATS)}"
+            )
+        self._path = path
+        self._wire_format = wire_format
+        _, self._encode = WIRE_FORMATS[wire_format]
+        self._batches: Deque[bytes] = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def post(self, url, data) -> Optional[str]:
+        start = time.perf_counter()
+        body = self._encode(data)
+        registry.observe("serialize_seconds", time.perf_counter() - start)
+        registry.inc("dry_run_bytes", len(body))
+
+        with self._lock:
+            if self._path is None:
+                self._batches.append(body)
+            else:
+                with open(self._path, "ab") as sink:
+                    if self._wire_format == "json":
+                        sink.write(body + b"\n")
+                    else:
+                        sink.write(_LENGTH.pack(len(body)) + body)
+
+        return ""
+
+    def batches(self) -> List[bytes]:
+        """Returns the recorded request bodies, oldest first, exactly as they would be sent."""
+        with self._lock:
+            if self._path is None:
+                return list(self._batches)
+            try:
+                with open(self._path, "rb") as sink:
+                    content = sink.read()
+            except FileNotFoundError:
+                return []
+
+        if self._wire_format == "json":
+            return content.splitlines()
+
+        batches = []
+        offset = 0
+        while offset + _LENGTH.size <= len(content):
+            (length,) = _LENGTH.unpack_from(content, offset)
+            offset += _LENGTH.size
+            batches.append(content[offset : offset + length])
+            offset += length
+        return batches
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Returns the recorded events, oldest first, as they would have been sent."""
+        return [event for batch in self.batches() for event in self._decode(batch)["events"]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._batches.clear()
+            if self._path is not None:
+                open(self._path, "wb").close()
+
+    def close(self) -> None:
+        pass
+
+    def reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _decode(self, batch: bytes) -> Dict[str, Any]:
+        if self._wire_format == "json":
+            return json.loads(batch)
+        # Read back as the JSON of the same request, so events look alike in both formats
+        return json.loads(encode_json(decode_binary(batch)))
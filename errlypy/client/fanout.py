@@ -0,0 +1,195 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+from errlypy.client.urllib import URLLibClient
+from errlypy.client.worker import _remaining
+from errlypy.internal.metrics import metric_name, registry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Destination:
+    """An additional Errly instance (e.g. a DR or staging project) to send to."""
+
+    url: str
+    api_key: str
+    # Label used in metrics; defaults to the URL
+    name: Optional[str] = None
+
+
+class _Flush:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class _Stop:
+    pass
+
+
+class _DestinationSender:
+    """
+    Delivers encoded bodies to one destination from its own thread and queue.
+
+    A post that failed on the network or with a 5xx is retried with
+    exponential backoff before the body is given up on; a 4xx won't succeed
+    on a retry and is given up on at once. Meanwhile only this destination's
+    queue backs up, and once it is full new bodies are dropped for this
+    destination alone.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client: URLLibClient,
+        max_queue_size: int = 100,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ) -> None:
+        self.name = name
+        self.client = client
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._dropped = metric_name("destination_dropped", destination=name)
+        self._failed = metric_name("destination_failures", destination=name)
+        self._sent = metric_name("destination_batches_sent", destination=name)
+
+    def submit(self, url: str, body: bytes) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((url, body))
+        except queue.Full:
+            registry.inc(self._dropped)
+            return False
+        return True
+
+    def flush(self, deadline: Optional[float]) -> bool:
+        if self._thread is None:
+            return True
+
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=_remaining(deadline))
+        except queue.Full:
+            return False
+        return marker.done.wait(_remaining(deadline))
+
+    def close(self, deadline: Optional[float]) -> bool:
+        thread = self._thread
+        closed = True
+        if thread is not None:
+            try:
+                self._queue.put(_Stop(), timeout=_remaining(deadline))
+            except queue.Full:
+                return False
+            thread.join(_remaining(deadline))
+            closed = not thread.is_alive()
+            if closed:
+                self._thread = None
+
+        self.client.close()
+        return closed
+
+    def reset_after_fork(self) -> None:
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.client.reset_after_fork()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"errlypy-destination-{self.name}", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if isinstance(item, _Stop):
+                return
+            if isinstance(item, _Flush):
+                item.done.set()
+                continue
+
+            url, body = item
+            self._deliver(url, body)
+
+    def _deliver(self, url: str, body: bytes) -> None:
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                time.sleep(self._retry_backoff * 2 ** (attempt - 1))
+            try:
+                status, _ = self.client.deliver(url, body)
+            except Exception:
+                logger.debug(f"Unable to deliver to {self.name}", exc_info=True)
+                continue
+            if status is not None and status < 400:
+                registry.inc(self._sent)
+                return
+            if status is not None and status < 500:
+                # Rejected (bad key, payload too large, ...): the same body fails again
+                break
+
+        registry.inc(self._failed)
+
+
+class FanOutClient:
+    """
+    Transport for several destinations: every batch is encoded (and
+    compressed, if the clients are set up with ``compress``) once and the
+    same bytes are queued for each destination, which delivers, retries and
+    fails independently of the others.
+
+    ``post`` returns once the body has been queued, so a delivery future
+    resolves True when at least one destination accepted the batch.
+    """
+
+    def __init__(
+        self,
+        destinations: Sequence[Tuple[str, URLLibClient]],
+        max_queue_size: int = 100,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ) -> None:
+        if not destinations:
+            raise ValueError("At least one destination is required")
+
+        self._senders: List[_DestinationSender] = [
+            _DestinationSender(name, client, max_queue_size, max_retries, retry_backoff)
+            for name, client in destinations
+        ]
+
+    def post(self, url, data) -> Optional[str]:
+        # Every destination client is configured alike, so any can encode
+        body = self._senders[0].client.encode(data)
+
+        accepted = [sender.submit(url, body) for sender in self._senders]
+        return "" if any(accepted) else None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Every destination is flushed, even after one has timed out
+        flushed = [sender.flush(deadline) for sender in self._senders]
+        return all(flushed)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Delivers what is still queued for every destination, then closes them."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        closed = [sender.close(deadline) for sender in self._senders]
+        return all(closed)
+
+    def reset_after_fork(self) -> None:
+        for sender in self._senders:
+            sender.reset_after_fork()
@@ -0,0 +1,213 @@
+import collections
+import queue
+import threading
+import time
+from typing import Any, Deque, Iterable, List, Optional, Tuple
+
+from errlypy.internal.metrics import metric_name, registry
+from errlypy.models.ingest import ErrorLevel
+
+# Highest priority first
+PRIORITY = (ErrorLevel.ERROR, ErrorLevel.WARNING, ErrorLevel.INFO, ErrorLevel.DEBUG)
+
+# Share of the worker queue a lane may fill; errors may use all of it
+LANE_SHARES = {
+    ErrorLevel.ERROR: 1.0,
+    ErrorLevel.WARNING: 0.5,
+    ErrorLevel.INFO: 0.25,
+    ErrorLevel.DEBUG: 0.1,
+}
+
+# Relative drain rates of the lanes below ERROR, which always goes first
+LANE_WEIGHTS = {
+    ErrorLevel.WARNING: 4,
+    ErrorLevel.INFO: 2,
+    ErrorLevel.DEBUG: 1,
+}
+
+
+class _Lane:
+    __slots__ = ("level", "capacity", "items", "current_weight", "metrics")
+
+    def __init__(self, level: ErrorLevel, capacity: int) -> None:
+        self.level = level
+        self.capacity = capacity
+        # (sequence number, enqueue time, item)
+        self.items: Deque[Tuple[int, float, Any]] = collections.deque()
+        self.current_weight = 0
+        label = level.value
+        self.metrics = {
+            "queued": metric_name("lane_events_queued", level=label),
+            "full": metric_name("lane_events_dropped", level=label, reason="queue_full"),
+            "evicted": metric_name("lane_events_dropped", level=label, reason="evicted"),
+            "wait": metric_name("lane_wait_seconds", level=label),
+            "depth": metric_name("lane_depth", level=label),
+        }
+
+    def depth(self) -> int:
+        return len(self.items)
+
+
+class _Wakeup:
+    pass
+
+
+# Returned by ``get`` after ``wake``: there is work outside the lanes
+WAKEUP = _Wakeup()
+
+
+class PriorityLanes:
+    """
+    The worker's queue, split into one bounded lane per ``ErrorLevel``.
+
+    ``get`` always takes from the ERROR lane first; the other lanes share
+    what is left by weight (``LANE_WEIGHTS``, smooth weighted round-robin),
+    so a flood of warnings slows info events down but never stops them.
+    Each lane may fill its share of ``maxsize``; when the queue as a whole is
+    full, an item pushes out the oldest item of the lowest non-empty lane
+    below its own level, so lower levels are dropped first.
+
+    Control markers (flush/stop) are handed out once every item queued
+    before them has been taken, whatever lane it is in.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._lanes = {
+            level: _Lane(level, max(1, int(maxsize * LANE_SHARES[level]))) for level in PRIORITY
+        }
+        self._controls: Deque[Tuple[int, Any]] = collections.deque()
+        self._size = 0
+        self._sequence = 0
+        self._woken = False
+        self._condition = threading.Condition(threading.Lock())
+
+    def qsize(self) -> int:
+        return self._size
+
+    def put_nowait(self, item: Any, level: ErrorLevel = ErrorLevel.ERROR) -> Optional[Any]:
+        """
+        Queues ``item`` and returns the item evicted to make room for it, if
+        any. Raises ``queue.Full`` if ``item`` itself can't be queued.
+        """
+        with self._condition:
+            evicted = self._put(item, level, time.monotonic())
+            self._condition.notify()
+
+        registry.inc(self._lanes[level].metrics["queued"])
+        return evicted
+
+    def put_many(self, entries: Iterable[Tuple[Any, ErrorLevel]]) -> List[Tuple[Any, str]]:
+        """
+        Queues several items under a single acquisition of the lock. Returns
+        the dropped items with the reason, "evicted" or "queue_full".
+        """
+        dropped = []
+        queued = []
+        now = time.monotonic()
+        with self._condition:
+            for item, level in entries:
+                try:
+                    evicted = self._put(item, level, now)
+                except queue.Full:
+                    dropped.append((item, "queue_full"))
+                    continue
+
+                queued.append(level)
+                if evicted is not None:
+                    dropped.append((evicted, "evicted"))
+            self._condition.notify()
+
+        for level in queued:
+            registry.inc(self._lanes[level].metrics["queued"])
+        return dropped
+
+    def put_control(self, marker: Any) -> None:
+        with self._condition:
+            self._sequence += 1
+            self._controls.append((self._sequence, marker))
+            self._condition.notify()
+
+    def wake(self) -> None:
+        """Makes the next ``get`` return ``WAKEUP`` ahead of anything queued."""
+        with self._condition:
+            self._woken = True
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Takes the next item or due marker. Raises ``queue.Empty`` on timeout."""
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._size > 0 or bool(self._controls) or self._woken, timeout
+            ):
+                raise queue.Empty
+
+            if self._woken:
+                self._woken = False
+                return WAKEUP
+
+            if self._controls and self._controls[0][0] < self._oldest_sequence():
+                return self._controls.popleft()[1]
+
+            lane = self._next_lane()
+            _, enqueued, item = lane.items.popleft()
+            self._size -= 1
+
+        registry.observe(lane.metrics["wait"], time.monotonic() - enqueued)
+        return item
+
+    def register_gauges(self) -> None:
+        for lane in self._lanes.values():
+            registry.register_gauge(lane.metrics["depth"], lane.depth)
+
+    def unregister_gauges(self) -> None:
+        for lane in self._lanes.values():
+            registry.unregister_gauge(lane.metrics["depth"], lane.depth)
+
+    def _put(self, item: Any, level: ErrorLevel, now: float) -> Optional[Any]:
+        lane = self._lanes[level]
+        if lane.depth() >= lane.capacity:
+            registry.inc(lane.metrics["full"])
+            raise queue.Full
+
+        evicted = None
+        if self._size >= self.maxsize:
+            victim = self._eviction_lane(level)
+            if victim is None:
+                registry.inc(lane.metrics["full"])
+                raise queue.Full
+            _, _, evicted = victim.items.popleft()
+            self._size -= 1
+            registry.inc(victim.metrics["evicted"])
+
+        self._sequence += 1
+        lane.items.append((self._sequence, now, item))
+        self._size += 1
+        return evicted
+
+    def _oldest_sequence(self) -> float:
+        heads = [lane.items[0][0] for lane in self._lanes.values() if lane.items]
+        return min(heads) if heads else float("inf")
+
+    def _eviction_lane(self, level: ErrorLevel) -> Optional[_Lane]:
+        for candidate in reversed(PRIORITY):
+            if candidate == level:
+                return None
+            if self._lanes[candidate].items:
+                return self._lanes[candidate]
+        return None
+
+    def _next_lane(self) -> _Lane:
+        errors = self._lanes[ErrorLevel.ERROR]
+        if errors.items:
+            return errors
+
+        # Smooth weighted round-robin over the non-empty lower lanes
+        ready = [self._lanes[level] for level in LANE_WEIGHTS if self._lanes[level].items]
+        total = 0
+        for lane in ready:
+            lane.current_weight += LANE_WEIGHTS[lane.level]
+            total += LANE_WEIGHTS[lane.level]
+        chosen = max(ready, key=lambda lane: lane.current_weight)
+        chosen.current_weight -= total
+        return chosen
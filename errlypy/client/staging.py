@@ -0,0 +1,86 @@
+import collections
+import sys
+import threading
+from typing import Any, Deque, List, Tuple
+
+from errlypy.models.ingest import ErrorLevel
+
+Entry = Tuple[Any, ErrorLevel]
+
+
+def free_threaded() -> bool:
+    """True on a free-threaded build running with the GIL disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+class _Buffer:
+    __slots__ = ("thread", "entries")
+
+    def __init__(self) -> None:
+        self.thread = threading.current_thread()
+        self.entries: Deque[Entry] = collections.deque()
+
+
+class StagingBuffers:
+    """
+    One buffer per producer thread, so capturing threads don't all contend on
+    the worker queue's lock for every event.
+
+    ``stage`` appends to the calling thread's own deque and returns its new
+    length: the caller wakes the worker when it is 1 and moves the whole
+    buffer itself once it reaches ``handoff_size``. Any thread may take
+    entries, a deque can be popped from while its owner appends to it.
+    """
+
+    def __init__(self, handoff_size: int = 32) -> None:
+        self.handoff_size = handoff_size
+        self._local = threading.local()
+        # Copied on write, so ``take_all`` can iterate it without the lock
+        self._buffers: List[_Buffer] = []
+        self._lock = threading.Lock()
+
+    def stage(self, item: Any, level: ErrorLevel) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._register()
+
+        buffer.entries.append((item, level))
+        return len(buffer.entries)
+
+    def take(self) -> List[Entry]:
+        """Takes everything staged by the calling thread."""
+        buffer = getattr(self._local, "buffer", None)
+        return [] if buffer is None else _drain(buffer.entries)
+
+    def take_all(self) -> List[Entry]:
+        """Takes everything staged by any thread."""
+        entries: List[Entry] = []
+        exited = False
+        for buffer in self._buffers:
+            entries.extend(_drain(buffer.entries))
+            exited = exited or not buffer.thread.is_alive()
+
+        if exited:
+            # A thread that has exited can't stage again, its drained buffer can go
+            with self._lock:
+                self._buffers = [
+                    buffer for buffer in self._buffers if buffer.thread.is_alive() or buffer.entries
+                ]
+        return entries
+
+    def _register(self) -> _Buffer:
+        buffer = _Buffer()
+        with self._lock:
+            self._buffers = [*self._buffers, buffer]
+        self._local.buffer = buffer
+        return buffer
+
+
+def _drain(entries: Deque[Entry]) -> List[Entry]:
+    drained = []
+    while True:
+        try:
+            drained.append(entries.popleft())
+        except IndexError:
+            return drained
@@ -1,60 +1,211 @@
-import json
+import base64
+import gzip
+import http.client
 import logging
+import threading
+import time
 import urllib.request
-from typing import Any
-from urllib.error import HTTPError, URLError
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import SplitResult, unquote, urlsplit
 
-from errlypy.internal.encoder import DataclassJsonEncoder
+from errlypy.internal.metrics import metric_name, registry
+from errlypy.internal.wire import WIRE_FORMATS
 
-logger = logging.getLogger(__file__)
+logger = logging.getLogger(__name__)
+
+_NETWORK_FAILURE = metric_name("request_failures", reason="network")
+_HTTP_FAILURE = metric_name("request_failures", reason="http")
 
 
 class URLLibClient:
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: float = 30,
+        compress: bool = False,
+        wire_format: str = "json",
+    ):
         self._base_url = base_url.rstrip("/")  # Remove trailing slash
         self._api_key = api_key
+        self._timeout = timeout
+        # Send bodies gzip-encoded (Content-Encoding: gzip)
+        self._compress = compress
+        # Body encoding, announced through the Content-Type header
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(
+                f"Unknown wire format {wire_format!r}, expected one of {list(WIRE_FORMATS)}"
+            )
+        self._content_type, self._encode = WIRE_FORMATS[wire_format]
+        # Single keep-alive connection reused for every POST
+        self._connection: Optional[http.client.HTTPConnection] = None
+        # Set while the connection goes through a proxy to a plain HTTP API
+        self._proxy_headers: Optional[Dict[str, str]] = None
+        self._connection_lock = threading.Lock()
         self.setup_dns_cache()
 
     def get(self, url: str) -> Any:
         with urllib.request.urlopen(url) as response:
             return response.read()
 
-    def post(self, url, data) -> None:
-        json_data = json.dumps(data, cls=DataclassJsonEncoder).encode("utf-8")
+    def post(self, url, data) -> Optional[str]:
+        return self.send(url, self.encode(data))
+
+    def encode(self, data) -> bytes:
+        """Returns the request body for ``data``, compressed if enabled."""
+        start = time.perf_counter()
+        body = self._encode(data)
+        registry.observe("serialize_seconds", time.perf_counter() - start)
 
         # Debug logging only if DEBUG level is enabled
         if logger.isEnabledFor(logging.DEBUG):
-            logger.debug(f"Sending POST to {self._base_url}/{url}")
-            logger.debug(f"Data: {json_data.decode('utf-8')}")
+            logger.debug(f"Data: {body.decode('utf-8', errors='replace')}")
 
-        request = urllib.request.Request(
-            f"{self._base_url}/{url}",
-            data=json_data,
-            headers=self.headers(),
-            method="POST",
-        )
+        if self._compress:
+            body = gzip.compress(body, compresslevel=6)
 
+        return body
+
+    def send(self, url, body: bytes) -> Optional[str]:
+        """Posts a body produced by ``encode``; returns None if it was not accepted."""
+        status, response_data = self.deliver(url, body)
+        if status is None or status >= 400:
+            return None
+        return response_data
+
+    def deliver(self, url, body: bytes) -> Tuple[Optional[int], str]:
+        """
+        Posts a body produced by ``encode``; returns the response status and
+        body, or a None status if the request failed on the network.
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Sending POST to {self._base_url}/{url}")
+
+        start = time.perf_counter()
         try:
-            with urllib.request.urlopen(request) as response:
-                response_data = response.read().decode("utf-8")
-                return response_data
-        except HTTPError as e:
-            # Read error body only once
+            status, response_data = self._request("POST", url, body)
+        except (OSError, http.client.HTTPException) as exc:
+            registry.inc(_NETWORK_FAILURE)
+            logger.warning(f"Unable to post to Errly: {exc}")
+            # Don't interrupt application due to network errors
+            return None, ""
+        finally:
+            registry.inc("requests")
+            registry.observe("send_seconds", time.perf_counter() - start)
+
+        registry.inc("bytes_sent", len(body))
+        if status >= 400:
+            registry.inc(_HTTP_FAILURE)
+            logger.error(f"HTTP Error {status}: {response_data}")
+
+        return status, response_data
+
+    def close(self) -> None:
+        """Closes the pooled connection; the next request opens a new one."""
+        with self._connection_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def reset_after_fork(self) -> None:
+        """
+        Called in a forked child: forgets the connection shared with the parent
+        without closing it, so the parent's stream is left untouched.
+        """
+        self._connection = None
+        self._connection_lock = threading.Lock()
+
+    def _request(self, method: str, url: str, body: bytes) -> Tuple[int, str]:
+        with self._connection_lock:
+            reused = self._connection is not None
             try:
-                error_body = e.read().decode("utf-8")
-            except Exception:
-                error_body = "Unable to read error body"
+                return self._send(method, url, body)
+            except (OSError, http.client.HTTPException):
+                # A kept-alive connection may have been closed by the server in
+                # the meantime, so retry once on a fresh one.
+                if not reused:
+                    raise
 
-            logger.error(f"HTTP Error {e.code}: {error_body}")
-        except URLError as exc:
-            logger.warning(f"Unable to post to Errly: {exc.reason}")
-            # Don't interrupt application due to network errors
+            return self._send(method, url, body)
+
+    def _send(self, method: str, url: str, body: bytes) -> Tuple[int, str]:
+        connection, path = self._get_connection(url)
+        try:
+            headers = self.headers()
+            if self._proxy_headers is not None:
+                headers.update(self._proxy_headers)
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response_data = response.read().decode("utf-8", errors="replace")
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._connection = None
+            raise
+
+        if response.will_close:
+            connection.close()
+            self._connection = None
+
+        return response.status, response_data
+
+    def _get_connection(self, url: str) -> Tuple[http.client.HTTPConnection, str]:
+        parts = urlsplit(f"{self._base_url}/{url}")
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unknown url type: {self._base_url!r}")
+
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        if self._connection is None:
+            self._connection = self._connect(parts)
+        if self._proxy_headers is not None:
+            # A proxy forwarding plain HTTP is sent the full URL
+            path = f"{parts.scheme}://{parts.netloc}{path}"
+
+        return self._connection, path
+
+    def _connect(self, parts: SplitResult) -> http.client.HTTPConnection:
+        """
+        Opens a connection to the API, through the proxy named by the
+        ``HTTP(S)_PROXY`` and ``NO_PROXY`` variables as urllib does. HTTPS
+        goes through a CONNECT tunnel, plain HTTP is forwarded by the proxy.
+        """
+        self._proxy_headers = None
+        proxy = urllib.request.getproxies().get(parts.scheme)
+        if not proxy or urllib.request.proxy_bypass(parts.hostname or ""):
+            if parts.scheme == "https":
+                return http.client.HTTPSConnection(parts.netloc, timeout=self._timeout)
+            return http.client.HTTPConnection(parts.netloc, timeout=self._timeout)
+
+        proxy_parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        headers = {}
+        if proxy_parts.username:
+            credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+            headers["Proxy-Authorization"] = "Basic " + base64.b64encode(
+                credentials.encode()
+            ).decode("ascii")
+
+        if parts.scheme == "https":
+            connection = http.client.HTTPSConnection(
+                proxy_parts.hostname or "", proxy_parts.port, timeout=self._timeout
+            )
+            connection.set_tunnel(parts.hostname or "", parts.port, headers=headers)
+            return connection
+
+        self._proxy_headers = headers
+        return http.client.HTTPConnection(
+            proxy_parts.hostname or "", proxy_parts.port, timeout=self._timeout
+        )
 
     def headers(self):
-        return {
-            "Content-Type": "application/json",
+        headers = {
+            "Content-Type": self._content_type,
             "Authorization": f"Bearer {self._api_key}",
         }
+        if self._compress:
+            headers["Content-Encoding"] = "gzip"
+        return headers
 
     def setup_dns_cache(self):
         opener = urllib.request.build_opener()
@@ -0,0 +1,296 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from errlypy.client.lanes import WAKEUP, PriorityLanes
+from errlypy.client.staging import Entry, StagingBuffers, free_threaded
+from errlypy.internal.config import HTTPErrorConfig
+from errlypy.internal.metrics import metric_name, registry
+from errlypy.models.ingest import ErrorLevel, IngestEvent, IngestRequest
+
+logger = logging.getLogger(__name__)
+
+EventFactory = Callable[[], Optional[IngestEvent]]
+
+_worker_thread_state = threading.local()
+
+_DROPPED_QUEUE_FULL = metric_name("events_dropped", reason="queue_full")
+_DROPPED_CLOSED = metric_name("events_dropped", reason="closed")
+_DROPPED_EVICTED = metric_name("events_dropped", reason="evicted")
+
+
+class _FlushMarker:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class _StopMarker:
+    pass
+
+
+class _TrackedFactory:
+    """A factory whose caller waits on ``future`` to learn if it was delivered."""
+
+    __slots__ = ("factory", "future")
+
+    def __init__(self, factory: EventFactory, future: "Future[bool]") -> None:
+        self.factory = factory
+        self.future = future
+
+
+def _resolve(future: "Future[bool]", delivered: bool) -> None:
+    if not future.done():
+        future.set_result(delivered)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+class BatchWorker:
+    """
+    Background sender shared by the integrations.
+
+    Producers submit zero-argument factories; the worker thread calls them to
+    build ``IngestEvent`` objects, groups the results into ``IngestRequest``
+    batches and posts them through the client. Submitting never blocks: when
+    the queue is full the item is dropped. Factories are queued in a lane per
+    level (see ``PriorityLanes``), so errors are built and sent first and
+    lower levels are dropped first.
+
+    With ``staging`` (the default on free-threaded builds) producers append
+    to a buffer of their own thread instead, which the worker collects after
+    a single wakeup and producers hand over whole once it is full, so the
+    queue's lock is taken once per burst rather than once per event. A
+    staged event that doesn't fit in the queue is dropped at handover, after
+    ``submit`` has returned True.
+
+    A factory may come with a future that is resolved with True once its event
+    has been posted, or with False if it was dropped, could not be built or
+    the post failed (the client raised or returned None).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_queue_size: int = 1000,
+        max_batch_size: int = 50,
+        flush_interval: float = 1.0,
+        staging: Optional[bool] = None,
+    ) -> None:
+        self._client = client
+        self._max_batch_size = max_batch_size
+        self._flush_interval = flush_interval
+        self._queue = PriorityLanes(max_queue_size)
+        self._staging = (
+            StagingBuffers() if (free_threaded() if staging is None else staging) else None
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._dropped_lock = threading.Lock()
+        self._closed = False
+        self.dropped = 0
+
+    @staticmethod
+    def in_worker_thread() -> bool:
+        """Returns True when called from a worker thread (e.g. by the transport)."""
+        return getattr(_worker_thread_state, "active", False)
+
+    def submit(
+        self,
+        factory: EventFactory,
+        future: "Optional[Future[bool]]" = None,
+        level: ErrorLevel = ErrorLevel.ERROR,
+    ) -> bool:
+        """Queues a factory for off-thread conversion. Returns False if it was dropped."""
+        if self._closed:
+            registry.inc(_DROPPED_CLOSED)
+            if future is not None:
+                _resolve(future, False)
+            return False
+
+        self._ensure_started()
+        item = factory if future is None else _TrackedFactory(factory, future)
+        staging = self._staging
+        if staging is not None:
+            staged = staging.stage(item, level)
+            if staged >= staging.handoff_size:
+                self._hand_over(staging.take())
+            elif staged == 1:
+                self._queue.wake()
+            registry.inc("events_queued")
+            return True
+
+        try:
+            evicted = self._queue.put_nowait(item, level)
+        except queue.Full:
+            self._discard(item, _DROPPED_QUEUE_FULL)
+            return False
+
+        if evicted is not None:
+            # A lower level item made room for this one
+            self._discard(evicted, _DROPPED_EVICTED)
+
+        registry.inc("events_queued")
+        return True
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Sends everything queued so far. Returns False if the timeout expired."""
+        if self._thread is None:
+            return True
+
+        if self._staging is not None:
+            self._hand_over(self._staging.take_all())
+        marker = _FlushMarker()
+        self._queue.put_control(marker)
+
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Sends everything queued so far and stops the worker thread. Later
+        submissions are rejected. Returns False if the timeout expired first.
+        """
+        self._closed = True
+        thread = self._thread
+        if thread is None:
+            return True
+
+        if self._staging is not None:
+            self._hand_over(self._staging.take_all())
+        self._queue.put_control(_StopMarker())
+
+        thread.join(timeout)
+        if thread.is_alive():
+            return False
+
+        self._thread = None
+        registry.unregister_gauge("queue_depth", self.queue_depth)
+        self._queue.unregister_gauges()
+        return True
+
+    def reset_after_fork(self) -> None:
+        """
+        Called in a forked child. The parent still owns and delivers everything
+        queued before the fork, so the child starts from an empty queue, no
+        thread and fresh locks (the parent's may have been held while forking).
+        """
+        self._queue = PriorityLanes(self._queue.maxsize)
+        if self._staging is not None:
+            self._staging = StagingBuffers(self._staging.handoff_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._dropped_lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._closed:
+                return
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="errlypy-worker", daemon=True
+                )
+                self._thread.start()
+                registry.register_gauge("queue_depth", self.queue_depth)
+                self._queue.register_gauges()
+
+    def _run(self) -> None:
+        _worker_thread_state.active = True
+        batch: List[IngestEvent] = []
+        # Futures of the tracked events in ``batch``
+        futures: "List[Future[bool]]" = []
+
+        while True:
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                self._send(batch, futures)
+                batch, futures = [], []
+                continue
+
+            if item is WAKEUP:
+                if self._staging is not None:
+                    self._hand_over(self._staging.take_all())
+                continue
+
+            if isinstance(item, _StopMarker):
+                self._send(batch, futures)
+                return
+
+            if isinstance(item, _FlushMarker):
+                self._send(batch, futures)
+                batch, futures = [], []
+                item.done.set()
+                continue
+
+            if isinstance(item, _TrackedFactory):
+                event = self._build(item.factory)
+                if event is None:
+                    _resolve(item.future, False)
+                else:
+                    futures.append(item.future)
+            else:
+                event = self._build(item)
+
+            if event is not None:
+                batch.append(event)
+
+            if len(batch) >= self._max_batch_size:
+                self._send(batch, futures)
+                batch, futures = [], []
+
+    def _hand_over(self, entries: List[Entry]) -> None:
+        if not entries:
+            return
+
+        for item, reason in self._queue.put_many(entries):
+            self._discard(item, _DROPPED_EVICTED if reason == "evicted" else _DROPPED_QUEUE_FULL)
+
+    def _discard(self, item: Any, metric: str) -> None:
+        with self._dropped_lock:
+            self.dropped += 1
+        registry.inc(metric)
+        if isinstance(item, _TrackedFactory):
+            _resolve(item.future, False)
+
+    def _build(self, factory: EventFactory) -> Optional[IngestEvent]:
+        start = time.perf_counter()
+        try:
+            event = factory()
+        except Exception:
+            registry.inc("event_build_errors")
+            logger.debug("Unable to build Errly event", exc_info=True)
+            return None
+        finally:
+            registry.observe("event_build_seconds", time.perf_counter() - start)
+
+        return event
+
+    def _send(self, batch: List[IngestEvent], futures: "List[Future[bool]]") -> None:
+        if not batch:
+            return
+
+        registry.inc("batches_sent")
+        delivered = False
+        try:
+            response = self._client.post(HTTPErrorConfig.endpoint, IngestRequest(events=batch))
+            delivered = response is not None
+        except Exception:
+            # Never let transport failures kill the worker thread
+            logger.debug("Unable to deliver Errly batch", exc_info=True)
+        finally:
+            registry.inc("events_sent" if delivered else "events_failed", len(batch))
+            for future in futures:
+                _resolve(future, delivered)
@@ -1,5 +1,11 @@
 import re
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from errlypy.exception.scrubber import DEFAULT_KEY_PATTERNS, DEFAULT_VALUE_PATTERNS
+
+if TYPE_CHECKING:
+    from errlypy.client.fanout import Destination
 
 
 @dataclass
@@ -10,6 +16,38 @@ class ErrlyConfig:
     debug: bool = False
     timeout: int = 30
     max_retries: int = 3
+    # Upper bound for delivering queued events when the interpreter exits
+    shutdown_timeout: float = 2.0
+    # Time one capture may spend on locals, source lines and frames
+    capture_time_budget: Optional[float] = 0.05
+    # Frames kept per capture, split between the outermost and innermost ones
+    max_frames: Optional[int] = 100
+    # Regexes for sensitive variable/key names and for sensitive values
+    scrub_keys: Sequence[str] = DEFAULT_KEY_PATTERNS
+    scrub_values: Sequence[str] = DEFAULT_VALUE_PATTERNS
+    # Record serialized batches in memory (or in dry_mode_path) instead of sending
+    dry_mode: bool = False
+    dry_mode_path: Optional[str] = None
+    dry_mode_capacity: int = 1000
+    # Hand batches to a host-local errlypy.agent on this socket instead of sending
+    agent_socket: Optional[str] = None
+    # Request body encoding: "json" or "binary" (see errlypy.internal.wire)
+    wire_format: str = "json"
+    # Gzip request bodies (Content-Encoding: gzip); fanned out bodies are compressed once
+    compress: bool = False
+    # Further Errly instances every batch is also sent to, encoded only once
+    destinations: "Sequence[Destination]" = ()
+    # Seconds between samples of every thread's stack; None disables the profiler
+    profile_interval: Optional[float] = None
+    # Seconds after which a request still running is reported; None disables it
+    slow_request_threshold: Optional[float] = None
+    # Seconds of event loop lag reported with the blocking stack; None disables it
+    loop_lag_threshold: Optional[float] = None
+    # Time every garbage collection and add recent ones to events
+    gc_monitoring: bool = False
+    # Record the SQL of every Django request; optionally report N+1 queries
+    record_queries: bool = False
+    report_n_plus_one: bool = False
 
     def validate_api_key(self) -> bool:
         pattern = r"^errly_[a-z0-9]{4}_[a-f0-9]{64}$"
@@ -1,13 +1,13 @@
 from typing import ClassVar, List, Optional, Union
 from uuid import uuid4
 
-from errlypy.api import IModule, IUninitializedModule
+from errlypy.api import IModule, IPlugin, IUninitializedModule
 from errlypy.client import HTTPClient
-from errlypy.client.urllib import URLLibClient
 from errlypy.django.events import OnDjangoExceptionHasBeenParsedEvent
-from errlypy.django.plugin import DjangoExceptionPlugin
+from errlypy.django.plugin import DjangoExceptionPlugin, DjangoRequestPlugin
 from errlypy.internal.event.on_plugin_initialized import OnPluginInitializedEvent
 from errlypy.internal.event.type import EventType
+from errlypy.utils import singleton_instance
 
 
 class UninitializedDjangoModule(IUninitializedModule):
@@ -19,9 +19,7 @@ class UninitializedDjangoModule(IUninitializedModule):
     _instance: ClassVar[Optional["UninitializedDjangoModule"]] = None
 
     def __new__(cls) -> "UninitializedDjangoModule":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+        return singleton_instance(cls)
 
     @staticmethod
     def _initialize_plugin(
@@ -44,12 +42,13 @@ class UninitializedDjangoModule(IUninitializedModule):
         return True
 
     @classmethod
-    def setup(
-        cls, base_url: str, api_key: str, environment: str = "production"
-    ) -> Union["IModule", "IUninitializedModule"]:
+    def setup(cls, http_client: HTTPClient) -> Union["IModule", "IUninitializedModule"]:
         """
         Initializes the Django module and transitions to initialized state.
 
+        Args:
+            http_client: Shared client every captured exception is published to
+
         Returns:
             DjangoModule: Initialized Django module instance
 
@@ -61,29 +60,23 @@ class UninitializedDjangoModule(IUninitializedModule):
         if not cls._verify_django_installed():
             return UninitializedDjangoModule()
 
-        http_client = HTTPClient(
-            client=URLLibClient(
-                base_url=base_url,
-                api_key=api_key,
-            ),
-            environment=environment,
-        )
-
         exc_has_been_parsed_event = EventType[OnDjangoExceptionHasBeenParsedEvent]()
         on_initialized_event = EventType[OnPluginInitializedEvent]()
 
         exc_has_been_parsed_event.subscribe(
-            http_client.send_through_urllib,
+            http_client.enqueue,
         )
 
         plugin = cls._initialize_plugin(exc_has_been_parsed_event)
+        request_plugin = DjangoRequestPlugin(http_client)
+        request_plugin.setup()
 
         on_initialized_event.notify(
             OnPluginInitializedEvent(event_id=uuid4()),
         )
 
         return DjangoModule(
-            plugins=[plugin],
+            plugins=[plugin, request_plugin],
             events=[exc_has_been_parsed_event, on_initialized_event],
         )
 
@@ -95,20 +88,18 @@ class DjangoModule(IModule):
     """
 
     _instance: ClassVar[Optional["DjangoModule"]] = None
-    _plugins: List[DjangoExceptionPlugin]
+    _plugins: List[IPlugin]
     _events: List[EventType]
 
     def __new__(cls, *args, **kwargs) -> "DjangoModule":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+        return singleton_instance(cls)
 
-    def __init__(self, plugins: List[DjangoExceptionPlugin], events: List[EventType]) -> None:
+    def __init__(self, plugins: List[IPlugin], events: List[EventType]) -> None:
         """
         Initializes the Django module with plugins and events.
 
         Args:
-            plugins: List of Django exception plugins
+            plugins: The exception and request tracking plugins
             events: List of event handlers
         """
         self._plugins = plugins
@@ -122,10 +113,11 @@ class DjangoModule(IModule):
         Returns:
             UninitializedDjangoModule: Uninitialized module instance
         """
-        for plugin in cls._plugins:
-            plugin.revert()
+        if cls._instance is not None:
+            for plugin in cls._instance._plugins:
+                plugin.revert()
 
-        for event in cls._events:
-            event.unsubscribe_all()
+            for event in cls._instance._events:
+                event.unsubscribe_all()
 
         return UninitializedDjangoModule()
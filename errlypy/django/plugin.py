@@ -1,13 +1,25 @@
+import dataclasses
+import functools
+import threading
+from contextvars import Token
 from types import TracebackType
-from typing import Any, Tuple, Type
+from typing import Any, Optional, Set, Tuple, Type
 from uuid import uuid4
 
-from django.core.handlers import exception
-
+from errlypy import capture
 from errlypy.api import IPlugin
+from errlypy.client import HTTPClient
+from errlypy.django import queries
 from errlypy.django.events import OnDjangoExceptionHasBeenParsedEvent
+from errlypy.django.queries import QueryRecorder
 from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.internal.config import AsyncioConfig, QueryConfig, WatchdogConfig, register_loop
 from errlypy.internal.event.type import EventType
+from errlypy.internal.metrics import registry
+from errlypy.models.ingest import ErrorLevel
+
+# N+1 queries already reported, per route and query shape
+_MAX_REPORTED = 1000
 
 
 class DjangoExceptionPlugin(IPlugin):
@@ -19,12 +31,16 @@ class DjangoExceptionPlugin(IPlugin):
         self,
         on_exc_has_been_parsed_event_instance: EventType[OnDjangoExceptionHasBeenParsedEvent],
     ):
+        from django.core.handlers import exception
+
         self._on_exc_has_been_parsed_event_instance = on_exc_has_been_parsed_event_instance
         self._callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
         self._original_fn = exception.handle_uncaught_exception
         exception.handle_uncaught_exception = self
 
     def revert(self):
+        from django.core.handlers import exception
+
         exception.handle_uncaught_exception = self._original_fn
 
     def __call__(
@@ -34,9 +50,170 @@ class DjangoExceptionPlugin(IPlugin):
         exc_info: Tuple[Type[BaseException], BaseException, TracebackType],
     ) -> Any:
         response = self._callback(exc_info[0], exc_info[1], exc_info[2])
+        recorder = queries.current()
+        if recorder is not None:
+            # Taken now; the request may run more queries before it ends
+            response = dataclasses.replace(response, context={"queries": recorder.summary()})
 
         self._on_exc_has_been_parsed_event_instance.notify(
             OnDjangoExceptionHasBeenParsedEvent(event_id=uuid4(), data=response),
         )
 
         return self._original_fn(request, resolver, exc_info)
+
+
+class DjangoRequestPlugin(IPlugin):
+    """
+    Wraps ``BaseHandler.get_response`` (WSGI) and ``get_response_async``
+    (ASGI) so in-flight requests are known to the slow request watchdog,
+    the event loops serving ASGI requests to asyncio exception capture and
+    the loop lag monitor, and the
+    SQL of each request is recorded when query recording is on. Requests
+    pass straight through while all of them are off.
+    """
+
+    def __init__(self, http_client: Optional[HTTPClient] = None) -> None:
+        # Where N+1 warnings are sent
+        self._http_client = http_client
+        self._reported: Set[Tuple[str, str]] = set()
+        self._reported_lock = threading.Lock()
+
+    def setup(self):
+        from django.core.handlers.base import BaseHandler
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        plugin = self
+        self._original_get_response = BaseHandler.get_response
+        self._original_get_response_async = BaseHandler.get_response_async
+
+        def get_response(handler, request):
+            return plugin(handler, request)
+
+        async def get_response_async(handler, request):
+            return await plugin.call_async(handler, request)
+
+        BaseHandler.get_response = get_response  # type: ignore[method-assign]
+        BaseHandler.get_response_async = get_response_async  # type: ignore[method-assign]
+
+        if QueryConfig.enabled:
+            # Connections of other threads get the hook when they connect
+            connection_created.connect(self._on_connection_created)
+            for connection in connections.all():
+                queries.install(connection)
+
+    def revert(self):
+        from django.core.handlers.base import BaseHandler
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        BaseHandler.get_response = self._original_get_response  # type: ignore[method-assign]
+        BaseHandler.get_response_async = self._original_get_response_async  # type: ignore[method-assign]
+
+        connection_created.disconnect(self._on_connection_created)
+        for connection in connections.all():
+            queries.uninstall(connection)
+
+    def __call__(self, handler, request) -> Any:
+        watchdog = WatchdogConfig.watchdog
+        if watchdog is None and not QueryConfig.enabled:
+            return self._original_get_response(handler, request)
+
+        token = (
+            watchdog.begin(
+                f"{request.method} {request.path}",
+                resolve_route=functools.partial(_route, request),
+            )
+            if watchdog is not None
+            else None
+        )
+        recording = self._start_recording()
+        try:
+            return self._original_get_response(handler, request)
+        finally:
+            if token is not None and watchdog is not None:
+                watchdog.end(token)
+            if recording is not None:
+                self._stop_recording(recording, request)
+
+    async def call_async(self, handler, request) -> Any:
+        watchdog = WatchdogConfig.watchdog
+        watches_loops = (
+            WatchdogConfig.loop_monitor is not None or AsyncioConfig.exception_handler is not None
+        )
+        if not watches_loops and watchdog is None and not QueryConfig.enabled:
+            return await self._original_get_response_async(handler, request)
+
+        import asyncio
+
+        register_loop(asyncio.get_running_loop())
+
+        token = (
+            watchdog.begin(
+                f"{request.method} {request.path}",
+                asyncio.current_task(),
+                functools.partial(_route, request),
+            )
+            if watchdog is not None
+            else None
+        )
+        recording = self._start_recording()
+        try:
+            return await self._original_get_response_async(handler, request)
+        finally:
+            if token is not None and watchdog is not None:
+                watchdog.end(token)
+            if recording is not None:
+                self._stop_recording(recording, request)
+
+    def _on_connection_created(self, sender, connection, **kwargs) -> None:
+        queries.install(connection)
+
+    def _start_recording(self) -> "Optional[Token[Optional[QueryRecorder]]]":
+        if not QueryConfig.enabled:
+            return None
+        return queries.start_recording(QueryConfig.n_plus_one_threshold)
+
+    def _stop_recording(self, token: "Token[Optional[QueryRecorder]]", request: Any) -> None:
+        recorder = queries.stop_recording(token)
+        if recorder is None:
+            return
+
+        registry.inc("django_queries", recorder.count)
+        registry.observe("django_query_time", recorder.duration)
+        if recorder.n_plus_one:
+            registry.inc("django_n_plus_one", len(recorder.n_plus_one))
+            if QueryConfig.report_n_plus_one and self._http_client is not None:
+                self._report_n_plus_one(self._http_client, recorder, _route(request))
+
+    def _report_n_plus_one(
+        self, http_client: HTTPClient, recorder: QueryRecorder, route: str
+    ) -> None:
+        for shape_sql in recorder.n_plus_one:
+            with self._reported_lock:
+                if (route, shape_sql) in self._reported:
+                    continue
+                if len(self._reported) >= _MAX_REPORTED:
+                    self._reported.clear()
+                self._reported.add((route, shape_sql))
+
+            shape = recorder.shape(shape_sql)
+            capture.submit(
+                http_client,
+                f"N+1 queries in {route}: the same query ran {shape['count']} times",
+                ErrorLevel.WARNING,
+                {"n_plus_one": "true", "route": route},
+                {"query": shape, "queries": recorder.summary()},
+            )
+
+
+def _route(request: Any) -> str:
+    """
+    The method and URL pattern a request was resolved to, e.g. ``GET
+    /books/<int:pk>/``, so every book is one route; the path when it
+    wasn't resolved.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is not None and match.route:
+        return f"{request.method} /{match.route}"
+    return f"{request.method} {request.path}"
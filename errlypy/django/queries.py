@@ -0,0 +1,165 @@
+import heapq
+import re
+import time
+from contextvars import ContextVar, Token
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Distinct query shapes kept per request; further ones are only counted
+MAX_SHAPES = 200
+# Slowest queries attached to an event
+SLOWEST = 5
+# Longest shape attached to an event
+MAX_SQL_LENGTH = 1000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize(sql: str) -> str:
+    """
+    The shape of a query: literals and parameters become ``?`` and lists of
+    them ``(...)``, so e.g. ``WHERE id = 1`` and ``WHERE id = 2`` or ``IN (1,
+    2)`` and ``IN (3, 4, 5)`` are the same shape. ORM queries repeat the
+    same SQL with other parameters, so the result is cached.
+    """
+    shape = _STRING.sub("?", sql)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _LIST.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class _Shape:
+    __slots__ = ("count", "duration")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+
+class QueryRecorder:
+    """
+    Counts and times the queries of one request, per query shape.
+
+    At most ``MAX_SHAPES`` shapes and the ``SLOWEST`` queries are kept, so a
+    request running thousands of queries still holds a bounded amount. A
+    SELECT shape repeated ``n_plus_one_threshold`` times is an N+1: one
+    query per row of an earlier result instead of a join or prefetch.
+    """
+
+    __slots__ = ("count", "duration", "dropped", "n_plus_one", "_shapes", "_slowest", "_threshold")
+
+    def __init__(self, n_plus_one_threshold: int = 5) -> None:
+        self.count = 0
+        self.duration = 0.0
+        # Queries whose shape didn't fit the table
+        self.dropped = 0
+        # Shapes detected as N+1, in the order they crossed the threshold
+        self.n_plus_one: List[str] = []
+        self._shapes: Dict[str, _Shape] = {}
+        self._slowest: List[Tuple[float, int, str]] = []
+        self._threshold = n_plus_one_threshold
+
+    def record(self, sql: str, duration: float) -> None:
+        shape_sql = normalize(sql)
+        self.count += 1
+        self.duration += duration
+
+        entry = (duration, self.count, shape_sql)
+        if len(self._slowest) < SLOWEST:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+        shape = self._shapes.get(shape_sql)
+        if shape is None:
+            if len(self._shapes) >= MAX_SHAPES:
+                self.dropped += 1
+                return
+            shape = self._shapes[shape_sql] = _Shape()
+
+        shape.count += 1
+        shape.duration += duration
+        if shape.count == self._threshold and shape_sql[:6].upper() == "SELECT":
+            self.n_plus_one.append(shape_sql)
+
+    def shape(self, shape_sql: str) -> Dict[str, Any]:
+        entry = self._shapes[shape_sql]
+        return {
+            "sql": shape_sql[:MAX_SQL_LENGTH],
+            "count": entry.count,
+            "duration": round(entry.duration, 6),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """The totals, slowest queries and N+1 shapes, as attached to events."""
+        summary: Dict[str, Any] = {
+            "count": self.count,
+            "duration": round(self.duration, 6),
+            "shapes": len(self._shapes),
+            "slowest": [
+                {"sql": shape_sql[:MAX_SQL_LENGTH], "duration": round(duration, 6)}
+                for duration, _, shape_sql in sorted(self._slowest, reverse=True)
+            ],
+        }
+        if self.n_plus_one:
+            summary["n_plus_one"] = [self.shape(shape_sql) for shape_sql in self.n_plus_one]
+        if self.dropped:
+            summary["dropped"] = self.dropped
+        return summary
+
+
+_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar("errlypy_queries", default=None)
+
+
+def start_recording(n_plus_one_threshold: int = 5) -> "Token[Optional[QueryRecorder]]":
+    """Records the queries run in the current context until ``stop_recording``."""
+    return _recorder.set(QueryRecorder(n_plus_one_threshold))
+
+
+def stop_recording(token: "Token[Optional[QueryRecorder]]") -> Optional[QueryRecorder]:
+    recorder = _recorder.get()
+    _recorder.reset(token)
+    return recorder
+
+
+def current() -> Optional[QueryRecorder]:
+    """The recorder of the request being handled, if queries are recorded."""
+    return _recorder.get()
+
+
+def record_query(
+    execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Dict[str, Any]
+) -> Any:
+    """A ``connection.execute_wrapper`` hook; passes queries straight through outside requests."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.record(sql, time.perf_counter() - start)
+
+
+def install(connection: Any) -> None:
+    """
+    Adds ``record_query`` to a connection for good. Connections are per
+    thread, and an ASGI request runs its queries on another thread than the
+    one it started on, so the hook can't be scoped to a request with
+    ``connection.execute_wrapper``; the recorder is found through a context
+    variable instead, which follows the request across threads.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def uninstall(connection: Any) -> None:
+    while record_query in connection.execute_wrappers:
+        connection.execute_wrappers.remove(record_query)
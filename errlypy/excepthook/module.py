@@ -1,22 +1,24 @@
-from typing import ClassVar, List, Optional, Union
+from typing import ClassVar, List, Optional, Type, Union
 from uuid import uuid4
 
 from errlypy.api import IModule, IPlugin, IUninitializedModule
 from errlypy.client import HTTPClient
-from errlypy.client.urllib import URLLibClient
 from errlypy.excepthook.events import OnExceptionHasBeenParsedEvent
-from errlypy.excepthook.plugin import ExceptHookPlugin
+from errlypy.excepthook.plugin import (
+    AsyncioExceptionHandlerPlugin,
+    ExceptHookPlugin,
+    ThreadingExceptHookPlugin,
+)
 from errlypy.internal.event.on_plugin_initialized import OnPluginInitializedEvent
 from errlypy.internal.event.type import EventType
+from errlypy.utils import singleton_instance
 
 
 class UninitializedExceptHookModule(IUninitializedModule):
     _instance: ClassVar[Optional["UninitializedExceptHookModule"]] = None
 
     def __new__(cls) -> "UninitializedExceptHookModule":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+        return singleton_instance(cls)
 
     @staticmethod
     def _initialize_plugin(
@@ -27,49 +29,65 @@ class UninitializedExceptHookModule(IUninitializedModule):
 
         return plugin
 
+    @staticmethod
+    def _initialize_background_plugins(
+        on_exception_has_been_parsed_event: EventType[OnExceptionHasBeenParsedEvent],
+    ) -> List[IPlugin]:
+        """Sets up capture for worker threads and asyncio event loops."""
+        threading_plugin = ThreadingExceptHookPlugin()
+        threading_plugin.setup(on_exception_has_been_parsed_event)
+
+        asyncio_plugin = AsyncioExceptionHandlerPlugin()
+        asyncio_plugin.setup(on_exception_has_been_parsed_event)
+
+        return [threading_plugin, asyncio_plugin]
+
     @classmethod
     def setup(
-        cls, base_url: str, api_key: str, environment: str = "production"
+        cls, http_client: HTTPClient
     ) -> Union["ExceptHookModule", "UninitializedExceptHookModule"]:
-        http_client = HTTPClient(
-            client=URLLibClient(
-                base_url=base_url,
-                api_key=api_key,
-            ),
-            environment=environment,
-        )
-
         exc_has_been_parsed_event = EventType[OnExceptionHasBeenParsedEvent]()
         on_initialized_event = EventType[OnPluginInitializedEvent]()
 
         exc_has_been_parsed_event.subscribe(
-            http_client.send_through_urllib,
+            http_client.enqueue,
         )
 
         plugin = cls._initialize_plugin(exc_has_been_parsed_event)
+        background_plugins = cls._initialize_background_plugins(exc_has_been_parsed_event)
 
         on_initialized_event.notify(
             OnPluginInitializedEvent(event_id=uuid4()),
         )
 
-        return ExceptHookModule(plugins=[plugin])
+        return ExceptHookModule(
+            plugins=[plugin, *background_plugins],
+            events=[exc_has_been_parsed_event, on_initialized_event],
+        )
 
 
 class ExceptHookModule(IModule):
     _instance: ClassVar[Optional["ExceptHookModule"]] = None
     _plugins: List[IPlugin]
+    _events: List[EventType]
 
     def __new__(cls, *args, **kwargs) -> "ExceptHookModule":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+        return singleton_instance(cls)
 
-    def __init__(self, plugins: List[IPlugin]) -> None:
+    def __init__(self, plugins: List[IPlugin], events: List[EventType]) -> None:
         self._plugins = plugins
+        self._events = events
+
+    def get_plugin(self, plugin_type: Type[IPlugin]) -> Optional[IPlugin]:
+        return next((plugin for plugin in self._plugins if isinstance(plugin, plugin_type)), None)
 
     @classmethod
     def revert(cls) -> IUninitializedModule:
-        for plugin in cls._plugins:
-            plugin.revert()
+        if cls._instance is not None:
+            for plugin in cls._instance._plugins:
+                plugin.revert()
+
+            for event in cls._instance._events:
+                event.unsubscribe_all()
 
         return UninitializedExceptHookModule()
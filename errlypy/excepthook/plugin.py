@@ -1,12 +1,18 @@
 import sys
+import threading
+import weakref
 from types import TracebackType
-from typing import Callable, Optional, Type
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Type
 from uuid import uuid4
 
 from errlypy.api import IPlugin
 from errlypy.excepthook.events import OnExceptionHasBeenParsedEvent
-from errlypy.exception.callback import ExceptionCallbackImpl
-from errlypy.internal.event.type import EventType
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.internal.config import AsyncioConfig
+from errlypy.internal.event.type import EventType, get_running_loop
+
+if TYPE_CHECKING:
+    import asyncio
 
 
 class ExceptHookPlugin(IPlugin):
@@ -36,3 +42,95 @@ class ExceptHookPlugin(IPlugin):
         self._on_exception_has_been_parsed_event.notify(
             OnExceptionHasBeenParsedEvent(event_id=uuid4(), data=response),
         )
+
+
+class ThreadingExceptHookPlugin(IPlugin):
+    """Captures exceptions that escape ``threading.Thread.run`` via ``threading.excepthook``."""
+
+    original_excepthook: Optional[Callable] = None
+
+    def __init__(
+        self,
+    ) -> None: ...
+
+    def setup(self, on_exception_has_been_parsed_event: EventType[OnExceptionHasBeenParsedEvent]):
+        self._on_exception_has_been_parsed_event = on_exception_has_been_parsed_event
+        self._callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+        self.original_excepthook = threading.excepthook
+        threading.excepthook = self
+
+    def revert(self):
+        threading.excepthook = self.original_excepthook
+
+    def __call__(self, args: "threading.ExceptHookArgs"):
+        if args.exc_type is not SystemExit and args.exc_value is not None:
+            response = self._callback(args.exc_type, args.exc_value, args.exc_traceback)
+
+            self._on_exception_has_been_parsed_event.notify(
+                OnExceptionHasBeenParsedEvent(event_id=uuid4(), data=response),
+            )
+
+        if self.original_excepthook is not None:
+            self.original_excepthook(args)
+
+
+class AsyncioExceptionHandlerPlugin(IPlugin):
+    """
+    Captures exceptions reported to an event loop's exception handler, e.g. from
+    tasks that were never awaited. Installed once per loop, so tasks themselves
+    are not wrapped; the previous handler is always called afterwards.
+    """
+
+    def __init__(
+        self,
+    ) -> None:
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Optional[Callable]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def setup(self, on_exception_has_been_parsed_event: EventType[OnExceptionHasBeenParsedEvent]):
+        self._on_exception_has_been_parsed_event = on_exception_has_been_parsed_event
+        self._callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+        # Loops started later are registered by the async integrations on
+        # their first request, or by ``Errly.register_loop``
+        AsyncioConfig.exception_handler = self
+
+        loop = get_running_loop()
+        if loop is not None:
+            self.register_loop(loop)
+
+    def register_loop(self, loop: "asyncio.AbstractEventLoop") -> None:
+        """Installs the plugin as the exception handler of ``loop``."""
+        if loop in self._loops:
+            return
+
+        self._loops[loop] = loop.get_exception_handler()
+        loop.set_exception_handler(self)
+
+    def revert(self):
+        if AsyncioConfig.exception_handler is self:
+            AsyncioConfig.exception_handler = None
+
+        for loop, previous_handler in list(self._loops.items()):
+            if not loop.is_closed():
+                loop.set_exception_handler(previous_handler)
+
+        self._loops.clear()
+
+    def __call__(self, loop: "asyncio.AbstractEventLoop", context: Dict[str, Any]):
+        exc = context.get("exception")
+
+        if isinstance(exc, Exception):
+            # Runs inside the loop: parsing is synchronous and delivery is left
+            # to the background worker, nothing is awaited or run here.
+            response = self._callback(type(exc), exc, exc.__traceback__)
+
+            self._on_exception_has_been_parsed_event.notify(
+                OnExceptionHasBeenParsedEvent(event_id=uuid4(), data=response),
+            )
+
+        previous_handler = self._loops.get(loop)
+        if previous_handler is not None:
+            previous_handler(loop, context)
+        else:
+            loop.default_exception_handler(context)
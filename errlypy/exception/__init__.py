@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 
 @dataclass(frozen=True)
@@ -11,7 +11,25 @@ class FrameDetail:
     locals: Optional[Dict[str, str]]
 
 
+@dataclass(frozen=True)
+class CollapsedFrames:
+    # Frames left out of ParsedExceptionDto.frames just before frames[index]
+    index: int
+    count: int
+    # When set, the left out frames repeat the ``repeat_of`` frames before them
+    repeat_of: int = 0
+
+
 @dataclass(frozen=True)
 class ParsedExceptionDto:
     content: str
     frames: List[FrameDetail] = field(default_factory=list)
+    # Capture stages skipped because the time budget ran out
+    skipped_stages: List[str] = field(default_factory=list)
+    truncated_frames: int = 0
+    collapsed: List[CollapsedFrames] = field(default_factory=list)
+    # Frames in the traceback before collapsing and max_frames; 0 when every
+    # frame is in ``frames``
+    depth: int = 0
+    # Integration context taken at capture time, added to the event's extra
+    context: Dict[str, Any] = field(default_factory=dict)
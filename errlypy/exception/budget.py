@@ -0,0 +1,47 @@
+import time
+from enum import Enum
+from typing import Dict, List, Optional
+
+
+class CaptureStage(str, Enum):
+    """Work a capture gives up, in order, once it runs over its time budget."""
+
+    LOCALS = "locals"
+    SOURCE_LINES = "source_lines"
+    FRAMES = "frames"
+
+
+# Multiples of the budget after which each stage is skipped
+_THRESHOLDS: Dict[CaptureStage, float] = {
+    CaptureStage.LOCALS: 1.0,
+    CaptureStage.SOURCE_LINES: 1.5,
+    CaptureStage.FRAMES: 2.0,
+}
+
+
+class CaptureBudget:
+    """
+    Time budget of a single capture.
+
+    ``allows`` is checked before each unit of optional work; once the elapsed
+    time passes a stage's threshold that stage is skipped for the rest of the
+    capture and recorded in ``skipped``.
+    """
+
+    def __init__(self, seconds: Optional[float]) -> None:
+        self._seconds = seconds
+        self._start = time.perf_counter()
+        self.skipped: List[CaptureStage] = []
+
+    def allows(self, stage: CaptureStage) -> bool:
+        if self._seconds is None:
+            return True
+
+        if stage in self.skipped:
+            return False
+
+        if time.perf_counter() - self._start < self._seconds * _THRESHOLDS[stage]:
+            return True
+
+        self.skipped.append(stage)
+        return False
@@ -1,4 +1,5 @@
-import sys
+import threading
+import time
 import traceback
 from dataclasses import dataclass
 from types import TracebackType
@@ -7,7 +8,10 @@ from typing import Any, Dict, Optional, Type, cast
 from errlypy.api import ExceptionCallback, ExceptionCallbackWithContext, Extractor
 from errlypy.client.credentials import Credentials
 from errlypy.exception import FrameDetail, ParsedExceptionDto
-from errlypy.exception.stack import StackSummaryWrapper
+from errlypy.exception.budget import CaptureBudget
+from errlypy.exception.stack import FrameWalk, extract_frame_details, is_library_frame
+from errlypy.internal.config import CaptureConfig
+from errlypy.internal.metrics import metric_name, registry
 from errlypy.utils import has_contract_been_implemented
 
 
@@ -31,6 +35,7 @@ class FrameExtractor(Extractor):
 class BaseExceptionCallbackImpl(ExceptionCallback):
     _context: Dict[str, Any]
     _meta: CreateExceptionCallbackMeta
+    _context_lock: threading.Lock
 
     @classmethod
     def create(
@@ -39,6 +44,7 @@ class BaseExceptionCallbackImpl(ExceptionCallback):
         instance = cls()
         instance._context = context
         instance._meta = meta
+        instance._context_lock = threading.Lock()
 
         return instance
 
@@ -48,38 +54,59 @@ class BaseExceptionCallbackImpl(ExceptionCallback):
 
 
 class ExceptionCallbackImpl(BaseExceptionCallbackImpl):
+    """
+    Parses an exception into a ``ParsedExceptionDto``.
+
+    The result holds only plain strings and numbers: no exception, traceback,
+    frame or local survives the call, so events may be queued for delivery
+    without keeping the objects of a failed request alive.
+    """
+
     def __call__(
         self,
         exc_type: Type[BaseException],
         exc_value: BaseException,
         exc_traceback: Optional[TracebackType],
     ) -> ParsedExceptionDto:
-        response = ParsedExceptionDto(content=str(exc_value))
-        python_lib_paths = sys.prefix, sys.base_prefix
-        frame_extractor = FrameExtractor()
-
-        stack_summary_wrapper = StackSummaryWrapper()
-        frames = stack_summary_wrapper.extract(
-            traceback.walk_tb(exc_traceback), capture_locals=True
+        start = time.perf_counter()
+        budget = CaptureBudget(CaptureConfig.time_budget)
+
+        # Library frames are filtered before anything is extracted from them
+        walk = FrameWalk(CaptureConfig.max_frames).walk(
+            (frame, lineno)
+            for frame, lineno in traceback.walk_tb(exc_traceback)
+            if not is_library_frame(frame)
+        )
+        scrubber = CaptureConfig.scrubber
+        details, collapsed, truncated_frames = extract_frame_details(walk, budget, scrubber)
+
+        content = str(exc_value)
+        response = ParsedExceptionDto(
+            content=scrubber.scrub_text(content) if scrubber is not None else content,
+            frames=details,
+            skipped_stages=[stage.value for stage in budget.skipped],
+            truncated_frames=truncated_frames,
+            collapsed=collapsed,
+            depth=walk.depth,
         )
 
-        for frame in frames:
-            has_lib_path = next(
-                (True for lib_path in python_lib_paths if frame.filename.startswith(lib_path)),
-                False,
-            )
-
-            if has_lib_path:
-                continue
+        for stage in budget.skipped:
+            registry.inc(metric_name("capture_skipped", stage=stage.value))
 
-            response.frames.append(frame_extractor.extract(frame))
+        registry.inc("exceptions_captured")
+        registry.observe("capture_seconds", time.perf_counter() - start)
 
-        if self._next_callback is None:
+        # Read once: callbacks are shared by every thread that captures
+        next_callback = self._next_callback
+        if next_callback is None:
             return response
 
-        if has_contract_been_implemented(self._next_callback, ExceptionCallbackWithContext):
-            self._next_callback = cast(ExceptionCallbackWithContext, self._next_callback)
-            # TODO: Create dataclass for context
-            self._next_callback.set_context(response)
+        if has_contract_been_implemented(next_callback, ExceptionCallbackWithContext):
+            # The context lives on the shared next callback until it is called,
+            # so another thread must not set its own in between
+            with self._context_lock:
+                # TODO: Create dataclass for context
+                cast(ExceptionCallbackWithContext, next_callback).set_context(response)
+                return next_callback(exc_type, exc_value, exc_traceback)
 
-        return self._next_callback(exc_type, exc_value, exc_traceback)
+        return next_callback(exc_type, exc_value, exc_traceback)
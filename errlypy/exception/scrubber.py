@@ -0,0 +1,180 @@
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+FILTERED = "[Filtered]"
+
+# Matched against lower-cased variable and key names as whole words: a match
+# must start and end at the ends of the name, at a separator such as "_" or
+# "-", or at a camelCase hump, so "ssn" filters "user_ssn" but not "classname"
+DEFAULT_KEY_PATTERNS = (
+    "passw(or)?ds?",
+    "secrets?",
+    "(access|refresh|auth|bearer|id|csrf|xsrf)?tokens?",
+    "api[_-]?keys?",
+    "auth(entication|orization)?",
+    "credentials?",
+    "cookies?",
+    "session(id|key)?s?",
+    "csrf[a-z]*",
+    "private[_-]?keys?",
+    "card[_-]?numbers?",
+    "cvv",
+    "ssn",
+)
+
+# Patterns starting with a literal character let the combined expression skip
+# ahead quickly through text that cannot match, so they are written that way.
+DEFAULT_VALUE_PATTERNS = (
+    # Email addresses; matched from the "@", the local part is added on
+    r"@[\w-]+\.[\w.-]+",
+    # Errly API keys
+    r"errly_[a-z0-9]{4}_[a-f0-9]{64}",
+)
+
+# The value following "key: " / "key=" once the key is known to be sensitive
+_PAIR_VALUE = re.compile(
+    r"\s{0,8}(?P<value>'[^'\n]{0,512}'?|\"[^\"\n]{0,512}\"?"
+    r"|(?:(?i:bearer|basic|token)\s{1,8})?[^\s,&;}\)\]'\"]{1,512})"
+)
+
+# Where a camelCase name gets a separator, so its words can be matched alone
+_CAMEL_HUMP = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+_KEY_CHARACTERS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-")
+_EMAIL_LOCAL_CHARACTERS = _KEY_CHARACTERS | frozenset(".+")
+
+# Bounds the per-key decision cache; locals names repeat, but dict keys may not
+_MAX_CACHED_KEYS = 4096
+
+# Nesting scrubbed in mappings; deeper containers are replaced as a whole
+MAX_DEPTH = 10
+
+
+class Scrubber:
+    """
+    Removes sensitive data from captured locals, messages and context.
+
+    All key patterns and all value patterns are each compiled once into a
+    combined expression, so scrubbing a string is a single regex pass however
+    many rules there are, and decisions about key names are cached. Values of
+    sensitive variables are never repr()'d at all; other values are searched
+    for secrets and, when they mention a sensitive key, for ``key=value`` /
+    ``'key': value`` pairs such as in the repr of a dict or a query string.
+    """
+
+    def __init__(
+        self,
+        key_patterns: Iterable[str] = DEFAULT_KEY_PATTERNS,
+        value_patterns: Iterable[str] = DEFAULT_VALUE_PATTERNS,
+        replacement: str = FILTERED,
+    ) -> None:
+        self.replacement = replacement
+        self._key_decisions: Dict[str, bool] = {}
+
+        # Applied to lower-cased text: matching a large alternation with
+        # IGNORECASE is several times slower than lower() plus a plain search
+        keys = "|".join(f"(?:{pattern})" for pattern in key_patterns)
+        self._key_matcher = re.compile(f"(?<![a-z])(?:{keys})(?![a-z])") if keys else None
+        # Whether text may mention a sensitive key at all; the key names found
+        # in it are then checked one by one
+        self._key_hint = re.compile(keys) if keys else None
+
+        values = [f"(?:{pattern})" for pattern in value_patterns]
+        self._value_matcher = re.compile("|".join(values)) if values else None
+        # Also stops at every separator; only used on text mentioning a key
+        self._pair_matcher = re.compile("|".join([":", "=", *values])) if keys else None
+
+    def is_sensitive_key(self, key: str) -> bool:
+        decision = self._key_decisions.get(key)
+        if decision is None:
+            decision = self._key_matcher is not None and bool(
+                self._key_matcher.search(_CAMEL_HUMP.sub("_", key).lower())
+            )
+            if len(self._key_decisions) >= _MAX_CACHED_KEYS:
+                self._key_decisions.clear()
+            self._key_decisions[key] = decision
+        return decision
+
+    def scrub_text(self, text: str) -> str:
+        if not text:
+            return text
+
+        if self._key_hint is not None and self._key_hint.search(text.lower()):
+            matcher = self._pair_matcher
+        else:
+            matcher = self._value_matcher
+
+        if matcher is None:
+            return text
+
+        pieces: List[str] = []
+        last = 0
+        for match in matcher.finditer(text):
+            start, end = match.span()
+            if start < last:
+                # Inside a value that has already been replaced
+                continue
+
+            if end - start == 1 and text[start] in ":=":
+                value = self._sensitive_value(text, start, last)
+                if value is None:
+                    continue
+                start, end = value
+            elif text[start] == "@":
+                while start > last and text[start - 1] in _EMAIL_LOCAL_CHARACTERS:
+                    start -= 1
+                if start == match.start():
+                    continue
+
+            pieces.append(text[last:start])
+            pieces.append(self.replacement)
+            last = end
+
+        if not pieces:
+            return text
+
+        pieces.append(text[last:])
+        return "".join(pieces)
+
+    def scrub_mapping(self, values: Mapping[str, Any], depth: int = MAX_DEPTH) -> Dict[str, Any]:
+        """
+        Scrubs a mapping such as user supplied tags or extra data, and the
+        mappings and sequences nested in it down to ``depth`` levels.
+        """
+        scrubbed: Dict[str, Any] = {}
+        for key, value in values.items():
+            if isinstance(key, str) and self.is_sensitive_key(key):
+                scrubbed[key] = self.replacement
+            else:
+                scrubbed[key] = self._scrub_value(value, depth - 1)
+        return scrubbed
+
+    def _scrub_value(self, value: Any, depth: int) -> Any:
+        if isinstance(value, str):
+            return self.scrub_text(value)
+        if isinstance(value, Mapping):
+            return self.scrub_mapping(value, depth) if depth > 0 else self.replacement
+        if isinstance(value, (list, tuple)):
+            if depth <= 0:
+                return self.replacement
+            items = [self._scrub_value(item, depth - 1) for item in value]
+            return tuple(items) if isinstance(value, tuple) else items
+        return value
+
+    def _sensitive_value(self, text: str, separator: int, floor: int) -> Optional[Tuple[int, int]]:
+        """Returns the span of the value after ``separator`` if its key is sensitive."""
+        key_end = separator
+        while key_end > floor and text[key_end - 1] == " ":
+            key_end -= 1
+        if key_end > floor and text[key_end - 1] in "'\"":
+            key_end -= 1
+
+        key_start = key_end
+        while key_start > floor and text[key_start - 1] in _KEY_CHARACTERS:
+            key_start -= 1
+
+        if key_start == key_end or not self.is_sensitive_key(text[key_start:key_end]):
+            return None
+
+        value = _PAIR_VALUE.match(text, separator + 1)
+        return value.span("value") if value is not None else None
@@ -3,6 +3,13 @@ import itertools
 import linecache
 import sys
 import traceback
+from types import CodeType, FrameType
+from typing import Dict, Iterable, List, Optional, Tuple, Union, cast
+
+from errlypy.exception import CollapsedFrames, FrameDetail
+from errlypy.exception.budget import CaptureBudget, CaptureStage
+from errlypy.exception.scrubber import Scrubber
+from errlypy.internal.encoder import safe_repr
 
 
 class StackSummaryWrapper(traceback.StackSummary):
@@ -59,3 +66,260 @@ class StackSummaryWrapper(traceback.StackSummary):
         for filename in fnames:
             linecache.checkcache(filename)
         return result
+
+
+# Values whose repr can't contain anything worth scrubbing
+_PLAIN_TYPES = frozenset((int, float, bool, type(None)))
+
+# Longest frame sequence that is recognized as repeating, e.g. mutual recursion
+_MAX_REPEAT_PERIOD = 8
+
+_Frame = Tuple[FrameType, int]
+
+
+def is_library_frame(frame: FrameType) -> bool:
+    """Frames of the standard library and installed packages, not of the application."""
+    return frame.f_code.co_filename.startswith((sys.prefix, sys.base_prefix))
+
+
+class _Repeat:
+    __slots__ = ("period", "count")
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.count = 0
+
+
+class FrameWalk:
+    """
+    Collects the ``(frame, lineno)`` pairs of a traceback in one pass.
+
+    Repeated sequences of up to ``_MAX_REPEAT_PERIOD`` frames (recursion) are
+    collapsed while walking: a sequence is kept twice and later repetitions
+    are only counted. With ``max_frames`` set, the outermost and innermost
+    frames are kept and the ones in between are only counted as omitted.
+    Nothing is extracted from the frames here, see ``extract_frame_details``.
+    """
+
+    def __init__(self, max_frames: Optional[int] = None) -> None:
+        self.entries: List[Union[_Frame, _Repeat]] = []
+        self.omitted = 0
+        # Every frame added, however many of them are kept
+        self.depth = 0
+        self._max_frames = max_frames
+        self._frames = 0
+        # Entries before this index are the kept outermost frames
+        self._head_end: Optional[int] = 0 if max_frames is not None and max_frames < 2 else None
+        self._run: Optional[_Repeat] = None
+        self._block: List[Tuple[CodeType, int]] = []
+        self._absorbed: List[_Frame] = []
+
+    @property
+    def omitted_at(self) -> Optional[int]:
+        """Index in ``entries`` where the omitted frames were."""
+        return self._head_end if self.omitted else None
+
+    def walk(self, frames: Iterable[_Frame]) -> "FrameWalk":
+        for frame, lineno in frames:
+            self.add(frame, lineno)
+        self._end_run()
+        return self
+
+    def add(self, frame: FrameType, lineno: int) -> None:
+        self.depth += 1
+        run = self._run
+        if run is not None:
+            if (frame.f_code, lineno) == self._block[len(self._absorbed)]:
+                self._absorbed.append((frame, lineno))
+                if len(self._absorbed) == run.period:
+                    run.count += run.period
+                    self._absorbed.clear()
+                return
+            self._end_run()
+
+        self._append((frame, lineno))
+        self._detect_run()
+
+    def _end_run(self) -> None:
+        run, self._run = self._run, None
+        if run is None:
+            return
+
+        if run.count == 0:
+            self.entries.remove(run)
+
+        # A repetition cut short is kept as ordinary frames
+        absorbed, self._absorbed = self._absorbed, []
+        for entry in absorbed:
+            self._append(entry)
+
+    def _detect_run(self) -> None:
+        entries = self.entries
+        last_frame, last_lineno = cast(_Frame, entries[-1])
+        start = self._head_end or 0
+
+        for period in range(1, _MAX_REPEAT_PERIOD + 1):
+            if len(entries) - 2 * period < start:
+                return
+
+            # Cheap check first: the newest frame has to match one period back
+            other = entries[-1 - period]
+            if isinstance(other, _Repeat) or (other[0].f_code, other[1]) != (
+                last_frame.f_code,
+                last_lineno,
+            ):
+                continue
+
+            tail = entries[-2 * period :]
+            if any(isinstance(entry, _Repeat) for entry in tail):
+                continue
+
+            keys = [(frame.f_code, lineno) for frame, lineno in cast(List[_Frame], tail)]
+            if keys[:period] == keys[period:]:
+                self._block = keys[period:]
+                self._run = _Repeat(period)
+                entries.append(self._run)
+                return
+
+    def _append(self, entry: _Frame) -> None:
+        self.entries.append(entry)
+        self._frames += 1
+
+        if self._max_frames is None:
+            return
+
+        if self._head_end is None:
+            if self._frames == self._max_frames // 2:
+                self._head_end = len(self.entries)
+            return
+
+        while self._frames > self._max_frames:
+            self._evict()
+
+        # A repetition marker whose sequence is no longer complete goes too
+        head_end = self._head_end
+        for position in range(head_end, len(self.entries)):
+            marker = self.entries[position]
+            if isinstance(marker, _Repeat):
+                if position - head_end < marker.period and marker is not self._run:
+                    del self.entries[position]
+                    self.omitted += marker.count
+                break
+
+    def _evict(self) -> None:
+        assert self._head_end is not None
+        evicted = self.entries.pop(self._head_end)
+        if isinstance(evicted, _Repeat):
+            self.omitted += evicted.count
+        else:
+            self._frames -= 1
+            self.omitted += 1
+
+
+def extract_frame_details(
+    walk: FrameWalk, budget: CaptureBudget, scrubber: Optional[Scrubber] = None
+) -> Tuple[List[FrameDetail], List[CollapsedFrames], int]:
+    """
+    Converts the frames kept by a ``FrameWalk`` into detached ``FrameDetail``
+    objects.
+
+    Frames are processed innermost first, so when the budget runs out it is
+    the outer frames that lose their locals and source lines or are dropped.
+
+    Returns:
+        The details in traceback order, where frames were collapsed and the
+        number of frames dropped because of the budget
+    """
+    entries = walk.entries
+    extracted: Dict[int, FrameDetail] = {}
+    cut = 0
+    first = True
+
+    for position in range(len(entries) - 1, -1, -1):
+        entry = entries[position]
+        if isinstance(entry, _Repeat):
+            continue
+
+        # The innermost frame is always kept, even with an exhausted budget
+        if not first and not budget.allows(CaptureStage.FRAMES):
+            cut = position + 1
+            # Repetitions of a dropped frame are dropped with it
+            while isinstance(entries[cut], _Repeat):
+                cut += 1
+            break
+
+        first = False
+        try:
+            extracted[position] = _extract_frame_detail(entry[0], entry[1], budget, scrubber)
+        except Exception:
+            # Same as traceback.FrameSummary: a local whose repr fails drops the frame
+            continue
+
+    details: List[FrameDetail] = []
+    collapsed: List[CollapsedFrames] = []
+    truncated = 0
+
+    for position, entry in enumerate(entries):
+        if position == walk.omitted_at:
+            if position <= cut and cut:
+                truncated += walk.omitted
+            else:
+                collapsed.append(CollapsedFrames(index=len(details), count=walk.omitted))
+
+        if isinstance(entry, _Repeat):
+            if position < cut:
+                truncated += entry.count
+            else:
+                collapsed.append(
+                    CollapsedFrames(index=len(details), count=entry.count, repeat_of=entry.period)
+                )
+        elif position < cut:
+            truncated += 1
+        elif position in extracted:
+            details.append(extracted[position])
+
+    return details, collapsed, truncated
+
+
+def _extract_frame_detail(
+    frame: FrameType, lineno: int, budget: CaptureBudget, scrubber: Optional[Scrubber]
+) -> FrameDetail:
+    filename = frame.f_code.co_filename
+
+    line = None
+    if budget.allows(CaptureStage.SOURCE_LINES):
+        linecache.lazycache(filename, frame.f_globals)
+        line = linecache.getline(filename, lineno).strip()
+
+    return FrameDetail(
+        filename=filename,
+        function=frame.f_code.co_name,
+        lineno=lineno,
+        line=line,
+        locals=_extract_locals(frame, budget, scrubber),
+    )
+
+
+def _extract_locals(
+    frame: FrameType, budget: CaptureBudget, scrubber: Optional[Scrubber]
+) -> Optional[Dict[str, str]]:
+    if not budget.allows(CaptureStage.LOCALS):
+        return None
+
+    # Before Python 3.13 reading f_locals leaves a snapshot dict on the frame;
+    # it belongs to the frame and goes away with it, nothing here keeps it.
+    captured = {}
+    for name, value in frame.f_locals.items():
+        # Checked per value: a single slow __repr__ is the usual culprit
+        if not budget.allows(CaptureStage.LOCALS):
+            break
+        # A raising or huge __repr__ must not lose the whole capture
+        if scrubber is None or type(value) in _PLAIN_TYPES:
+            captured[name] = safe_repr(value)
+        elif scrubber.is_sensitive_key(name):
+            # Not even repr()'d: the value never leaves the frame
+            captured[name] = scrubber.replacement
+        else:
+            captured[name] = scrubber.scrub_text(safe_repr(value))
+
+    return captured
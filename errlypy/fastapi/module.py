@@ -1,15 +1,16 @@
-from typing import ClassVar, List, Optional, Union
+from typing import TYPE_CHECKING, ClassVar, List, Optional, Union
 from uuid import uuid4
 
-from fastapi import FastAPI
-
 from errlypy.api import IModule, IUninitializedModule
 from errlypy.client import HTTPClient
-from errlypy.client.urllib import URLLibClient
 from errlypy.fastapi.events import OnFastAPIExceptionHasBeenParsedEvent
 from errlypy.fastapi.plugin import FastAPIExceptionPlugin
 from errlypy.internal.event.on_plugin_initialized import OnPluginInitializedEvent
 from errlypy.internal.event.type import EventType
+from errlypy.utils import singleton_instance
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
 
 class UninitializedFastAPIModule(IUninitializedModule):
@@ -21,14 +22,12 @@ class UninitializedFastAPIModule(IUninitializedModule):
     _instance: ClassVar[Optional["UninitializedFastAPIModule"]] = None
 
     def __new__(cls) -> "UninitializedFastAPIModule":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+        return singleton_instance(cls)
 
     @staticmethod
     def _initialize_plugin(
         exc_has_been_parsed_event: EventType[OnFastAPIExceptionHasBeenParsedEvent],
-        app: Optional[FastAPI] = None,
+        app: Optional["FastAPI"] = None,
     ) -> FastAPIExceptionPlugin:
         """Initializes and sets up the FastAPI exception plugin."""
         plugin = FastAPIExceptionPlugin(exc_has_been_parsed_event, app=app)
@@ -49,18 +48,15 @@ class UninitializedFastAPIModule(IUninitializedModule):
     @classmethod
     def setup(
         cls,
-        base_url: str,
-        api_key: str,
-        environment: str = "production",
-        app: Optional[FastAPI] = None,
+        http_client: HTTPClient,
+        app: Optional["FastAPI"] = None,
         plugin: Optional[FastAPIExceptionPlugin] = None,
     ) -> Union["IModule", "IUninitializedModule"]:
         """
         Initializes the FastAPI module and transitions to initialized state.
 
         Args:
-            base_url: Base URL for the API
-            api_key: API key for authentication
+            http_client: Shared client every captured exception is published to
             app: Optional FastAPI app instance to register immediately
             plugin: Optional custom FastAPIExceptionPlugin instance
 
@@ -75,19 +71,11 @@ class UninitializedFastAPIModule(IUninitializedModule):
         if not cls._verify_fastapi_installed():
             return UninitializedFastAPIModule()
 
-        http_client = HTTPClient(
-            client=URLLibClient(
-                base_url=base_url,
-                api_key=api_key,
-            ),
-            environment=environment,
-        )
-
         exc_has_been_parsed_event = EventType[OnFastAPIExceptionHasBeenParsedEvent]()
         on_initialized_event = EventType[OnPluginInitializedEvent]()
 
         exc_has_been_parsed_event.subscribe(
-            http_client.send_through_urllib,
+            http_client.enqueue,
         )
 
         if plugin is not None:
@@ -120,9 +108,7 @@ class FastAPIModule(IModule):
     _events: List[EventType]
 
     def __new__(cls, *args, **kwargs) -> "FastAPIModule":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+        return singleton_instance(cls)
 
     def __init__(self, plugins: List[FastAPIExceptionPlugin], events: List[EventType]) -> None:
         """
@@ -135,7 +121,7 @@ class FastAPIModule(IModule):
         self._plugins = plugins
         self._events = events
 
-    def register_app(self, app: FastAPI) -> None:
+    def register_app(self, app: "FastAPI") -> None:
         """
         Registers a FastAPI application with all plugins.
 
@@ -162,10 +148,11 @@ class FastAPIModule(IModule):
         Returns:
             UninitializedFastAPIModule: Uninitialized module instance
         """
-        for plugin in cls._plugins:
-            plugin.revert()
+        if cls._instance is not None:
+            for plugin in cls._instance._plugins:
+                plugin.revert()
 
-        for event in cls._events:
-            event.unsubscribe_all()
+            for event in cls._instance._events:
+                event.unsubscribe_all()
 
         return UninitializedFastAPIModule()
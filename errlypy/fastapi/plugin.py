@@ -1,26 +1,28 @@
-from typing import Optional, Type
+import functools
+from typing import TYPE_CHECKING, Any, Dict, Optional, Type
 from uuid import uuid4
 
-from fastapi import FastAPI, Request
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import Response
-
 from errlypy.api import IPlugin
 from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
 from errlypy.fastapi.events import OnFastAPIExceptionHasBeenParsedEvent
+from errlypy.internal.config import AsyncioConfig, WatchdogConfig, register_loop
 from errlypy.internal.event.type import EventType
 
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
 
 class FastAPIExceptionPlugin(IPlugin):
     def __init__(
         self,
         on_exc_has_been_parsed_event_instance: EventType[OnFastAPIExceptionHasBeenParsedEvent],
-        app: Optional[FastAPI] = None,
+        app: Optional["FastAPI"] = None,
     ) -> None:
         self._on_exc_has_been_parsed_event_instance = on_exc_has_been_parsed_event_instance
-        self._app: Optional[FastAPI] = app
+        self._app: Optional["FastAPI"] = app
         self._callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
         self._middleware_class: Optional[Type] = None
+        self._watchdog_middleware_class: Optional[Type] = None
 
         if self._app is not None:
             self.register_app(self._app)
@@ -28,8 +30,12 @@ class FastAPIExceptionPlugin(IPlugin):
     def setup(self):
         pass
 
-    def register_app(self, app: FastAPI):
+    def register_app(self, app: "FastAPI"):
         """Registers the plugin for a FastAPI application"""
+        from fastapi import Request
+        from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+        from starlette.responses import Response
+
         self._app = app
 
         plugin = self
@@ -53,14 +59,58 @@ class FastAPIExceptionPlugin(IPlugin):
 
                     raise
 
+        class ErrlyWatchdogMiddleware:
+            """
+            Tracks in-flight requests for the slow request watchdog and
+            hands the serving event loop to asyncio exception capture and
+            the loop lag monitor. A plain
+            ASGI middleware inside the exception middleware (which runs the
+            rest of the app in a task of its own), so the request runs in
+            this very task and its await chain can be followed from here.
+            """
+
+            def __init__(self, app) -> None:
+                self.app = app
+
+            async def __call__(self, scope, receive, send) -> None:
+                watchdog = WatchdogConfig.watchdog
+                watches_loops = (
+                    WatchdogConfig.loop_monitor is not None
+                    or AsyncioConfig.exception_handler is not None
+                )
+                if scope["type"] != "http" or (not watches_loops and watchdog is None):
+                    await self.app(scope, receive, send)
+                    return
+
+                import asyncio
+
+                register_loop(asyncio.get_running_loop())
+                if watchdog is None:
+                    await self.app(scope, receive, send)
+                    return
+
+                token = watchdog.begin(
+                    f"{scope['method']} {scope['path']}",
+                    asyncio.current_task(),
+                    functools.partial(_route, scope),
+                )
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    watchdog.end(token)
+
+        # Added first, so it ends up inside the exception middleware
+        app.add_middleware(ErrlyWatchdogMiddleware)
         app.add_middleware(ErrlyExceptionMiddleware)
 
         self._middleware_class = ErrlyExceptionMiddleware
+        self._watchdog_middleware_class = ErrlyWatchdogMiddleware
 
     def revert(self):
         """Removes the middleware from the FastAPI application"""
         if self._app is not None and self._middleware_class is not None:
-            middlewares = [m for m in self._app.user_middleware if m.cls != self._middleware_class]
+            own = (self._middleware_class, self._watchdog_middleware_class)
+            middlewares = [m for m in self._app.user_middleware if m.cls not in own]
 
             self._app.user_middleware = middlewares
 
@@ -81,3 +131,13 @@ class FastAPIExceptionPlugin(IPlugin):
         )
 
         return response
+
+
+def _route(scope: Dict[str, Any]) -> str:
+    """
+    The method and path template of the route a request matched, e.g. ``GET
+    /items/{item_id}``, once the router has set ``scope["route"]``; the path
+    until then.
+    """
+    path = getattr(scope.get("route"), "path", None) or scope["path"]
+    return f"{scope['method']} {path}"
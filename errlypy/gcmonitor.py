@@ -0,0 +1,118 @@
+import gc
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from errlypy.client import HTTPClient
+from errlypy.internal.metrics import metric_name, registry
+from errlypy.models.ingest import IngestEvent
+
+# (wall clock time it ended, generation, pause, objects collected)
+_Collection = Tuple[float, int, float, int]
+
+# Collections listed one by one on an event, most recent first
+_LISTED = 10
+
+# Pauses waiting to be observed; older ones are lost if metrics are never read
+_MAX_PENDING = 10_000
+
+
+class GCMonitor:
+    """
+    Times every garbage collection through ``gc.callbacks``, to tell GC
+    pauses apart from other latency spikes.
+
+    The last ``max_recent`` collections are kept. Every event gets the
+    collections of the ``window`` seconds before it was captured as ``gc``:
+    counts per generation, the total and longest pause, and the most recent
+    ones. The callback only reads the clock and appends to deques: it runs
+    inside the collection, on any thread and at any allocation, possibly
+    while that thread holds a lock, so it must not take one. The pauses are
+    observed into a ``gc_pause`` histogram per generation later, when the
+    metrics are read or an event is built.
+    """
+
+    def __init__(self, http_client: HTTPClient, window: float = 10.0, max_recent: int = 256):
+        self.window = window
+        self._http_client = http_client
+        self._recent: Deque[_Collection] = deque(maxlen=max_recent)
+        # (generation, pause) not observed into the histograms yet
+        self._pending: Deque[Tuple[int, float]] = deque(maxlen=_MAX_PENDING)
+        self._started = 0.0
+        self._metrics = [
+            metric_name("gc_pause", generation=str(generation)) for generation in range(3)
+        ]
+
+    def start(self) -> None:
+        if self._callback in gc.callbacks:
+            return
+
+        gc.callbacks.append(self._callback)
+        self._http_client.add_event_processor(self.attach)
+        registry.register_collector(self.observe_pauses)
+
+    def stop(self) -> None:
+        self._http_client.remove_event_processor(self.attach)
+        while self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+        registry.unregister_collector(self.observe_pauses)
+        self.observe_pauses()
+
+    def observe_pauses(self) -> None:
+        """Records the pauses since the last call into the ``gc_pause`` histograms."""
+        pending = self._pending
+        while pending:
+            try:
+                generation, pause = pending.popleft()
+            except IndexError:
+                break
+            registry.observe(self._metrics[generation], pause)
+
+    def recent(self, until: float) -> List[_Collection]:
+        """Collections that ended within the window before ``until``, oldest first."""
+        since = until - self.window
+        return [entry for entry in list(self._recent) if since <= entry[0] <= until]
+
+    def attach(self, event: IngestEvent) -> None:
+        self.observe_pauses()
+        if "gc" in event.extra:
+            return
+
+        until = event.timestamp.timestamp() if event.timestamp is not None else time.time()
+        collections = self.recent(until)
+        if not collections:
+            return
+
+        counts: Dict[str, int] = {}
+        for _, generation, _, _ in collections:
+            counts[str(generation)] = counts.get(str(generation), 0) + 1
+        pauses = [pause for _, _, pause, _ in collections]
+
+        event.extra["gc"] = {
+            "window": self.window,
+            "collections": counts,
+            "pause_total": round(sum(pauses), 6),
+            "pause_max": round(max(pauses), 6),
+            "recent": [_describe(entry, until) for entry in collections[: -_LISTED - 1 : -1]],
+        }
+
+    def _callback(self, phase: str, info: Dict[str, Any]) -> None:
+        # Runs inside every collection, on whichever thread triggered it
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+
+        pause = time.perf_counter() - self._started
+        generation = info["generation"]
+        self._pending.append((generation, pause))
+        self._recent.append((time.time(), generation, pause, info["collected"]))
+
+
+def _describe(entry: _Collection, until: float) -> Dict[str, Any]:
+    ended, generation, pause, collected = entry
+    return {
+        "ago": round(until - ended, 3),
+        "generation": generation,
+        "pause": round(pause, 6),
+        "collected": collected,
+    }
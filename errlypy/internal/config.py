@@ -1,2 +1,62 @@
+from typing import TYPE_CHECKING, Optional
+
+from errlypy.exception.scrubber import Scrubber
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from errlypy.excepthook.plugin import AsyncioExceptionHandlerPlugin
+    from errlypy.looplag import LoopLagMonitor
+    from errlypy.watchdog import RequestWatchdog
+
+
 class HTTPErrorConfig:
     endpoint: str = "api/v1/ingest"
+
+
+class CaptureConfig:
+    # Seconds a single capture may take before it starts skipping work
+    # (see errlypy.exception.budget); None disables the budget
+    time_budget: Optional[float] = 0.05
+    # Frames kept per capture; the outermost and innermost ones are kept
+    # and the ones in between are counted as omitted. None keeps all frames
+    max_frames: Optional[int] = 100
+    # Applied to locals and messages while capturing; None disables scrubbing
+    scrubber: Optional[Scrubber] = Scrubber()
+
+
+class WatchdogConfig:
+    # Tracks the requests of the Django and FastAPI integrations; None when
+    # slow request detection is off
+    watchdog: Optional["RequestWatchdog"] = None
+    # Watches the event loops the async integrations serve requests on; None
+    # when loop lag monitoring is off
+    loop_monitor: Optional["LoopLagMonitor"] = None
+
+
+class QueryConfig:
+    # Record the SQL of every Django request and attach it to its errors
+    enabled: bool = False
+    # Runs of one SELECT shape within a request that count as an N+1
+    n_plus_one_threshold: int = 5
+    # Also report every N+1 found as a WARNING event
+    report_n_plus_one: bool = False
+
+
+class AsyncioConfig:
+    # Captures exceptions reported to the event loops it is installed on;
+    # None when the excepthook integration isn't set up
+    exception_handler: Optional["AsyncioExceptionHandlerPlugin"] = None
+
+
+def register_loop(loop: "asyncio.AbstractEventLoop") -> None:
+    """
+    Hands an event loop to everything that watches loops: asyncio exception
+    capture and the loop lag monitor. Cheap for loops already known.
+    """
+    exception_handler = AsyncioConfig.exception_handler
+    if exception_handler is not None:
+        exception_handler.register_loop(loop)
+    loop_monitor = WatchdogConfig.loop_monitor
+    if loop_monitor is not None:
+        loop_monitor.watch(loop)
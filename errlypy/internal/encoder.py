@@ -2,8 +2,15 @@ import dataclasses
 import json
 from datetime import datetime
 from enum import Enum
+from typing import Any
 from uuid import UUID
 
+# Longest repr kept for values that have no JSON form
+MAX_REPR_LENGTH = 1000
+
+# Nesting kept when detaching values that don't survive a JSON round trip
+_MAX_DEPTH = 10
+
 
 class DataclassJsonEncoder(json.JSONEncoder):
     def default(self, o):
@@ -21,4 +28,43 @@ class DataclassJsonEncoder(json.JSONEncoder):
         # Support for Enum
         if isinstance(o, Enum):
             return o.value
-        return super().default(o)
+        # One odd value must not make the whole batch fail to encode
+        return safe_repr(o)
+
+
+def safe_repr(value: Any, limit: int = MAX_REPR_LENGTH) -> str:
+    """``repr(value)``, cut to ``limit`` characters, or a placeholder if it raises."""
+    try:
+        text = repr(value)
+    except Exception as exc:
+        return f"<repr failed: {type(exc).__name__}>"
+    if len(text) > limit:
+        return text[:limit] + "..."
+    return text
+
+
+def detach(value: Any) -> Any:
+    """
+    A JSON-compatible deep copy of ``value``: later changes by its owner
+    don't show, and values without a JSON form become their repr.
+    """
+    try:
+        return json.loads(json.dumps(value, cls=DataclassJsonEncoder))
+    except (TypeError, ValueError):
+        # Keys that aren't strings or numbers, or reference cycles
+        return _detach(value, _MAX_DEPTH)
+
+
+def _detach(value: Any, depth: int) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if depth == 0:
+        return safe_repr(value)
+    if isinstance(value, dict):
+        return {str(key): _detach(item, depth - 1) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_detach(item, depth - 1) for item in value]
+    try:
+        return json.loads(json.dumps(value, cls=DataclassJsonEncoder))
+    except (TypeError, ValueError):
+        return safe_repr(value)
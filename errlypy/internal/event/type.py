@@ -1,43 +1,70 @@
-import asyncio
-import asyncio.coroutines
 import inspect
-from typing import Any, Callable, Coroutine, Generic, List, TypeVar, Union
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Generic, Optional, Tuple, TypeVar, Union
+
+if TYPE_CHECKING:
+    import asyncio
 
 T = TypeVar("T")
 
 
+def get_running_loop() -> Optional["asyncio.AbstractEventLoop"]:
+    # A loop can only be running once asyncio has been imported, so processes
+    # that never use it don't pay for importing it here.
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is None:
+        return None
+
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
 class EventType(Generic[T]):
+    """
+    Subscribers are kept in a tuple that is replaced, never changed, so
+    ``notify`` iterates a consistent snapshot without taking the lock even
+    while another thread subscribes.
+    """
+
     def __init__(self) -> None:
-        self._subscribers: List[
-            Union[Callable[[T], None], Callable[[T], Coroutine[Any, Any, None]]]
-        ] = []
+        self._subscribers: Tuple[
+            Union[Callable[[T], None], Callable[[T], Coroutine[Any, Any, None]]], ...
+        ] = ()
+        self._lock = threading.Lock()
 
     def subscribe(
         self,
         callback: Union[Callable[[T], None], Callable[[T], Coroutine[Any, Any, None]]],
     ) -> None:
-        self._subscribers.append(callback)
+        with self._lock:
+            self._subscribers = (*self._subscribers, callback)
 
     def unsubscribe(
         self,
         callback: Union[Callable[[T], None], Callable[[T], Coroutine[Any, Any, None]]],
     ) -> None:
-        self._subscribers.remove(callback)
+        with self._lock:
+            subscribers = list(self._subscribers)
+            subscribers.remove(callback)
+            self._subscribers = tuple(subscribers)
 
     def unsubscribe_all(self) -> None:
-        self._subscribers = []
+        with self._lock:
+            self._subscribers = ()
 
     def notify(self, message: T) -> None:
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
+        loop = get_running_loop()
 
         for subscriber in self._subscribers:
             if inspect.iscoroutinefunction(subscriber):
                 if loop:
                     loop.create_task(subscriber(message))
                 else:
+                    import asyncio
+
                     asyncio.run(subscriber(message))
             else:
                 subscriber(message)
@@ -0,0 +1,35 @@
+import importlib
+import sys
+from dataclasses import dataclass
+from typing import Optional, Tuple, Type
+
+from errlypy.api import IUninitializedModule
+
+
+@dataclass(frozen=True)
+class Integration:
+    """
+    Describes an integration module without importing it.
+
+    ``framework`` is the top-level package the integration hooks into. The
+    integration is only imported once that package has already been imported
+    by the application, so errlypy never pulls a framework in by itself.
+    """
+
+    module_path: str
+    class_name: str
+    framework: Optional[str] = None
+
+    def is_in_use(self) -> bool:
+        return self.framework is None or self.framework in sys.modules
+
+    def load(self) -> Type[IUninitializedModule]:
+        module = importlib.import_module(self.module_path)
+        return getattr(module, self.class_name)
+
+
+INTEGRATIONS: Tuple[Integration, ...] = (
+    Integration("errlypy.django.module", "UninitializedDjangoModule", framework="django"),
+    Integration("errlypy.excepthook.module", "UninitializedExceptHookModule"),
+    Integration("errlypy.fastapi.module", "UninitializedFastAPIModule", framework="fastapi"),
+)
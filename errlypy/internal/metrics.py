@@ -0,0 +1,248 @@
+import bisect
+import os
+import threading
+import weakref
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Upper bounds in seconds; the last bucket is +Inf
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def metric_name(name: str, **labels: str) -> str:
+    """
+    Builds a labelled metric name, e.g. ``send_failures{reason="http"}``.
+    Callers on hot paths should build it once and reuse the string.
+    """
+    if not labels:
+        return name
+    rendered = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Shard:
+    """Metrics recorded by a single thread; only that thread ever writes to it."""
+
+    __slots__ = ("counters", "histograms", "thread")
+
+    def __init__(self, thread: threading.Thread) -> None:
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, _Histogram] = {}
+        self.thread = weakref.ref(thread)
+
+
+class MetricsRegistry:
+    """
+    Internal counters, histograms and gauges.
+
+    Writes go to a per-thread shard without any locking; ``snapshot`` merges
+    all shards. Shards of finished threads are folded into a retired total on
+    read so thread pools that churn don't grow the registry.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._buckets = buckets
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard(threading.current_thread())
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1) -> None:
+        counters = self._shard().counters
+        counters[name] = counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        histograms = self._shard().histograms
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = _Histogram(len(self._buckets) + 1)
+
+        histogram.counts[bisect.bisect_left(self._buckets, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+    def register_gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Registers a value that is computed when the metrics are read."""
+        with self._lock:
+            self._gauges[name] = read
+
+    def unregister_gauge(self, name: str, read: Optional[Callable[[], float]] = None) -> None:
+        with self._lock:
+            if read is None or self._gauges.get(name) == read:
+                self._gauges.pop(name, None)
+
+    def register_collector(self, collect: Callable[[], None]) -> None:
+        """
+        Runs ``collect`` before every snapshot, to record values gathered
+        where recording isn't safe (e.g. inside a garbage collection).
+        """
+        with self._lock:
+            self._collectors.append(collect)
+
+    def unregister_collector(self, collect: Callable[[], None]) -> None:
+        with self._lock:
+            if collect in self._collectors:
+                self._collectors.remove(collect)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Returns ``{"counters": ..., "gauges": ..., "histograms": ...}``.
+        Histogram buckets are cumulative and keyed by their upper bound.
+        """
+        with self._lock:
+            collectors = list(self._collectors)
+        for collect in collectors:
+            try:
+                collect()
+            except Exception:
+                continue
+
+        counters: Dict[str, float] = {}
+        histograms: Dict[str, _Histogram] = {}
+
+        with self._lock:
+            live = []
+            for shard in self._shards:
+                thread = shard.thread()
+                if thread is None or not thread.is_alive():
+                    self._merge(shard, self._retired.counters, self._retired.histograms)
+                else:
+                    live.append(shard)
+            self._shards = live
+
+            for shard in [self._retired, *live]:
+                self._merge(shard, counters, histograms)
+
+            gauges = dict(self._gauges)
+
+        gauge_values = {}
+        for name, read in gauges.items():
+            try:
+                gauge_values[name] = read()
+            except Exception:
+                continue
+
+        return {
+            "counters": dict(sorted(counters.items())),
+            "gauges": dict(sorted(gauge_values.items())),
+            "histograms": {
+                name: self._render_histogram(histogram)
+                for name, histogram in sorted(histograms.items())
+            },
+        }
+
+    def reset_after_fork(self) -> None:
+        """Called in a forked child, where the lock may have been held by another thread."""
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            for shard in [self._retired, *self._shards]:
+                shard.counters.clear()
+                shard.histograms.clear()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _merge(
+        self, shard: _Shard, counters: Dict[str, float], histograms: Dict[str, _Histogram]
+    ) -> None:
+        for name, value in list(shard.counters.items()):
+            counters[name] = counters.get(name, 0) + value
+
+        for name, source in list(shard.histograms.items()):
+            target = histograms.get(name)
+            if target is None:
+                target = histograms[name] = _Histogram(len(self._buckets) + 1)
+            for index, count in enumerate(source.counts):
+                target.counts[index] += count
+            target.sum += source.sum
+            target.count += source.count
+
+    def _render_histogram(self, histogram: _Histogram) -> Dict:
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip([*map(str, self._buckets), "+Inf"], histogram.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+
+        return {"count": histogram.count, "sum": histogram.sum, "buckets": buckets}
+
+
+def to_prometheus(snapshot: Dict[str, Dict], prefix: str = "errlypy_") -> str:
+    """Renders a ``MetricsRegistry.snapshot`` in the Prometheus text format."""
+    lines: List[str] = []
+
+    def split(key: str) -> Tuple[str, str]:
+        name, _, labels = key.partition("{")
+        return prefix + name, labels.rstrip("}")
+
+    def with_labels(labels: str, extra: str = "") -> str:
+        joined = ",".join(part for part in (labels, extra) if part)
+        return f"{{{joined}}}" if joined else ""
+
+    declared: Set[str] = set()
+
+    def declare(name: str, kind: str) -> None:
+        if name not in declared:
+            declared.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for key, value in snapshot["counters"].items():
+        name, labels = split(key)
+        declare(f"{name}_total", "counter")
+        lines.append(f"{name}_total{with_labels(labels)} {value}")
+
+    for key, value in snapshot["gauges"].items():
+        name, labels = split(key)
+        declare(name, "gauge")
+        lines.append(f"{name}{with_labels(labels)} {value}")
+
+    for key, histogram in snapshot["histograms"].items():
+        name, labels = split(key)
+        declare(name, "histogram")
+        for bound, count in histogram["buckets"].items():
+            le = f'le="{bound}"'
+            lines.append(f"{name}_bucket{with_labels(labels, le)} {count}")
+        lines.append(f"{name}_sum{with_labels(labels)} {histogram['sum']}")
+        lines.append(f"{name}_count{with_labels(labels)} {histogram['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.reset_after_fork)
@@ -0,0 +1,189 @@
+"""
+Binary encoding of ``IngestRequest``, an alternative to JSON for events full
+of stack frames.
+
+Version 1 layout, all integers big-endian::
+
+    request  := magic "ERLY" | version u8 | event count u32 | event*
+    event    := length u32 | body           (length of body in bytes)
+    body     := level u8 | timestamp i64 | string * 11 | tags | extra
+    string   := length u32 | utf-8 bytes    (length 0xFFFFFFFF means None)
+    tags     := count u32 | (string string)*
+    extra    := string                      (JSON object, None if empty)
+
+``timestamp`` is microseconds since 1970-01-01 (naive datetimes are taken as
+is, like the JSON encoder does); ``-2**63`` means None. The strings are the
+``IngestEvent`` fields listed in ``_STRING_FIELDS``, in that order. Every
+event is length-prefixed so a decoder can skip events it cannot read.
+"""
+
+import json
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from errlypy.internal.encoder import DataclassJsonEncoder
+from errlypy.models.ingest import ErrorLevel, IngestEvent, IngestRequest
+
+JSON_CONTENT_TYPE = "application/json"
+BINARY_CONTENT_TYPE = "application/vnd.errly.events+binary; version=1"
+
+MAGIC = b"ERLY"
+VERSION = 1
+
+_STRING_FIELDS = (
+    "message",
+    "environment",
+    "stack_trace",
+    "release_version",
+    "user_id",
+    "user_email",
+    "user_ip",
+    "browser",
+    "os",
+    "url",
+    "event_id",
+)
+_LEVELS = list(ErrorLevel)
+_LEVEL_CODES = {level: code for code, level in enumerate(_LEVELS)}
+
+_HEADER = struct.Struct(">4sBI")
+_U32 = struct.Struct(">I")
+_LEVEL_AND_TIMESTAMP = struct.Struct(">Bq")
+_NONE = 0xFFFFFFFF
+_NONE_STRING = _U32.pack(_NONE)
+_NO_TIMESTAMP = -(2**63)
+_EPOCH = datetime(1970, 1, 1)
+
+
+class WireFormatError(ValueError):
+    pass
+
+
+def encode_json(request: Any) -> bytes:
+    return json.dumps(request, cls=DataclassJsonEncoder).encode("utf-8")
+
+
+def encode_binary(request: IngestRequest) -> bytes:
+    parts = [_HEADER.pack(MAGIC, VERSION, len(request.events))]
+    for event in request.events:
+        body = _encode_event(event)
+        parts.append(_U32.pack(len(body)))
+        parts.append(body)
+    return b"".join(parts)
+
+
+def decode_binary(data: bytes) -> IngestRequest:
+    """Reference decoder, the counterpart of ``encode_binary``."""
+    if len(data) < _HEADER.size:
+        raise WireFormatError("truncated header")
+
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise WireFormatError("not an errly binary payload")
+    if version != VERSION:
+        raise WireFormatError(f"unsupported version {version}")
+
+    events = []
+    offset = _HEADER.size
+    for _ in range(count):
+        (length,) = _read(_U32, data, offset)
+        offset += _U32.size
+        end = offset + length
+        if end > len(data):
+            raise WireFormatError("truncated event")
+        events.append(_decode_event(data, offset, end))
+        offset = end
+
+    return IngestRequest(events=events)
+
+
+# Content type and encoder per ``wire_format`` name
+WIRE_FORMATS: Dict[str, Tuple[str, Callable[[Any], bytes]]] = {
+    "json": (JSON_CONTENT_TYPE, encode_json),
+    "binary": (BINARY_CONTENT_TYPE, encode_binary),
+}
+
+
+def _encode_event(event: IngestEvent) -> bytes:
+    parts = [
+        _LEVEL_AND_TIMESTAMP.pack(
+            _LEVEL_CODES[ErrorLevel(event.level)], _timestamp_to_micros(event.timestamp)
+        )
+    ]
+    for name in _STRING_FIELDS:
+        _append_string(parts, getattr(event, name))
+
+    parts.append(_U32.pack(len(event.tags)))
+    for key, value in event.tags.items():
+        _append_string(parts, key)
+        _append_string(parts, value)
+
+    _append_string(
+        parts, json.dumps(event.extra, cls=DataclassJsonEncoder) if event.extra else None
+    )
+    return b"".join(parts)
+
+
+def _append_string(parts: List[bytes], value: Optional[str]) -> None:
+    if value is None:
+        parts.append(_NONE_STRING)
+        return
+
+    encoded = value.encode("utf-8")
+    parts.append(_U32.pack(len(encoded)))
+    parts.append(encoded)
+
+
+def _decode_event(data: bytes, offset: int, end: int) -> IngestEvent:
+    level_code, micros = _read(_LEVEL_AND_TIMESTAMP, data, offset, end)
+    offset += _LEVEL_AND_TIMESTAMP.size
+
+    strings: Dict[str, Any] = {}
+    for name in _STRING_FIELDS:
+        strings[name], offset = _read_string(data, offset, end)
+
+    (tag_count,) = _read(_U32, data, offset, end)
+    offset += _U32.size
+    tags = {}
+    for _ in range(tag_count):
+        key, offset = _read_string(data, offset, end)
+        value, offset = _read_string(data, offset, end)
+        tags[key] = value
+
+    extra, offset = _read_string(data, offset, end)
+
+    if level_code >= len(_LEVELS):
+        raise WireFormatError(f"unknown level {level_code}")
+
+    return IngestEvent(
+        level=_LEVELS[level_code],
+        timestamp=None if micros == _NO_TIMESTAMP else _EPOCH + timedelta(microseconds=micros),
+        tags=tags,
+        extra=json.loads(extra) if extra is not None else {},
+        **strings,
+    )
+
+
+def _read(layout: struct.Struct, data: bytes, offset: int, end: Optional[int] = None) -> tuple:
+    if offset + layout.size > (len(data) if end is None else end):
+        raise WireFormatError("truncated payload")
+    return layout.unpack_from(data, offset)
+
+
+def _read_string(data: bytes, offset: int, end: int) -> Tuple[Any, int]:
+    (length,) = _read(_U32, data, offset, end)
+    offset += _U32.size
+    if length == _NONE:
+        return None, offset
+    if offset + length > end:
+        raise WireFormatError("truncated string")
+    return data[offset : offset + length].decode("utf-8"), offset + length
+
+
+def _timestamp_to_micros(timestamp: Optional[datetime]) -> int:
+    if timestamp is None:
+        return _NO_TIMESTAMP
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
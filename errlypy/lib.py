@@ -1,11 +1,51 @@
-from typing import ClassVar, List, Optional, Union
+import atexit
+import sys
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
 
-from errlypy.api import IModule, IModuleController, IUninitializedModuleController
+from errlypy.api import (
+    IModule,
+    IModuleController,
+    IUninitializedModule,
+    IUninitializedModuleController,
+)
 from errlypy.config import ErrlyConfig
-from errlypy.django.module import UninitializedDjangoModule
-from errlypy.excepthook.module import UninitializedExceptHookModule
-from errlypy.fastapi.module import UninitializedFastAPIModule
-from errlypy.internal.event.type import EventType
+from errlypy.exception.scrubber import DEFAULT_KEY_PATTERNS, DEFAULT_VALUE_PATTERNS, Scrubber
+from errlypy.internal.config import CaptureConfig, QueryConfig, WatchdogConfig, register_loop
+from errlypy.internal.integrations import INTEGRATIONS
+from errlypy.internal.metrics import registry, to_prometheus
+from errlypy.models.ingest import ErrorLevel
+from errlypy.utils import singleton_instance
+
+# The transport (http.client, ssl) and the optional monitors are imported by
+# init and the calls that need them, keeping ``import errlypy`` cheap
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Future
+
+    from errlypy.aggregate import Aggregator
+    from errlypy.client import HTTPClient
+    from errlypy.client.fanout import Destination
+    from errlypy.gcmonitor import GCMonitor
+    from errlypy.looplag import LoopLagMonitor
+    from errlypy.profiler import SamplingProfiler
+    from errlypy.watchdog import RequestWatchdog
+
+TModule = TypeVar("TModule", bound=IModule)
 
 
 class UninitializedModuleController(
@@ -13,26 +53,104 @@ class UninitializedModuleController(
 ):
     @staticmethod
     def init(
-        base_url: str, api_key: str, environment: str = "production"
+        base_url: str,
+        api_key: str,
+        environment: str = "production",
+        logging_level: Optional[int] = None,
+        shutdown_timeout: float = 2.0,
+        capture_time_budget: Optional[float] = 0.05,
+        max_frames: Optional[int] = 100,
+        scrub_keys: Sequence[str] = DEFAULT_KEY_PATTERNS,
+        scrub_values: Sequence[str] = DEFAULT_VALUE_PATTERNS,
+        dry_mode: bool = False,
+        dry_mode_path: Optional[str] = None,
+        agent_socket: Optional[str] = None,
+        wire_format: str = "json",
+        compress: bool = False,
+        destinations: "Sequence[Destination]" = (),
+        profile_interval: Optional[float] = None,
+        slow_request_threshold: Optional[float] = None,
+        loop_lag_threshold: Optional[float] = None,
+        gc_monitoring: bool = False,
+        record_queries: bool = False,
+        report_n_plus_one: bool = False,
     ) -> Union["IModuleController", "IUninitializedModuleController"]:
-        config = ErrlyConfig(base_url=base_url, api_key=api_key, environment=environment)
+        config = ErrlyConfig(
+            base_url=base_url,
+            api_key=api_key,
+            environment=environment,
+            shutdown_timeout=shutdown_timeout,
+            capture_time_budget=capture_time_budget,
+            max_frames=max_frames,
+            scrub_keys=scrub_keys,
+            scrub_values=scrub_values,
+            dry_mode=dry_mode,
+            dry_mode_path=dry_mode_path,
+            agent_socket=agent_socket,
+            wire_format=wire_format,
+            compress=compress,
+            destinations=destinations,
+            profile_interval=profile_interval,
+            slow_request_threshold=slow_request_threshold,
+            loop_lag_threshold=loop_lag_threshold,
+            gc_monitoring=gc_monitoring,
+            record_queries=record_queries,
+            report_n_plus_one=report_n_plus_one,
+        )
 
         if not config.validate_api_key():
             raise ValueError(
                 f"Invalid API key format. Expected: errly_XXXX_{'X' * 64} where X is alphanumeric"
             )
 
-        django_module = UninitializedDjangoModule.setup(
-            base_url=base_url, api_key=api_key, environment=environment
-        )
-        excepthook_module = UninitializedExceptHookModule.setup(
-            base_url=base_url, api_key=api_key, environment=environment
+        # A second init replaces the first: its hooks, handlers and worker go
+        # before the new ones are installed, or both would report every event
+        previous = ModuleController.__dict__.get("_instance")
+        if previous is not None and hasattr(previous, "_http_client"):
+            previous.close(previous._config.shutdown_timeout)
+
+        CaptureConfig.time_budget = config.capture_time_budget
+        CaptureConfig.max_frames = config.max_frames
+        # Compiled once here; capture only runs the combined expressions
+        CaptureConfig.scrubber = (
+            Scrubber(config.scrub_keys, config.scrub_values)
+            if config.scrub_keys or config.scrub_values
+            else None
         )
-        fastapi_module = UninitializedFastAPIModule.setup(
-            base_url=base_url, api_key=api_key, environment=environment
+        # Read by the Django integration while it is set up
+        QueryConfig.enabled = config.record_queries
+        QueryConfig.report_n_plus_one = config.report_n_plus_one
+
+        from errlypy.client import UninitializedHTTPClient
+
+        http_client = UninitializedHTTPClient.setup(
+            base_url=base_url,
+            api_key=api_key,
+            environment=environment,
+            timeout=config.timeout,
+            dry_mode=config.dry_mode,
+            dry_mode_path=config.dry_mode_path,
+            dry_mode_capacity=config.dry_mode_capacity,
+            agent_socket=config.agent_socket,
+            wire_format=config.wire_format,
+            compress=config.compress,
+            destinations=config.destinations,
+            max_retries=config.max_retries,
         )
 
-        modules = [django_module, excepthook_module, fastapi_module]
+        modules: List[Union[IModule, IUninitializedModule]] = [
+            integration.load().setup(http_client=http_client)
+            for integration in INTEGRATIONS
+            if integration.is_in_use()
+        ]
+
+        if logging_level is not None:
+            from errlypy.logging.module import UninitializedLoggingModule
+
+            modules.append(
+                UninitializedLoggingModule.setup(http_client=http_client, level=logging_level)
+            )
+
         initialized_modules = [module for module in modules if isinstance(module, IModule)]
 
         has_been_initialized = len(initialized_modules) > 0
@@ -42,7 +160,7 @@ class UninitializedModuleController(
 
         module_controller = ModuleController(
             modules=initialized_modules,
-            events=[],
+            http_client=http_client,
             config=config,
         )
 
@@ -52,33 +170,110 @@ class UninitializedModuleController(
 class ModuleController(IModuleController):
     _instance: ClassVar[Optional["ModuleController"]] = None
     _modules: List[IModule]
-    _events: List[EventType]
+    _http_client: "HTTPClient"
     _config: ErrlyConfig
 
     def __new__(cls, *args, **kwargs) -> "ModuleController":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+        return singleton_instance(cls)
 
     def __init__(
-        self, modules: List[IModule], events: List[EventType], config: ErrlyConfig
+        self, modules: List[IModule], http_client: "HTTPClient", config: ErrlyConfig
     ) -> None:
+        """
+        Args:
+            modules: Initialized integration modules
+            http_client: Transport and worker every module publishes into
+            config: Configuration the controller was created with
+        """
         self._modules = modules
-        self._events = events
+        self._http_client = http_client
         self._config = config
+        self._profiler: Optional["SamplingProfiler"] = None
+        if config.profile_interval is not None:
+            from errlypy.profiler import SamplingProfiler
+
+            self._profiler = SamplingProfiler(http_client, interval=config.profile_interval)
+            self._profiler.start()
+        self._watchdog: Optional["RequestWatchdog"] = None
+        if config.slow_request_threshold is not None:
+            from errlypy.watchdog import RequestWatchdog
+
+            self._watchdog = RequestWatchdog(http_client, threshold=config.slow_request_threshold)
+            self._watchdog.start()
+        WatchdogConfig.watchdog = self._watchdog
+        self._loop_monitor: Optional["LoopLagMonitor"] = None
+        if config.loop_lag_threshold is not None:
+            from errlypy.looplag import LoopLagMonitor
+
+            self._loop_monitor = LoopLagMonitor(http_client, threshold=config.loop_lag_threshold)
+            self._loop_monitor.start()
+        WatchdogConfig.loop_monitor = self._loop_monitor
+        self._gc_monitor: Optional["GCMonitor"] = None
+        if config.gc_monitoring:
+            from errlypy.gcmonitor import GCMonitor
+
+            self._gc_monitor = GCMonitor(http_client)
+            self._gc_monitor.start()
+
+        atexit.unregister(self._flush_at_exit)
+        atexit.register(self._flush_at_exit)
+
+    @property
+    def http_client(self) -> "HTTPClient":
+        return self._http_client
+
+    @property
+    def profiler(self) -> Optional["SamplingProfiler"]:
+        return self._profiler
+
+    @property
+    def loop_monitor(self) -> Optional["LoopLagMonitor"]:
+        return self._loop_monitor
+
+    def get_module(self, module_type: Type[TModule]) -> Optional[TModule]:
+        """Returns the initialized module of the given type, if it has been set up."""
+        return next((module for module in self._modules if isinstance(module, module_type)), None)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every queued event has been sent or the timeout expires."""
+        return self._http_client.flush(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Detaches every integration, delivers what is still queued and releases
+        the worker thread and connection. Returns False if the timeout expired.
+        """
+        atexit.unregister(self._flush_at_exit)
+        if self._profiler is not None:
+            self._profiler.stop()
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            WatchdogConfig.watchdog = None
+        if self._loop_monitor is not None:
+            self._loop_monitor.stop()
+            WatchdogConfig.loop_monitor = None
+        if self._gc_monitor is not None:
+            self._gc_monitor.stop()
+        self.revert()
+
+        return self._http_client.close(timeout)
 
     def revert(self) -> UninitializedModuleController:
-        for module in self._modules:
+        # Reverting twice would restore hooks installed after the first time
+        modules, self._modules = self._modules, []
+        for module in modules:
             module.revert()
 
-        for event in self._events:
-            event.unsubscribe_all()
-
         return UninitializedModuleController()
 
+    def _flush_at_exit(self) -> None:
+        # Daemon worker threads are still alive while atexit handlers run, so
+        # this is the last chance to deliver e.g. an event from sys.excepthook.
+        self._http_client.close(self._config.shutdown_timeout)
+
 
 class Errly:
-    _module_controller: IModuleController
+    _module_controller: Optional[IModuleController] = None
 
     @classmethod
     def init(
@@ -87,16 +282,394 @@ class Errly:
         url: str,
         api_key: str,
         environment: str = "production",
+        logging_level: Optional[int] = None,
+        shutdown_timeout: float = 2.0,
+        capture_time_budget: Optional[float] = 0.05,
+        max_frames: Optional[int] = 100,
+        scrub_keys: Sequence[str] = DEFAULT_KEY_PATTERNS,
+        scrub_values: Sequence[str] = DEFAULT_VALUE_PATTERNS,
+        dry_mode: bool = False,
+        dry_mode_path: Optional[str] = None,
+        agent_socket: Optional[str] = None,
+        wire_format: str = "json",
+        compress: bool = False,
+        destinations: "Sequence[Destination]" = (),
+        profile_interval: Optional[float] = None,
+        slow_request_threshold: Optional[float] = None,
+        loop_lag_threshold: Optional[float] = None,
+        gc_monitoring: bool = False,
+        record_queries: bool = False,
+        report_n_plus_one: bool = False,
     ):
+        """
+        Initializes every available integration.
+
+        Framework integrations (Django, FastAPI) are only loaded when the
+        framework has already been imported, so call this after importing it.
+        Calling it again replaces the previous setup: its integrations are
+        reverted and its queued events delivered first.
+
+        Exceptions reported to an asyncio event loop are captured on the
+        loop running during this call and on the loops FastAPI and ASGI
+        Django serve requests on. For a loop started later, as with
+        ``asyncio.run(main())`` after this call, call ``register_loop()``
+        at the start of ``main``.
+
+        Args:
+            url: Base URL of the Errly API
+            api_key: Project API key
+            environment: Environment reported with every event
+            logging_level: When set, log records at or above this level are
+                forwarded to Errly through a root logger handler
+            shutdown_timeout: Seconds spent delivering queued events at exit
+            capture_time_budget: Seconds a single capture may spend before it
+                starts leaving out locals, source lines and then outer frames;
+                None disables the budget
+            max_frames: Frames kept per exception; deep stacks keep the
+                outermost and innermost ones. Recursion is collapsed first
+            scrub_keys: Regexes for variable and key names whose values are
+                replaced with "[Filtered]", matched as whole words of the
+                lower-cased names (split at "_", "-" and camelCase humps)
+            scrub_values: Regexes for sensitive data replaced wherever it
+                appears in locals and messages. Pass empty sequences for both
+                to disable scrubbing
+            dry_mode: Capture, scrub and serialize everything as usual but
+                keep the batches instead of sending them; read them back
+                with ``Errly.captured_events()``
+            dry_mode_path: In dry mode, append batches to this file (JSON
+                lines, or length-prefixed in the binary wire format) instead
+                of keeping the last 1000 in memory
+            agent_socket: Unix socket of a host-local ``python -m
+                errlypy.agent``; batches are written to it without blocking
+                and the agent delivers them for every process on the host.
+                The agent listens on ``errlypy.client.agent.default_socket_path()``
+                unless given ``--socket``; its socket is private to its user
+            wire_format: "json", or "binary" for the compact length-prefixed
+                encoding in ``errlypy.internal.wire`` (the ingest endpoint has
+                to accept it). Dry mode and the agent socket use it too; the
+                agent reads either and forwards JSON
+            compress: Gzip request bodies (``Content-Encoding: gzip``); with
+                destinations, each batch is compressed once for all of them
+            destinations: Further Errly instances (e.g. DR, staging) that get
+                every batch too. Batches are encoded once; each destination
+                has its own queue and retries and can't hold up the others.
+                Delivery futures (see ``capture_exception``) then resolve True
+                once the batch is queued for at least one destination, not
+                when a destination has accepted it
+            profile_interval: Seconds between samples of every thread's stack
+                (e.g. 0.1). Enables the sampling profiler: events get the
+                hottest stacks as ``hot_stacks`` and a profile is sent every
+                minute. The interval grows if sampling costs more than 1% CPU
+            slow_request_threshold: Seconds after which a Django or FastAPI
+                request that is still running is reported once, as a WARNING
+                with its route, elapsed time and the stack it is stuck in
+            loop_lag_threshold: Seconds an asyncio event loop may be blocked
+                before the blocking stack is reported as a WARNING (once per
+                distinct stack and minute). The loops serving FastAPI and
+                ASGI Django requests are watched, and lag percentiles are
+                sent every minute
+            gc_monitoring: Time every garbage collection through
+                ``gc.callbacks`` into per-generation ``gc_pause`` histograms,
+                and add the collections of the 10 seconds before an event to
+                it as ``gc``
+            record_queries: Count and time the SQL of every Django request
+                by query shape; errors get the totals, slowest queries and
+                N+1 patterns (a SELECT repeated 5 times or more) as
+                ``queries``
+            report_n_plus_one: With ``record_queries``, also send every N+1
+                pattern as a WARNING, once per route and query shape
+        """
         # Normalize URL
         if url.endswith("/"):
             url = url[:-1]
 
         controller = UninitializedModuleController.init(
-            base_url=url, api_key=api_key, environment=environment
+            base_url=url,
+            api_key=api_key,
+            environment=environment,
+            logging_level=logging_level,
+            shutdown_timeout=shutdown_timeout,
+            capture_time_budget=capture_time_budget,
+            max_frames=max_frames,
+            scrub_keys=scrub_keys,
+            scrub_values=scrub_values,
+            dry_mode=dry_mode,
+            dry_mode_path=dry_mode_path,
+            agent_socket=agent_socket,
+            wire_format=wire_format,
+            compress=compress,
+            destinations=destinations,
+            profile_interval=profile_interval,
+            slow_request_threshold=slow_request_threshold,
+            loop_lag_threshold=loop_lag_threshold,
+            gc_monitoring=gc_monitoring,
+            record_queries=record_queries,
+            report_n_plus_one=report_n_plus_one,
         )
 
         if isinstance(controller, IUninitializedModuleController):
             raise ValueError("No modules have been initialized")
 
         cls._module_controller = controller
+
+    @staticmethod
+    def register_loop(loop: "Optional[asyncio.AbstractEventLoop]" = None) -> None:
+        """
+        Captures the exceptions reported to ``loop`` (by default the running
+        one), e.g. from tasks that failed and were never awaited, and
+        watches its lag if the loop lag monitor is on.
+        """
+        if loop is None:
+            import asyncio
+
+            loop = asyncio.get_running_loop()
+
+        register_loop(loop)
+
+    @classmethod
+    def flush(cls, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until every event captured so far has been sent.
+
+        Returns:
+            bool: False if the timeout expired before the queue was drained
+        """
+        if cls._module_controller is None:
+            return True
+
+        return cls._module_controller.flush(timeout)
+
+    @classmethod
+    def close(cls, timeout: Optional[float] = None) -> bool:
+        """
+        Flushes queued events and shuts errlypy down; integrations are detached.
+
+        Returns:
+            bool: False if the timeout expired before the queue was drained
+        """
+        if cls._module_controller is None:
+            return True
+
+        controller, cls._module_controller = cls._module_controller, None
+        return controller.close(timeout)
+
+    @staticmethod
+    def stats() -> Dict[str, Dict]:
+        """
+        Returns errlypy's own counters (events queued, dropped, sent, bytes
+        sent, failed requests), gauges (queue depth) and latency histograms
+        (capture, event build, serialization, send).
+        """
+        return registry.snapshot()
+
+    @classmethod
+    def captured_events(cls) -> List[Dict[str, Any]]:
+        """
+        Returns the events recorded in dry mode, oldest first, decoded from
+        the JSON that would have been sent. Empty when not in dry mode.
+        """
+        from errlypy.client.dry import DryRunClient
+
+        http_client = cls._http_client()
+        if http_client is None or not isinstance(http_client.transport, DryRunClient):
+            return []
+
+        return http_client.transport.events()
+
+    @staticmethod
+    def prometheus_metrics() -> str:
+        """Returns ``Errly.stats()`` in the Prometheus text exposition format."""
+        return to_prometheus(registry.snapshot())
+
+    @overload
+    @classmethod
+    def capture_exception(
+        cls,
+        exc: Optional[BaseException] = None,
+        *,
+        level: ErrorLevel = ErrorLevel.ERROR,
+        tags: Optional[Dict[str, str]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        delivery: Literal[False] = False,
+    ) -> Optional[str]: ...
+
+    @overload
+    @classmethod
+    def capture_exception(
+        cls,
+        exc: Optional[BaseException] = None,
+        *,
+        level: ErrorLevel = ErrorLevel.ERROR,
+        tags: Optional[Dict[str, str]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        delivery: Literal[True],
+    ) -> Tuple[Optional[str], "Future[bool]"]: ...
+
+    @classmethod
+    def capture_exception(
+        cls,
+        exc: Optional[BaseException] = None,
+        *,
+        level: ErrorLevel = ErrorLevel.ERROR,
+        tags: Optional[Dict[str, str]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        delivery: bool = False,
+    ) -> Union[Optional[str], Tuple[Optional[str], "Future[bool]"]]:
+        """
+        Reports a handled exception without waiting for it to be sent.
+
+        The exception is parsed on the calling thread (within the capture time
+        budget) and the event is queued for the background worker, so nothing
+        is kept alive after the call returns.
+
+        Args:
+            exc: Exception to report; defaults to the one being handled
+            level: Level of the event
+            tags: Tags added to the event
+            extra: Extra data added to the event; sensitive keys are scrubbed
+            delivery: Also return a future that resolves to True once the
+                event has been delivered, or False if it was dropped or failed
+
+        Returns:
+            The event ID, or None if errlypy is not initialized or there is no
+            exception to report. With ``delivery``, ``(event_id, future)``.
+        """
+        if exc is None:
+            exc = sys.exc_info()[1]
+
+        from concurrent.futures import Future
+
+        future: "Optional[Future[bool]]" = Future() if delivery else None
+        event_id = None
+        http_client = cls._http_client()
+        if http_client is not None and exc is not None:
+            from errlypy import capture
+
+            event_id = capture.capture_exception(http_client, exc, level, tags, extra, future)
+
+        return cls._capture_result(event_id, future)
+
+    @overload
+    @classmethod
+    def capture_message(
+        cls,
+        message: str,
+        *,
+        level: ErrorLevel = ErrorLevel.INFO,
+        tags: Optional[Dict[str, str]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        delivery: Literal[False] = False,
+    ) -> Optional[str]: ...
+
+    @overload
+    @classmethod
+    def capture_message(
+        cls,
+        message: str,
+        *,
+        level: ErrorLevel = ErrorLevel.INFO,
+        tags: Optional[Dict[str, str]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        delivery: Literal[True],
+    ) -> Tuple[Optional[str], "Future[bool]"]: ...
+
+    @classmethod
+    def capture_message(
+        cls,
+        message: str,
+        *,
+        level: ErrorLevel = ErrorLevel.INFO,
+        tags: Optional[Dict[str, str]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        delivery: bool = False,
+    ) -> Union[Optional[str], Tuple[Optional[str], "Future[bool]"]]:
+        """
+        Reports a message without waiting for it to be sent. Arguments and
+        return value are the same as for ``capture_exception``.
+        """
+        from concurrent.futures import Future
+
+        future: "Optional[Future[bool]]" = Future() if delivery else None
+        event_id = None
+        http_client = cls._http_client()
+        if http_client is not None:
+            from errlypy import capture
+
+            event_id = capture.capture_message(http_client, message, level, tags, extra, future)
+
+        return cls._capture_result(event_id, future)
+
+    @classmethod
+    def aggregate(
+        cls,
+        *,
+        level: ErrorLevel = ErrorLevel.ERROR,
+        tags: Optional[Dict[str, str]] = None,
+        interval: Optional[float] = None,
+        max_fingerprints: int = 100,
+    ) -> "Aggregator":
+        """
+        Groups exceptions from a batch job instead of reporting each one::
+
+            with Errly.aggregate(interval=60) as errors:
+                for record in records:
+                    try:
+                        process(record)
+                    except ValidationError as exc:
+                        errors.capture_exception(exc)
+
+        Exceptions are grouped by type and code location; one full sample per
+        group is sent with its count and first/last-seen times when the block
+        exits and, with ``interval``, at least that many seconds apart.
+
+        Args:
+            level: Level of the summary events
+            tags: Tags added to the summary events
+            interval: Seconds between intermediate summaries; None only
+                reports when the block exits
+            max_fingerprints: Groups kept at once; occurrences of further
+                fingerprints are only counted
+        """
+        from errlypy.aggregate import Aggregator
+
+        return Aggregator(
+            cls._http_client(),
+            level=level,
+            tags=tags,
+            interval=interval,
+            max_fingerprints=max_fingerprints,
+        )
+
+    @classmethod
+    def capture_many(
+        cls,
+        exceptions: Iterable[BaseException],
+        *,
+        level: ErrorLevel = ErrorLevel.ERROR,
+        tags: Optional[Dict[str, str]] = None,
+    ) -> List[str]:
+        """
+        Reports a collection of exceptions as one summary event per group, see
+        ``aggregate``. Returns the IDs of the summary events.
+        """
+        aggregator = cls.aggregate(level=level, tags=tags)
+        aggregator.capture_many(exceptions)
+        return aggregator.flush()
+
+    @classmethod
+    def _http_client(cls) -> Optional["HTTPClient"]:
+        if isinstance(cls._module_controller, ModuleController):
+            return cls._module_controller.http_client
+        return None
+
+    @staticmethod
+    def _capture_result(
+        event_id: Optional[str], future: "Optional[Future[bool]]"
+    ) -> Union[Optional[str], Tuple[Optional[str], "Future[bool]"]]:
+        if future is None:
+            return event_id
+
+        if event_id is None:
+            # Nothing was queued, so nothing will ever resolve it
+            future.set_result(False)
+        return event_id, future
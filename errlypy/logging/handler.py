@@ -0,0 +1,136 @@
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import Optional
+
+from errlypy.client import HTTPClient
+from errlypy.client.worker import BatchWorker
+from errlypy.exception import ParsedExceptionDto
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.internal.config import CaptureConfig
+from errlypy.models.ingest import ErrorLevel, IngestEvent
+
+_emit_state = threading.local()
+
+
+def level_to_error_level(levelno: int) -> ErrorLevel:
+    """Maps a stdlib logging level onto the closest ErrorLevel."""
+    if levelno >= logging.ERROR:
+        return ErrorLevel.ERROR
+    if levelno >= logging.WARNING:
+        return ErrorLevel.WARNING
+    if levelno >= logging.INFO:
+        return ErrorLevel.INFO
+    return ErrorLevel.DEBUG
+
+
+@dataclass(frozen=True)
+class _RecordSnapshot:
+    """What an event is built from; holds no record arguments or traceback."""
+
+    name: str
+    levelno: int
+    created: float
+    module: str
+    function: str
+    lineno: int
+    message: str
+    exception: Optional[ParsedExceptionDto]
+
+
+class ErrlyLoggingHandler(logging.Handler):
+    """
+    Forwards log records at or above ``level`` to Errly.
+
+    ``emit`` formats the message and parses the exception right away, so the
+    record's arguments and traceback (and every frame and local they keep
+    alive) are released when it returns; conversion to an ``IngestEvent``
+    happens on the background worker. Records produced by errlypy itself, by
+    the worker thread or re-entrantly from inside ``emit`` are ignored so a
+    logging transport can never feed back into itself.
+    """
+
+    def __init__(self, http_client: HTTPClient, level: int = logging.ERROR) -> None:
+        super().__init__(level=level)
+        self._http_client = http_client
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # Checked before filters and without taking the handler lock: emit never
+        # blocks, and the worker thread may log while we are being called.
+        if record.levelno < self.level:
+            return False
+
+        if not self.filter(record):
+            return False
+
+        self.emit(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.name.startswith("errlypy") or BatchWorker.in_worker_thread():
+            return
+
+        if getattr(_emit_state, "active", False):
+            return
+
+        _emit_state.active = True
+        try:
+            self._http_client.submit(
+                partial(self._build_event, self._snapshot(record)),
+                level=level_to_error_level(record.levelno),
+            )
+        except Exception:
+            self.handleError(record)
+        finally:
+            _emit_state.active = False
+
+    def _snapshot(self, record: logging.LogRecord) -> _RecordSnapshot:
+        try:
+            message = record.getMessage()
+        except Exception:
+            message = str(record.msg)
+
+        scrubber = CaptureConfig.scrubber
+        if scrubber is not None:
+            message = scrubber.scrub_text(message)
+
+        parsed: Optional[ParsedExceptionDto] = None
+        if record.exc_info and record.exc_info[1] is not None:
+            exc_type, exc_value, exc_traceback = record.exc_info
+            callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+            parsed = callback(exc_type, exc_value, exc_traceback)  # type: ignore[arg-type]
+
+        return _RecordSnapshot(
+            name=record.name,
+            levelno=record.levelno,
+            created=record.created,
+            module=record.module,
+            function=record.funcName,
+            lineno=record.lineno,
+            message=message,
+            exception=parsed,
+        )
+
+    def _build_event(self, record: _RecordSnapshot) -> Optional[IngestEvent]:
+        parsed = record.exception
+        if parsed is not None:
+            event = self._http_client._transform_to_ingest_event(parsed)
+            event.extra["exception"] = parsed.content
+        else:
+            event = IngestEvent(message=record.message, environment=self._http_client.environment)
+
+        event.message = record.message
+        event.level = level_to_error_level(record.levelno)
+        event.timestamp = datetime.fromtimestamp(record.created)
+        event.tags["logger"] = record.name
+        event.extra.update(
+            {
+                "module": record.module,
+                "function": record.function,
+                "lineno": record.lineno,
+            }
+        )
+
+        return event
@@ -0,0 +1,79 @@
+import logging
+from typing import ClassVar, List, Optional, Union
+from uuid import uuid4
+
+from errlypy.api import IModule, IPlugin, IUninitializedModule
+from errlypy.client import HTTPClient
+from errlypy.internal.event.on_plugin_initialized import OnPluginInitializedEvent
+from errlypy.internal.event.type import EventType
+from errlypy.logging.handler import ErrlyLoggingHandler
+from errlypy.logging.plugin import LoggingPlugin
+from errlypy.utils import singleton_instance
+
+
+class UninitializedLoggingModule(IUninitializedModule):
+    """
+    Represents the uninitialized state of the logging module.
+    Attaches an Errly handler to the root logger on setup.
+    """
+
+    _instance: ClassVar[Optional["UninitializedLoggingModule"]] = None
+
+    def __new__(cls) -> "UninitializedLoggingModule":
+        return singleton_instance(cls)
+
+    @staticmethod
+    def _initialize_plugin(handler: ErrlyLoggingHandler) -> LoggingPlugin:
+        plugin = LoggingPlugin()
+        plugin.setup(handler)
+
+        return plugin
+
+    @classmethod
+    def setup(
+        cls,
+        http_client: HTTPClient,
+        level: int = logging.ERROR,
+    ) -> Union["LoggingModule", "UninitializedLoggingModule"]:
+        """
+        Initializes the logging module and transitions to initialized state.
+
+        Args:
+            http_client: Shared client records are published to
+            level: Minimum record level forwarded to Errly
+
+        Returns:
+            LoggingModule: Initialized logging module instance
+        """
+        on_initialized_event = EventType[OnPluginInitializedEvent]()
+
+        plugin = cls._initialize_plugin(ErrlyLoggingHandler(http_client, level=level))
+
+        on_initialized_event.notify(
+            OnPluginInitializedEvent(event_id=uuid4()),
+        )
+
+        return LoggingModule(plugins=[plugin])
+
+
+class LoggingModule(IModule):
+    """
+    Represents the initialized state of the logging module.
+    """
+
+    _instance: ClassVar[Optional["LoggingModule"]] = None
+    _plugins: List[IPlugin]
+
+    def __new__(cls, *args, **kwargs) -> "LoggingModule":
+        return singleton_instance(cls)
+
+    def __init__(self, plugins: List[IPlugin]) -> None:
+        self._plugins = plugins
+
+    @classmethod
+    def revert(cls) -> IUninitializedModule:
+        if cls._instance is not None:
+            for plugin in cls._instance._plugins:
+                plugin.revert()
+
+        return UninitializedLoggingModule()
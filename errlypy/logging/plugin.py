@@ -0,0 +1,29 @@
+import logging
+from typing import Optional
+
+from errlypy.api import IPlugin
+from errlypy.logging.handler import ErrlyLoggingHandler
+
+
+class LoggingPlugin(IPlugin):
+    _handler: Optional[ErrlyLoggingHandler] = None
+    _logger: Optional[logging.Logger] = None
+
+    def __init__(
+        self,
+    ) -> None: ...
+
+    def setup(self, handler: ErrlyLoggingHandler, logger: Optional[logging.Logger] = None):
+        self._handler = handler
+        self._logger = logger if logger is not None else logging.getLogger()
+        self._logger.addHandler(handler)
+
+    def revert(self):
+        if self._logger is not None and self._handler is not None:
+            self._logger.removeHandler(self._handler)
+
+    def __call__(self, record: logging.LogRecord) -> bool:
+        if self._handler is None:
+            return False
+
+        return self._handler.handle(record)
@@ -0,0 +1,269 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+from errlypy import capture
+from errlypy.client import HTTPClient
+from errlypy.exception import ParsedExceptionDto
+from errlypy.internal.metrics import registry
+from errlypy.models.ingest import ErrorLevel
+from errlypy.watchdog import _frame_details, _thread_frames
+
+if TYPE_CHECKING:
+    import asyncio
+
+logger = logging.getLogger(__name__)
+
+# Lag samples kept per window for the percentiles, the newest ones win
+_MAX_SAMPLES = 10_000
+
+# Stacks already reported in the current window
+_MAX_FINGERPRINTS = 1000
+
+_Fingerprint = Tuple[Tuple[str, str, Optional[int]], ...]
+
+
+class _LoopState:
+    __slots__ = ("loop", "thread_id", "last_beat", "stalled")
+
+    def __init__(self, loop: "asyncio.AbstractEventLoop") -> None:
+        self.loop = loop
+        self.thread_id: Optional[int] = None
+        self.last_beat = time.monotonic()
+        # Set once the current stall has been captured, cleared by the next beat
+        self.stalled = False
+
+
+class _Window:
+    __slots__ = ("lags", "stalls", "other", "started")
+
+    def __init__(self) -> None:
+        self.lags: Deque[float] = deque(maxlen=_MAX_SAMPLES)
+        self.stalls: Dict[_Fingerprint, int] = {}
+        # Stalls of new stacks once the fingerprint table is full
+        self.other = 0
+        self.started = time.monotonic()
+
+
+class LoopLagMonitor:
+    """
+    Measures how late asyncio event loops run their callbacks, to find
+    blocking calls in async code.
+
+    Every watched loop runs a heartbeat callback each ``interval`` seconds;
+    how much later than scheduled it runs is the loop's lag. A helper thread
+    checks the heartbeats, and when one is more than ``threshold`` seconds
+    overdue it captures the stack of the loop's thread right then, which is
+    the call blocking the loop. Each blocking stack is reported once per
+    window as a WARNING; repeats are only counted, and so are new stacks once
+    ``_MAX_FINGERPRINTS`` are known in the window. Every ``report_interval``
+    the lag percentiles and stall counts of the window are sent as an INFO
+    event tagged ``loop_lag`` and a new window starts.
+    """
+
+    def __init__(
+        self,
+        http_client: HTTPClient,
+        threshold: float = 0.1,
+        interval: float = 0.05,
+        report_interval: float = 60.0,
+    ) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self._http_client = http_client
+        self._report_interval = report_interval
+        self._check_interval = threshold / 4
+        self._loops: Dict["asyncio.AbstractEventLoop", _LoopState] = {}
+        self._window = _Window()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        _monitors.add(self)
+
+    def watch(self, loop: "asyncio.AbstractEventLoop") -> None:
+        """Starts the heartbeat on ``loop``; does nothing if it is already watched."""
+        if loop in self._loops:
+            return
+
+        with self._lock:
+            if loop in self._loops:
+                return
+            state = self._loops[loop] = _LoopState(loop)
+
+        loop.call_soon_threadsafe(self._beat, state, loop.time())
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._start_thread()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        with self._lock:
+            self._loops.clear()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def reset_after_fork(self) -> None:
+        """
+        Called in a forked child: the lock may have been held while forking,
+        the thread is gone and the loops are the parent's; a loop the child
+        runs is watched again when it is registered.
+        """
+        self._lock = threading.Lock()
+        self._loops = {}
+        self._window = _Window()
+        self._stop = threading.Event()
+        if self._thread is not None:
+            self._start_thread()
+
+    def percentiles(self) -> Dict[str, Any]:
+        """Lag percentiles of the current window, in seconds."""
+        with self._lock:
+            lags = sorted(self._window.lags)
+        return _percentiles(lags)
+
+    def check(self) -> int:
+        """Captures loops that are blocked right now; returns how many new stalls were reported."""
+        now = time.monotonic()
+        with self._lock:
+            states = list(self._loops.values())
+
+        reported = 0
+        for state in states:
+            if state.loop.is_closed():
+                with self._lock:
+                    self._loops.pop(state.loop, None)
+                continue
+
+            thread_id = state.thread_id
+            overdue = now - state.last_beat - self.interval
+            if state.stalled or thread_id is None or overdue < self.threshold:
+                continue
+
+            state.stalled = True
+            try:
+                reported += self._stalled(thread_id, overdue)
+            except Exception:
+                logger.debug("Unable to report event loop stall", exc_info=True)
+        return reported
+
+    def report(self) -> Optional[str]:
+        """Ships the lag percentiles of the current window and starts a new one."""
+        with self._lock:
+            window, self._window = self._window, _Window()
+
+        if not window.lags:
+            return None
+
+        summary: Dict[str, Any] = {
+            **_percentiles(sorted(window.lags)),
+            "duration": round(time.monotonic() - window.started, 3),
+            "interval": self.interval,
+            "stalls": sum(window.stalls.values()) + window.other,
+            "distinct_stalls": len(window.stalls),
+        }
+        if window.other:
+            summary["other_stalls"] = window.other
+        return capture.submit(
+            self._http_client,
+            f"Event loop lag over {len(window.lags)} heartbeats",
+            ErrorLevel.INFO,
+            {"loop_lag": "true"},
+            {"loop_lag": summary},
+        )
+
+    def _beat(self, state: _LoopState, expected: float) -> None:
+        now = state.loop.time()
+        lag = max(0.0, now - expected)
+        state.thread_id = threading.get_ident()
+        state.last_beat = time.monotonic()
+        state.stalled = False
+
+        registry.observe("event_loop_lag", lag)
+        with self._lock:
+            self._window.lags.append(lag)
+            if self._loops.get(state.loop) is not state:
+                # Stopped, or the loop is watched anew
+                return
+
+        state.loop.call_at(now + self.interval, self._beat, state, now + self.interval)
+
+    def _stalled(self, thread_id: int, blocked: float) -> int:
+        # The stack is taken while the loop is still blocked
+        frames = _frame_details(_thread_frames(thread_id))
+        fingerprint = tuple((frame.filename, frame.function, frame.lineno) for frame in frames)
+
+        registry.inc("event_loop_stalls")
+        with self._lock:
+            window = self._window
+            if fingerprint in window.stalls:
+                window.stalls[fingerprint] += 1
+                return 0
+            if len(window.stalls) >= _MAX_FINGERPRINTS:
+                # Not reported: it couldn't be deduplicated for the rest of the window
+                window.other += 1
+                return 0
+            window.stalls[fingerprint] = 1
+
+        message = f"Event loop blocked for more than {blocked:.2f}s"
+        capture.submit(
+            self._http_client,
+            message,
+            ErrorLevel.WARNING,
+            {"loop_stall": "true"},
+            {"blocked": round(blocked, 3), "threshold": self.threshold},
+            exception=ParsedExceptionDto(content=message, frames=frames),
+        )
+        return 1
+
+    def _start_thread(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="errlypy-loop-lag", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        next_report = time.monotonic() + self._report_interval
+        while not self._stop.wait(self._check_interval):
+            self.check()
+
+            if time.monotonic() >= next_report:
+                next_report += self._report_interval
+                try:
+                    self.report()
+                except Exception:
+                    logger.debug("Unable to report event loop lag", exc_info=True)
+
+
+_monitors: "weakref.WeakSet[LoopLagMonitor]" = weakref.WeakSet()
+
+
+def _reset_monitors_after_fork() -> None:
+    for monitor in list(_monitors):
+        monitor.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_monitors_after_fork)
+
+
+def _percentiles(lags: List[float]) -> Dict[str, Any]:
+    if not lags:
+        return {"samples": 0}
+
+    def at(share: float) -> float:
+        return round(lags[min(len(lags) - 1, int(share * len(lags)))], 6)
+
+    return {
+        "samples": len(lags),
+        "p50": at(0.5),
+        "p90": at(0.9),
+        "p99": at(0.99),
+        "max": round(lags[-1], 6),
+    }
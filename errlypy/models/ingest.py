@@ -27,6 +27,7 @@ class IngestEvent:
     tags: Dict[str, str] = field(default_factory=dict)
     extra: Dict[str, Any] = field(default_factory=dict)
     timestamp: Optional[datetime] = None
+    event_id: Optional[str] = None
 
 
 @dataclass
@@ -0,0 +1,284 @@
+import heapq
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from operator import itemgetter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from errlypy import capture
+from errlypy.client import HTTPClient
+from errlypy.exception.stack import FrameWalk, _Repeat, is_library_frame
+from errlypy.internal.metrics import registry
+from errlypy.models.ingest import ErrorLevel, IngestEvent
+
+logger = logging.getLogger(__name__)
+
+# A stack, outermost frame first; strings stand for collapsed frames
+_StackKey = Tuple[Union[Tuple[CodeType, int], str], ...]
+
+_RECURSION = "[recursion]"
+_OMITTED = "[frames omitted]"
+
+# Weight of the newest sample in the moving average of the sampling cost
+_COST_SMOOTHING = 0.1
+
+# Fewest samples a window needs before events get its hot stacks
+_MIN_SAMPLES = 10
+
+
+class _Window:
+    __slots__ = ("stacks", "samples", "other", "started")
+
+    def __init__(self) -> None:
+        self.stacks: Dict[_StackKey, int] = {}
+        # Sampling rounds, and thread samples whose stack didn't fit the table
+        self.samples = 0
+        self.other = 0
+        self.started = time.monotonic()
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of every thread from a background thread and counts
+    how often each stack was seen, to tell what the process was busy with
+    when an error happened (e.g. a timeout under load).
+
+    Stacks are classified like captured tracebacks: library frames are left
+    out except for the innermost one, where the thread actually is, and
+    recursion and overly deep stacks are collapsed by ``FrameWalk``. The
+    table holds at most ``max_stacks`` distinct stacks; later ones are only
+    counted as "other".
+
+    The ``top`` hottest stacks are added to every event as ``hot_stacks``,
+    and every ``report_interval`` the window is shipped as an INFO event
+    tagged ``profile`` and started over. The average cost of a sample is
+    measured against the interval; whenever it exceeds ``max_overhead`` the
+    interval is doubled.
+    """
+
+    def __init__(
+        self,
+        http_client: HTTPClient,
+        interval: float = 0.1,
+        max_stacks: int = 500,
+        max_depth: int = 32,
+        top: int = 5,
+        report_interval: float = 60.0,
+        max_overhead: float = 0.01,
+    ) -> None:
+        self.interval = interval
+        self._http_client = http_client
+        self._max_stacks = max_stacks
+        self._max_depth = max_depth
+        self._top = top
+        self._report_interval = report_interval
+        self._max_overhead = max_overhead
+        self._window = _Window()
+        self._previous: Optional[_Window] = None
+        self._cost = 0.0
+        # Raw stacks seen recently and their classified keys
+        self._keys: Dict[Tuple[Tuple[CodeType, int], ...], _StackKey] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        _profilers.add(self)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._start_thread()
+        self._http_client.add_event_processor(self.attach)
+        registry.register_gauge("profiler_overhead", self.overhead)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._http_client.remove_event_processor(self.attach)
+        registry.unregister_gauge("profiler_overhead", self.overhead)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def reset_after_fork(self) -> None:
+        """
+        Called in a forked child: the window holds the parent's stacks, the
+        lock may have been held while forking and the thread is gone, so the
+        child starts over and samples its own threads.
+        """
+        self._lock = threading.Lock()
+        self._window = _Window()
+        self._previous = None
+        self._keys = {}
+        self._stop = threading.Event()
+        if self._thread is not None:
+            self._start_thread()
+
+    def overhead(self) -> float:
+        """Average share of a CPU spent sampling, e.g. 0.002 for 0.2%."""
+        return self._cost / self.interval
+
+    def sample(self) -> None:
+        """Takes one sample of every thread except errlypy's own."""
+        ignored = {
+            thread.ident for thread in threading.enumerate() if thread.name.startswith("errlypy-")
+        }
+        keys = [
+            self._stack_key(frame)
+            for ident, frame in sys._current_frames().items()
+            if ident not in ignored
+        ]
+
+        with self._lock:
+            window = self._window
+            window.samples += 1
+            for key in keys:
+                if key in window.stacks:
+                    window.stacks[key] += 1
+                elif len(window.stacks) < self._max_stacks:
+                    window.stacks[key] = 1
+                else:
+                    window.other += 1
+
+    def hot_stacks(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The most frequently seen stacks of the recent samples, hottest first."""
+        with self._lock:
+            window = self._window
+            if window.samples < _MIN_SAMPLES and self._previous is not None:
+                # Just after a report the new window says little yet
+                window = self._previous
+            return _summarize(window, self._top if top is None else top)
+
+    def attach(self, event: IngestEvent) -> None:
+        if "profile" in event.extra:
+            return
+
+        summary = self.hot_stacks()
+        if summary:
+            event.extra["hot_stacks"] = summary
+
+    def report(self, top: int = 20) -> Optional[str]:
+        """Ships the current window as an event and starts a new one."""
+        with self._lock:
+            window, self._window = self._window, _Window()
+            if window.samples:
+                self._previous = window
+
+        if not window.samples:
+            return None
+
+        registry.inc("profiles_sent")
+        profile = {
+            "samples": window.samples,
+            "duration": round(time.monotonic() - window.started, 3),
+            "interval": self.interval,
+            "overhead": round(self.overhead(), 5),
+            "other": window.other,
+            "stacks": _summarize(window, top),
+        }
+        return capture.submit(
+            self._http_client,
+            f"Profile of {window.samples} samples",
+            ErrorLevel.INFO,
+            {"profile": "true"},
+            {"profile": profile},
+        )
+
+    def _start_thread(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="errlypy-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        next_report = time.monotonic() + self._report_interval
+        while not self._stop.wait(self.interval):
+            start = time.thread_time()
+            try:
+                self.sample()
+            except Exception:
+                logger.debug("Unable to sample stacks", exc_info=True)
+            cost = time.thread_time() - start
+            self._cost += _COST_SMOOTHING * (cost - self._cost)
+
+            if self.overhead() > self._max_overhead:
+                self.interval *= 2
+                registry.inc("profiler_backoffs")
+
+            if time.monotonic() >= next_report:
+                next_report += self._report_interval
+                try:
+                    self.report()
+                except Exception:
+                    logger.debug("Unable to report profile", exc_info=True)
+
+    def _stack_key(self, frame: Optional[FrameType]) -> _StackKey:
+        frames = []
+        raw = []
+        while frame is not None:
+            frames.append(frame)
+            raw.append((frame.f_code, frame.f_lineno))
+            frame = frame.f_back
+
+        # Most threads sit in the same few places from sample to sample
+        raw_key = tuple(raw)
+        key = self._keys.get(raw_key)
+        if key is None:
+            if len(self._keys) >= 4 * self._max_stacks:
+                self._keys.clear()
+            key = self._keys[raw_key] = self._classify(frames[::-1])
+        return key
+
+    def _classify(self, frames: List[FrameType]) -> _StackKey:
+        # The innermost frame is kept even in library code: it is where the
+        # thread is waiting or busy (a socket read, a lock)
+        kept = [(frame, frame.f_lineno) for frame in frames[:-1] if not is_library_frame(frame)]
+        if frames:
+            kept.append((frames[-1], frames[-1].f_lineno))
+
+        walk = FrameWalk(self._max_depth).walk(kept)
+        key: List[Union[Tuple[CodeType, int], str]] = []
+        for position, entry in enumerate(walk.entries):
+            if position == walk.omitted_at:
+                key.append(_OMITTED)
+            if isinstance(entry, _Repeat):
+                # Not counted, so different recursion depths add up
+                key.append(_RECURSION)
+            else:
+                key.append((entry[0].f_code, entry[1]))
+        return tuple(key)
+
+
+def _summarize(window: _Window, top: int) -> List[Dict[str, Any]]:
+    total = sum(window.stacks.values()) + window.other
+    hottest = heapq.nlargest(top, window.stacks.items(), key=itemgetter(1))
+    return [
+        {
+            "count": count,
+            "share": round(count / total, 3),
+            "stack": [_describe(entry) for entry in key],
+        }
+        for key, count in hottest
+    ]
+
+
+def _describe(entry: Union[Tuple[CodeType, int], str]) -> str:
+    if isinstance(entry, str):
+        return entry
+
+    code, lineno = entry
+    return f"{code.co_filename}:{lineno} in {code.co_name}"
+
+
+_profilers: "weakref.WeakSet[SamplingProfiler]" = weakref.WeakSet()
+
+
+def _reset_profilers_after_fork() -> None:
+    for profiler in list(_profilers):
+        profiler.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_profilers_after_fork)
@@ -1,8 +1,29 @@
+import threading
 from dataclasses import fields
-from typing import Any, TypeVar
+from typing import Any, Type, TypeVar
 
 T = TypeVar("T")
 
+_singleton_lock = threading.Lock()
+
+
+def singleton_instance(cls: Type[T]) -> T:
+    """
+    Returns ``cls._instance``, creating it first. Creation is locked, so
+    threads constructing the class at once (in parallel on free-threaded
+    builds) all get the same instance.
+    """
+    instance = cls.__dict__.get("_instance")
+    if instance is not None:
+        return instance
+
+    with _singleton_lock:
+        instance = cls.__dict__.get("_instance")
+        if instance is None:
+            instance = object.__new__(cls)
+            setattr(cls, "_instance", instance)  # noqa: B010
+        return instance
+
 
 def has_contract_been_implemented(instance: T, cls: type) -> bool:
     instance_methods = {item for item in set(dir(instance)) if not item.startswith("__")}
@@ -0,0 +1,224 @@
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from types import FrameType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from errlypy import capture
+from errlypy.client import HTTPClient
+from errlypy.exception import FrameDetail, ParsedExceptionDto
+from errlypy.exception.callback import FrameExtractor
+from errlypy.exception.stack import StackSummaryWrapper, is_library_frame
+from errlypy.internal.config import CaptureConfig
+from errlypy.internal.metrics import registry
+from errlypy.models.ingest import ErrorLevel
+
+if TYPE_CHECKING:
+    import asyncio
+
+logger = logging.getLogger(__name__)
+
+
+class _InFlight:
+    __slots__ = ("route", "resolve_route", "started", "thread_id", "task", "reported")
+
+    def __init__(
+        self,
+        route: str,
+        task: Optional["asyncio.Task"],
+        resolve_route: Optional[Callable[[], str]],
+    ) -> None:
+        self.route = route
+        self.resolve_route = resolve_route
+        self.started = time.monotonic()
+        self.thread_id = threading.get_ident()
+        self.task = task
+        self.reported = False
+
+
+class RequestWatchdog:
+    """
+    Reports requests that run longer than ``threshold`` seconds without
+    finishing, with the stack they are stuck in.
+
+    The integrations call ``begin`` and ``end`` around every request; both
+    are a dict insert or delete. Requests are kept in the order they began,
+    so the watchdog thread only looks at the oldest ones and stops at the
+    first that is still within the threshold. Each slow request is reported
+    once, as a WARNING with the route, the elapsed time and the current
+    stack of its thread, or of its task for async requests.
+    """
+
+    def __init__(
+        self,
+        http_client: HTTPClient,
+        threshold: float = 30.0,
+        check_interval: Optional[float] = None,
+    ) -> None:
+        self.threshold = threshold
+        self._http_client = http_client
+        self._check_interval = (
+            check_interval if check_interval is not None else min(1.0, threshold / 4)
+        )
+        self._in_flight: Dict[int, _InFlight] = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        _watchdogs.add(self)
+
+    def begin(
+        self,
+        route: str,
+        task: Optional["asyncio.Task"] = None,
+        resolve_route: Optional[Callable[[], str]] = None,
+    ) -> int:
+        """
+        Starts tracking a request on this thread (or ``task``); returns its
+        token. The URL pattern is usually only known once the request is
+        routed, so ``resolve_route`` is called if the request is reported,
+        and ``route`` (the path) is used if it fails.
+        """
+        request = _InFlight(route, task, resolve_route)
+        with self._lock:
+            token = next(self._tokens)
+            self._in_flight[token] = request
+        return token
+
+    def end(self, token: int) -> None:
+        with self._lock:
+            self._in_flight.pop(token, None)
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._start_thread()
+        registry.register_gauge("requests_in_flight", self.in_flight)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        registry.unregister_gauge("requests_in_flight", self.in_flight)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def reset_after_fork(self) -> None:
+        """
+        Called in a forked child: the parent's requests don't run there, the
+        lock may have been held while forking and the thread is gone.
+        """
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stop = threading.Event()
+        if self._thread is not None:
+            self._start_thread()
+
+    def check(self) -> int:
+        """Reports requests that have become slow since the last check; returns how many."""
+        now = time.monotonic()
+        slow: List[_InFlight] = []
+        with self._lock:
+            for request in self._in_flight.values():
+                if now - request.started < self.threshold:
+                    break
+                if not request.reported:
+                    request.reported = True
+                    slow.append(request)
+
+        for request in slow:
+            try:
+                self._report(request, now - request.started)
+            except Exception:
+                logger.debug("Unable to report slow request", exc_info=True)
+        return len(slow)
+
+    def _start_thread(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="errlypy-watchdog", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._check_interval):
+            self.check()
+
+    def _report(self, request: _InFlight, elapsed: float) -> None:
+        registry.inc("slow_requests")
+        route = request.route
+        if request.resolve_route is not None:
+            try:
+                route = request.resolve_route()
+            except Exception:
+                logger.debug("Unable to resolve the route of a slow request", exc_info=True)
+        message = f"Slow request: {route} has been running for {elapsed:.1f}s"
+        if request.task is not None:
+            frames = _task_frames(request.task)
+        else:
+            frames = _thread_frames(request.thread_id)
+
+        capture.submit(
+            self._http_client,
+            message,
+            ErrorLevel.WARNING,
+            {"slow_request": "true", "route": route},
+            {"elapsed": round(elapsed, 3), "threshold": self.threshold},
+            exception=ParsedExceptionDto(content=message, frames=_frame_details(frames)),
+        )
+
+
+def _thread_frames(thread_id: int) -> List[FrameType]:
+    frame: Optional[FrameType] = sys._current_frames().get(thread_id)
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    return frames[::-1]
+
+
+def _task_frames(task: "asyncio.Task") -> List[FrameType]:
+    """The frames of a task's await chain, outermost first."""
+    frames: List[FrameType] = []
+    if task.done():
+        return frames
+
+    awaitable: Any = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return frames
+
+
+def _frame_details(frames: List[FrameType]) -> List[FrameDetail]:
+    # Like captured tracebacks, without library frames; the innermost frame
+    # stays, it is where the request is waiting
+    kept = [(frame, frame.f_lineno) for frame in frames[:-1] if not is_library_frame(frame)]
+    if frames:
+        kept.append((frames[-1], frames[-1].f_lineno))
+
+    # Locals of a running thread are not read, they may change under us
+    limit = -CaptureConfig.max_frames if CaptureConfig.max_frames else None
+    summary = StackSummaryWrapper.extract(kept, limit=limit, capture_locals=False)
+    extractor = FrameExtractor()
+    return [extractor.extract(frame_summary) for frame_summary in summary]
+
+
+_watchdogs: "weakref.WeakSet[RequestWatchdog]" = weakref.WeakSet()
+
+
+def _reset_watchdogs_after_fork() -> None:
+    for watchdog in list(_watchdogs):
+        watchdog.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_watchdogs_after_fork)
@@ -0,0 +1,157 @@
+import os
+import socket
+import stat
+import tempfile
+import threading
+from typing import List
+
+import pytest
+
+from errlypy.agent import Agent
+from errlypy.client import HTTPClient
+from errlypy.client.agent import AgentClient, default_socket_path
+from errlypy.internal.metrics import registry
+from errlypy.models.ingest import IngestEvent, IngestRequest
+from tests.conftest import RecordingClient
+
+
+@pytest.fixture
+def agent(tmp_path):
+    upstream = RecordingClient()
+    agent = Agent(upstream, path=str(tmp_path / "agent.sock"), flush_interval=0.5)
+    agent.bind()
+    thread = threading.Thread(target=agent.serve_forever, daemon=True)
+    thread.start()
+
+    def stop() -> None:
+        agent.stop()
+        thread.join(timeout=5)
+
+    yield agent, upstream, stop
+
+    stop()
+    agent.close()
+
+
+def make_request(*messages: str) -> IngestRequest:
+    return IngestRequest(
+        events=[IngestEvent(message=message, environment="testing") for message in messages]
+    )
+
+
+def sent_messages(upstream: RecordingClient) -> List[str]:
+    return [event["message"] for request in upstream.requests for event in request["events"]]
+
+
+def test_agent_batches_events_from_several_processes(agent):
+    agent, upstream, stop = agent
+    workers = [AgentClient(agent.path) for _ in range(3)]
+
+    for index, worker in enumerate(workers):
+        assert worker.post("api/v1/ingest", make_request(f"worker {index}", "other")) == ""
+
+    stop()
+
+    for worker in workers:
+        worker.close()
+
+    assert sorted(sent_messages(upstream)) == ["other"] * 3 + ["worker 0", "worker 1", "worker 2"]
+    assert len(upstream.requests) == 1
+
+
+def test_oversized_batches_are_split_per_event(agent):
+    agent, upstream, stop = agent
+    worker = AgentClient(agent.path)
+    payload = "x" * 150_000
+
+    assert worker.post("api/v1/ingest", make_request(payload, payload)) == ""
+    worker.close()
+    stop()
+
+    assert sent_messages(upstream) == [payload, payload]
+
+
+def test_missing_agent_drops_without_blocking(tmp_path):
+    registry.reset()
+    http_client = HTTPClient(client=AgentClient(str(tmp_path / "missing.sock")))
+
+    http_client.submit(lambda: IngestEvent(message="lost", environment="testing"))
+    assert http_client.close(timeout=5)
+
+    assert registry.snapshot()["counters"]['events_dropped{reason="agent_unavailable"}'] == 1
+
+
+def test_default_socket_is_in_a_per_user_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert default_socket_path() == str(tmp_path / "errlypy-agent.sock")
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    path = default_socket_path()
+    assert path == str(tmp_path / f"errlypy-{os.getuid()}" / "errlypy-agent.sock")
+
+    agent = Agent(RecordingClient())
+    agent.bind()
+    try:
+        assert agent.path == path
+        assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    finally:
+        agent.close()
+
+
+def test_socket_is_never_open_to_others(monkeypatch, tmp_path):
+    modes = []
+    chmod = os.chmod
+
+    def recording_chmod(path, mode):
+        modes.append(stat.S_IMODE(os.stat(path).st_mode))
+        chmod(path, mode)
+
+    monkeypatch.setattr(os, "chmod", recording_chmod)
+    previous_umask = os.umask(0)
+    try:
+        agent = Agent(RecordingClient(), path=str(tmp_path / "agent.sock"))
+        agent.bind()
+        assert os.umask(0) == 0
+    finally:
+        os.umask(previous_umask)
+    agent.close()
+
+    # As bound, before the chmod to the configured mode
+    assert modes == [0o600]
+
+
+def test_socket_of_another_user_is_not_replaced(monkeypatch, tmp_path):
+    path = str(tmp_path / "agent.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale.bind(path)
+    stale.close()
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(path).st_uid + 1)
+
+    with pytest.raises(PermissionError):
+        Agent(RecordingClient(), path=path).bind()
+    assert os.path.exists(path)
+
+
+def test_directory_writable_by_others_is_refused(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir()
+    directory.chmod(0o777)
+
+    with pytest.raises(PermissionError):
+        Agent(RecordingClient(), path=str(directory / "agent.sock")).bind()
+
+
+def test_binary_datagrams_are_decoded(agent):
+    agent, upstream, stop = agent
+    worker = AgentClient(agent.path, wire_format="binary")
+    payload = "x" * 150_000
+
+    assert worker.post("api/v1/ingest", make_request("binary")) == ""
+    assert worker.post("api/v1/ingest", make_request(payload, payload)) == ""
+    worker.close()
+    stop()
+
+    assert sent_messages(upstream) == ["binary", payload, payload]
+    assert upstream.requests[0]["events"][0]["environment"] == "testing"
@@ -0,0 +1,71 @@
+import pytest
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.internal.wire import decode_binary, encode_binary
+from errlypy.models.ingest import IngestEvent, IngestRequest
+
+
+def make_request(*messages: str) -> IngestRequest:
+    return IngestRequest(
+        events=[IngestEvent(message=message, environment="testing") for message in messages]
+    )
+
+
+def test_ring_keeps_the_latest_batches():
+    client = DryRunClient(capacity=2)
+
+    for index in range(3):
+        assert client.post("api/v1/ingest", make_request(f"event {index}", "other")) == ""
+
+    assert [event["message"] for event in client.events()] == [
+        "event 1",
+        "other",
+        "event 2",
+        "other",
+    ]
+
+    client.clear()
+    assert client.events() == []
+
+
+def test_file_sink_appends_json_lines(tmp_path):
+    path = tmp_path / "events.jsonl"
+    client = DryRunClient(path=str(path))
+
+    client.post("api/v1/ingest", make_request("first"))
+    client.post("api/v1/ingest", make_request("second"))
+
+    assert len(path.read_text().splitlines()) == 2
+    assert [event["message"] for event in client.events()] == ["first", "second"]
+    assert client.events()[0]["environment"] == "testing"
+
+
+def test_events_delivered_through_the_worker_resolve_as_delivered():
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+
+    http_client.submit(lambda: IngestEvent(message="queued", environment="testing"))
+    assert http_client.close(timeout=5)
+
+    assert isinstance(http_client.transport, DryRunClient)
+    assert [event["message"] for event in http_client.transport.events()] == ["queued"]
+
+
+@pytest.mark.parametrize("in_file", [False, True])
+def test_binary_batches_are_kept_as_sent(tmp_path, in_file):
+    path = str(tmp_path / "events.bin") if in_file else None
+    client = DryRunClient(path=path, wire_format="binary")
+
+    client.post("api/v1/ingest", make_request("first", "second"))
+    client.post("api/v1/ingest", make_request("third"))
+
+    first, second = client.batches()
+    assert first == encode_binary(make_request("first", "second"))
+    assert decode_binary(second).events[0].message == "third"
+    assert [event["message"] for event in client.events()] == ["first", "second", "third"]
+    assert client.events()[0]["environment"] == "testing"
+
+
+def test_unknown_wire_format_is_rejected():
+    with pytest.raises(ValueError):
+        DryRunClient(wire_format="xml")
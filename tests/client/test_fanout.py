@@ -0,0 +1,121 @@
+import threading
+from typing import List, Optional, Tuple
+
+from errlypy.client import HTTPClient, UninitializedHTTPClient
+from errlypy.client.fanout import Destination, FanOutClient
+from errlypy.client.urllib import URLLibClient
+from errlypy.internal.metrics import registry
+from errlypy.models.ingest import IngestEvent, IngestRequest
+from tests.conftest import TEST_API_KEY
+
+
+class RecordingClient(URLLibClient):
+    """Encodes like the real client but records bodies instead of sending them."""
+
+    def __init__(self, failures: int = 0, failure_status: Optional[int] = None) -> None:
+        super().__init__("http://localhost", TEST_API_KEY, compress=True)
+        self.bodies: List[bytes] = []
+        self.attempts = 0
+        self.failures = failures
+        # None fails like a network error
+        self.failure_status = failure_status
+        self.release = threading.Event()
+        self.release.set()
+
+    def deliver(self, url, body: bytes) -> Tuple[Optional[int], str]:
+        self.release.wait()
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            return self.failure_status, ""
+        self.bodies.append(body)
+        return 200, ""
+
+
+def make_request(message: str) -> IngestRequest:
+    return IngestRequest(events=[IngestEvent(message=message, environment="testing")])
+
+
+def test_batches_are_encoded_once_for_every_destination():
+    registry.reset()
+    primary, secondary = RecordingClient(), RecordingClient()
+    client = FanOutClient([("primary", primary), ("dr", secondary)])
+
+    assert client.post("api/v1/ingest", make_request("event")) == ""
+    assert client.close(timeout=5)
+
+    assert primary.bodies == secondary.bodies
+    assert primary.bodies[0] is secondary.bodies[0]
+    assert registry.snapshot()["histograms"]["serialize_seconds"]["count"] == 1
+
+
+def test_failures_are_retried_and_isolated_per_destination():
+    registry.reset()
+    primary, flaky, down = RecordingClient(), RecordingClient(failures=2), RecordingClient(10)
+    client = FanOutClient(
+        [("primary", primary), ("flaky", flaky), ("down", down)], max_retries=3, retry_backoff=0
+    )
+
+    client.post("api/v1/ingest", make_request("event"))
+    assert client.flush(timeout=5)
+
+    assert (len(primary.bodies), len(flaky.bodies), len(down.bodies)) == (1, 1, 0)
+    assert (flaky.attempts, down.attempts) == (3, 4)
+    counters = registry.snapshot()["counters"]
+    assert counters['destination_failures{destination="down"}'] == 1
+    assert 'destination_failures{destination="flaky"}' not in counters
+    client.close(timeout=5)
+
+
+def test_only_server_errors_are_retried():
+    registry.reset()
+    unavailable = RecordingClient(failures=1, failure_status=503)
+    rejecting = RecordingClient(failures=10, failure_status=401)
+    client = FanOutClient(
+        [("unavailable", unavailable), ("rejecting", rejecting)], max_retries=3, retry_backoff=0
+    )
+
+    client.post("api/v1/ingest", make_request("event"))
+    assert client.flush(timeout=5)
+
+    assert (unavailable.attempts, len(unavailable.bodies)) == (2, 1)
+    assert (rejecting.attempts, len(rejecting.bodies)) == (1, 0)
+    counters = registry.snapshot()["counters"]
+    assert counters['destination_failures{destination="rejecting"}'] == 1
+    client.close(timeout=5)
+
+
+def test_a_stuck_destination_does_not_hold_up_the_others():
+    primary, stuck = RecordingClient(), RecordingClient()
+    stuck.release.clear()
+    http_client = HTTPClient(
+        client=FanOutClient([("primary", primary), ("stuck", stuck)], max_queue_size=2)
+    )
+
+    for index in range(5):
+        http_client.submit(lambda index=index: IngestEvent(message=f"{index}", environment="t"))
+        assert http_client._worker.flush(timeout=5)
+
+    # Everything reached the primary; the stuck queue filled up and dropped
+    assert not http_client.flush(timeout=0.1)
+    assert len(primary.bodies) == 5
+
+    stuck.release.set()
+    assert http_client.close(timeout=5)
+    assert 2 <= len(stuck.bodies) < 5
+
+
+def test_setup_compresses_for_every_destination():
+    http_client = UninitializedHTTPClient.setup(
+        base_url="http://primary.invalid",
+        api_key=TEST_API_KEY,
+        destinations=[Destination("http://dr.invalid", TEST_API_KEY)],
+        compress=True,
+    )
+    client = http_client.transport
+    assert isinstance(client, FanOutClient)
+
+    assert [sender.client.headers().get("Content-Encoding") for sender in client._senders] == [
+        "gzip",
+        "gzip",
+    ]
+    http_client.close(timeout=5)
@@ -0,0 +1,159 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import List
+
+import pytest
+
+from errlypy.client.lanes import PriorityLanes
+from errlypy.client.worker import BatchWorker
+from errlypy.internal.metrics import registry
+from errlypy.models.ingest import ErrorLevel, IngestEvent, IngestRequest
+
+
+def drain(lanes: PriorityLanes) -> List[str]:
+    items = []
+    while True:
+        try:
+            items.append(lanes.get(timeout=0))
+        except queue.Empty:
+            return items
+
+
+def test_errors_are_taken_first():
+    lanes = PriorityLanes(100)
+    for index in range(3):
+        lanes.put_nowait(f"warning {index}", ErrorLevel.WARNING)
+        lanes.put_nowait(f"error {index}", ErrorLevel.ERROR)
+
+    assert drain(lanes) == [
+        "error 0",
+        "error 1",
+        "error 2",
+        "warning 0",
+        "warning 1",
+        "warning 2",
+    ]
+
+
+def test_lower_lanes_share_by_weight():
+    lanes = PriorityLanes(100)
+    for index in range(8):
+        lanes.put_nowait(f"w{index}", ErrorLevel.WARNING)
+        lanes.put_nowait(f"i{index}", ErrorLevel.INFO)
+        lanes.put_nowait(f"d{index}", ErrorLevel.DEBUG)
+
+    first = drain(lanes)[:7]
+
+    # 4:2:1, and a warning flood doesn't stop info or debug events
+    assert sorted(item[0] for item in first) == ["d", "i", "i", "w", "w", "w", "w"]
+
+
+def test_each_lane_is_capped_at_its_share():
+    lanes = PriorityLanes(10)
+    for _ in range(5):
+        lanes.put_nowait("warning", ErrorLevel.WARNING)
+
+    with pytest.raises(queue.Full):
+        lanes.put_nowait("warning", ErrorLevel.WARNING)
+
+    # Other lanes still have room
+    assert lanes.put_nowait("error", ErrorLevel.ERROR) is None
+
+
+def test_full_queue_evicts_the_lowest_level_first():
+    lanes = PriorityLanes(4)
+    lanes.put_nowait("debug", ErrorLevel.DEBUG)
+    lanes.put_nowait("info", ErrorLevel.INFO)
+    lanes.put_nowait("error 0", ErrorLevel.ERROR)
+    lanes.put_nowait("error 1", ErrorLevel.ERROR)
+
+    assert lanes.put_nowait("error 2", ErrorLevel.ERROR) == "debug"
+    assert lanes.put_nowait("error 3", ErrorLevel.ERROR) == "info"
+    with pytest.raises(queue.Full):
+        lanes.put_nowait("error 4", ErrorLevel.ERROR)
+    assert lanes.qsize() == 4
+
+
+def test_items_never_evict_their_own_or_higher_levels():
+    lanes = PriorityLanes(2)
+    lanes.put_nowait("error", ErrorLevel.ERROR)
+    lanes.put_nowait("warning", ErrorLevel.WARNING)
+
+    with pytest.raises(queue.Full):
+        lanes.put_nowait("info", ErrorLevel.INFO)
+
+
+def test_markers_wait_for_items_queued_before_them():
+    lanes = PriorityLanes(10)
+    lanes.put_nowait("info", ErrorLevel.INFO)
+    lanes.put_control("marker")
+    lanes.put_nowait("error", ErrorLevel.ERROR)
+
+    # The later error jumps the queue, the marker does not pass the info event
+    assert drain(lanes) == ["error", "info", "marker"]
+
+
+def test_lanes_report_per_level_metrics():
+    registry.reset()
+    lanes = PriorityLanes(2)
+    lanes.put_nowait("debug", ErrorLevel.DEBUG)
+    lanes.put_nowait("error", ErrorLevel.ERROR)
+    lanes.put_nowait("error", ErrorLevel.ERROR)
+    lanes.register_gauges()
+
+    snapshot = registry.snapshot()
+    assert snapshot["counters"]['lane_events_queued{level="error"}'] == 2
+    assert snapshot["counters"]['lane_events_dropped{level="debug",reason="evicted"}'] == 1
+    assert snapshot["gauges"]['lane_depth{level="error"}'] == 2
+
+    drain(lanes)
+    lanes.unregister_gauges()
+    snapshot = registry.snapshot()
+    assert snapshot["histograms"]['lane_wait_seconds{level="error"}']["count"] == 2
+    assert 'lane_depth{level="error"}' not in snapshot["gauges"]
+
+
+class BlockedClient:
+    def __init__(self) -> None:
+        self.requests: List[IngestRequest] = []
+        self.release = threading.Event()
+
+    def post(self, url, data) -> str:
+        self.release.wait()
+        self.requests.append(data)
+        return ""
+
+    def close(self) -> None:
+        pass
+
+    def reset_after_fork(self) -> None:
+        pass
+
+
+def test_worker_sends_errors_ahead_of_a_warning_backlog():
+    client = BlockedClient()
+    worker = BatchWorker(client, max_queue_size=4, max_batch_size=1, flush_interval=60)
+
+    # The worker takes the first event and blocks posting it
+    worker.submit(lambda: IngestEvent(message="first", environment="t"), level=ErrorLevel.INFO)
+    while worker.queue_depth():
+        pass
+
+    evicted: "Future[bool]" = Future()
+    worker.submit(
+        lambda: IngestEvent(message="info", environment="t"), evicted, level=ErrorLevel.INFO
+    )
+    worker.submit(lambda: IngestEvent(message="warning", environment="t"), level=ErrorLevel.WARNING)
+    for index in range(3):
+        assert worker.submit(
+            lambda index=index: IngestEvent(message=f"error {index}", environment="t")
+        )
+
+    assert evicted.result(timeout=5) is False
+    assert worker.dropped == 1
+
+    client.release.set()
+    assert worker.close(timeout=5)
+    messages = [event.message for request in client.requests for event in request.events]
+    assert messages == ["first", "error 0", "error 1", "error 2", "warning"]
@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import Future
+from typing import List
+
+import pytest
+
+from errlypy.client.staging import StagingBuffers
+from errlypy.client.worker import BatchWorker
+from errlypy.internal.event.type import EventType
+from errlypy.models.ingest import ErrorLevel, IngestEvent
+from errlypy.utils import singleton_instance
+from tests.conftest import RecordingClient
+
+THREADS = 8
+EVENTS_PER_THREAD = 500
+
+
+def run_in_threads(target) -> None:
+    barrier = threading.Barrier(THREADS)
+
+    def start(index: int) -> None:
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=start, args=(index,)) for index in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.parametrize("staging", [False, True])
+def test_concurrent_producers_lose_and_duplicate_nothing(staging):
+    client = RecordingClient()
+    worker = BatchWorker(
+        client,
+        # Room for every event even in the smallest (DEBUG) lane
+        max_queue_size=THREADS * EVENTS_PER_THREAD * 10,
+        max_batch_size=100,
+        flush_interval=0.01,
+        staging=staging,
+    )
+    futures: "List[Future[bool]]" = []
+    futures_lock = threading.Lock()
+    levels = list(ErrorLevel)
+
+    def produce(thread_index: int) -> None:
+        own = []
+        for index in range(EVENTS_PER_THREAD):
+            future: "Future[bool]" = Future()
+            message = f"{thread_index}:{index}"
+            assert worker.submit(
+                lambda message=message: IngestEvent(message=message, environment="t"),
+                future,
+                levels[index % len(levels)],
+            )
+            own.append(future)
+        with futures_lock:
+            futures.extend(own)
+
+    run_in_threads(produce)
+    assert worker.close(timeout=10)
+
+    messages = [event.message for request in client.requests for event in request.events]
+    expected = {
+        f"{thread}:{index}" for thread in range(THREADS) for index in range(EVENTS_PER_THREAD)
+    }
+    assert len(messages) == len(expected)
+    assert set(messages) == expected
+    assert all(future.result(timeout=0) for future in futures)
+    assert worker.dropped == 0
+
+
+def test_staged_events_are_sent_without_filling_the_buffer():
+    client = RecordingClient()
+    worker = BatchWorker(client, flush_interval=60, staging=True)
+
+    worker.submit(lambda: IngestEvent(message="lone", environment="t"))
+
+    assert worker.flush(timeout=5)
+    assert [event.message for request in client.requests for event in request.events] == ["lone"]
+    assert worker.close(timeout=5)
+
+
+def test_buffers_of_exited_threads_are_forgotten():
+    staging = StagingBuffers()
+    run_in_threads(lambda index: staging.stage(index, ErrorLevel.ERROR))
+
+    assert sorted(item for item, _ in staging.take_all()) == list(range(THREADS))
+    assert staging.take_all() == []
+    assert staging._buffers == []
+
+
+def test_subscribers_can_change_while_notifying():
+    event: EventType[int] = EventType()
+    received = []
+    event.subscribe(received.append)
+
+    def churn(index: int) -> None:
+        for _ in range(200):
+            if index % 2:
+                event.notify(index)
+            else:
+                callback = lambda message: None  # noqa: E731
+                event.subscribe(callback)
+                event.unsubscribe(callback)
+
+    run_in_threads(churn)
+
+    assert len(received) == THREADS // 2 * 200
+    assert event._subscribers == (received.append,)
+
+
+def test_singletons_are_created_once():
+    class Module:
+        _instance = None
+
+        def __new__(cls):
+            return singleton_instance(cls)
+
+    class Submodule(Module):
+        _instance = None
+
+    instances = []
+    lock = threading.Lock()
+
+    def construct(index: int) -> None:
+        created = (Module(), Submodule())
+        with lock:
+            instances.append(created)
+
+    run_in_threads(construct)
+
+    assert {id(instance) for instance, _ in instances} == {id(Module._instance)}
+    assert {id(instance) for _, instance in instances} == {id(Submodule._instance)}
+    assert type(Submodule._instance) is Submodule
@@ -0,0 +1,145 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from errlypy.client.urllib import URLLibClient
+from errlypy.internal.wire import BINARY_CONTENT_TYPE, decode_binary
+from errlypy.models.ingest import IngestEvent, IngestRequest
+from tests.conftest import TEST_API_KEY
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers["Content-Encoding"] == "gzip":
+            body = gzip.decompress(body)
+        if self.headers["Content-Type"] == BINARY_CONTENT_TYPE:
+            body = decode_binary(body)
+        else:
+            body = json.loads(body)
+        self.server.received.append((self.path, self.headers["Authorization"], body))
+        self.server.connections.add(self.client_address)
+        self.server.proxy_authorization = self.headers["Proxy-Authorization"]
+
+        status = self.server.status
+        payload = b'{"success": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def ingest_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), IngestHandler)
+    server.received = []
+    server.connections = set()
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def make_request(message: str) -> IngestRequest:
+    return IngestRequest(events=[IngestEvent(message=message, environment="testing")])
+
+
+def test_post_reuses_connection(ingest_server):
+    host, port = ingest_server.server_address
+    client = URLLibClient(f"http://{host}:{port}/", TEST_API_KEY)
+
+    assert client.post("api/v1/ingest", make_request("first")) == '{"success": true}'
+    assert client.post("api/v1/ingest", make_request("second")) == '{"success": true}'
+    client.close()
+
+    assert [body["events"][0]["message"] for _, _, body in ingest_server.received] == [
+        "first",
+        "second",
+    ]
+    assert ingest_server.received[0][0] == "/api/v1/ingest"
+    assert ingest_server.received[0][1] == f"Bearer {TEST_API_KEY}"
+    assert len(ingest_server.connections) == 1
+
+
+def test_post_does_not_raise_on_http_errors(ingest_server):
+    host, port = ingest_server.server_address
+    ingest_server.status = 500
+    client = URLLibClient(f"http://{host}:{port}", TEST_API_KEY)
+
+    assert client.post("api/v1/ingest", make_request("failure")) is None
+
+
+def test_post_does_not_raise_on_network_errors(ingest_server):
+    host, port = ingest_server.server_address
+    client = URLLibClient(f"http://{host}:{port}", TEST_API_KEY, timeout=1)
+    ingest_server.shutdown()
+    ingest_server.server_close()
+
+    assert client.post("api/v1/ingest", make_request("unreachable")) is None
+
+
+def test_post_compresses_body(ingest_server):
+    host, port = ingest_server.server_address
+    client = URLLibClient(f"http://{host}:{port}/", TEST_API_KEY, compress=True)
+
+    assert client.headers()["Content-Encoding"] == "gzip"
+    assert client.post("api/v1/ingest", make_request("compressed")) == '{"success": true}'
+    client.close()
+
+    assert ingest_server.received[0][2]["events"][0]["message"] == "compressed"
+
+
+def test_post_binary_wire_format(ingest_server):
+    host, port = ingest_server.server_address
+    client = URLLibClient(f"http://{host}:{port}/", TEST_API_KEY, wire_format="binary")
+
+    assert client.post("api/v1/ingest", make_request("binary")) == '{"success": true}'
+    client.close()
+
+    assert ingest_server.received[0][2] == make_request("binary")
+
+
+def test_unknown_wire_format_is_rejected():
+    with pytest.raises(ValueError):
+        URLLibClient("http://localhost", TEST_API_KEY, wire_format="xml")
+
+
+def test_post_goes_through_the_environment_proxy(ingest_server, monkeypatch):
+    host, port = ingest_server.server_address
+    monkeypatch.setenv("http_proxy", f"http://user:secret@{host}:{port}")
+    monkeypatch.delenv("no_proxy", raising=False)
+    monkeypatch.delenv("NO_PROXY", raising=False)
+    client = URLLibClient("http://errly.invalid", TEST_API_KEY)
+
+    assert client.post("api/v1/ingest", make_request("proxied")) == '{"success": true}'
+    client.close()
+
+    ((path, authorization, _),) = ingest_server.received
+    assert path == "http://errly.invalid/api/v1/ingest"
+    assert authorization == f"Bearer {TEST_API_KEY}"
+    assert ingest_server.proxy_authorization == "Basic dXNlcjpzZWNyZXQ="
+
+
+def test_no_proxy_hosts_are_reached_directly(ingest_server, monkeypatch):
+    host, port = ingest_server.server_address
+    monkeypatch.setenv("http_proxy", "http://127.0.0.1:9")
+    monkeypatch.setenv("no_proxy", host)
+    client = URLLibClient(f"http://{host}:{port}", TEST_API_KEY)
+
+    assert client.post("api/v1/ingest", make_request("direct")) == '{"success": true}'
+    client.close()
+
+    assert ingest_server.received[0][0] == "/api/v1/ingest"
@@ -0,0 +1,211 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import List, Optional
+from uuid import uuid4
+
+import pytest
+
+from errlypy.client import HTTPClient
+from errlypy.client.worker import BatchWorker
+from errlypy.excepthook.events import OnExceptionHasBeenParsedEvent
+from errlypy.exception import ParsedExceptionDto
+from errlypy.models.ingest import IngestEvent
+from tests.conftest import RecordingClient
+
+
+class GatedClient(RecordingClient):
+    """Holds every post until ``release`` is set, then records it as failed."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+        self.release.set()
+
+    def post(self, url, data) -> Optional[str]:
+        self.release.wait()
+        super().post(url, data)
+        return None
+
+
+def make_event(message: str) -> IngestEvent:
+    return IngestEvent(message=message, environment="testing")
+
+
+def sent_messages(client: RecordingClient) -> List[str]:
+    return [event.message for request in client.requests for event in request.events]
+
+
+def test_worker_batches_until_flush():
+    client = GatedClient()
+    worker = BatchWorker(client, max_batch_size=10, flush_interval=60)
+
+    for index in range(3):
+        assert worker.submit(lambda index=index: make_event(f"event {index}"))
+
+    assert worker.flush(timeout=5)
+    assert len(client.requests) == 1
+    assert sent_messages(client) == ["event 0", "event 1", "event 2"]
+
+
+def test_worker_drops_when_queue_is_full():
+    client = GatedClient()
+    client.release.clear()
+    worker = BatchWorker(client, max_queue_size=1, max_batch_size=1)
+
+    results = [worker.submit(lambda: make_event("event")) for _ in range(10)]
+    client.release.set()
+
+    assert results.count(False) == worker.dropped > 0
+    assert worker.flush(timeout=5)
+
+
+def test_close_delivers_queued_events_and_rejects_new_ones():
+    client = GatedClient()
+    worker = BatchWorker(client, flush_interval=60)
+
+    worker.submit(lambda: make_event("before close"))
+    assert worker.close(timeout=5)
+
+    assert worker.submit(lambda: make_event("after close")) is False
+    assert sent_messages(client) == ["before close"]
+
+
+def test_futures_resolve_on_delivery():
+    worker = BatchWorker(RecordingClient())
+    delivered: "Future[bool]" = Future()
+    unbuildable: "Future[bool]" = Future()
+    assert worker.submit(lambda: make_event("event"), delivered)
+    assert worker.submit(lambda: None, unbuildable)
+    assert worker.close(timeout=5)
+
+    assert delivered.result(timeout=5) is True
+    assert unbuildable.result(timeout=5) is False
+
+    rejected: "Future[bool]" = Future()
+    assert not worker.submit(lambda: make_event("late"), rejected)
+    assert rejected.result(timeout=0) is False
+
+    # GatedClient.post returns None, as URLLibClient does when a post fails
+    worker = BatchWorker(GatedClient())
+    failed: "Future[bool]" = Future()
+    assert worker.submit(lambda: make_event("event"), failed)
+    assert worker.close(timeout=5)
+    assert failed.result(timeout=5) is False
+
+
+def test_close_respects_deadline():
+    client = GatedClient()
+    client.release.clear()
+    worker = BatchWorker(client, max_batch_size=1)
+
+    worker.submit(lambda: make_event("stuck"))
+    assert worker.close(timeout=0.1) is False
+    client.release.set()
+
+
+def test_enqueued_events_keep_the_capture_time_and_id():
+    class BlockingClient(GatedClient):
+        def __init__(self) -> None:
+            super().__init__()
+            self.posting = threading.Event()
+
+        def post(self, url, data) -> Optional[str]:
+            self.posting.set()
+            return super().post(url, data)
+
+    client = BlockingClient()
+    client.release.clear()
+    http_client = HTTPClient(client=client)
+    http_client.submit(lambda: make_event("blocking the worker"))
+    assert client.posting.wait(timeout=5)
+
+    event = OnExceptionHasBeenParsedEvent(
+        event_id=uuid4(), data=ParsedExceptionDto(content="captured", frames=[])
+    )
+    http_client.enqueue(event)
+    captured_by = datetime.now()
+    time.sleep(0.2)
+    client.release.set()
+    assert http_client.flush(timeout=5)
+
+    sent = [sent for request in client.requests for sent in request.events]
+    assert sent[-1].message == "captured"
+    assert sent[-1].event_id == event.event_id.hex
+    assert sent[-1].timestamp is not None and sent[-1].timestamp <= captured_by
+    http_client.close(timeout=5)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork_child_starts_with_empty_queue():
+    client = GatedClient()
+    client.release.clear()
+    http_client = HTTPClient(client=client)
+
+    for _ in range(5):
+        http_client.submit(lambda: make_event("queued in parent"))
+
+    pid = os.fork()
+    if pid == 0:
+        worker = http_client._worker
+        ok = worker._queue.qsize() == 0 and worker._thread is None
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    client.release.set()
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert http_client.flush(timeout=5)
+    assert sent_messages(client) == ["queued in parent"] * 5
+
+
+def test_uncaught_exception_is_delivered_at_exit(tmp_path):
+    script = tmp_path / "crash.py"
+    script.write_text(
+        textwrap.dedent(
+            """
+            import sys
+            import threading
+            from http.server import BaseHTTPRequestHandler, HTTPServer
+
+            from errlypy.lib import Errly
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_POST(self):
+                    body = self.rfile.read(int(self.headers["Content-Length"]))
+                    sys.stdout.write(body.decode() + "\\n")
+                    sys.stdout.flush()
+                    self.send_response(200)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+
+                def log_message(self, format, *args):
+                    pass
+
+            server = HTTPServer(("127.0.0.1", 0), Handler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+            Errly.init(
+                url="http://%s:%s" % server.server_address,
+                api_key="errly_test_" + "0" * 64,
+            )
+            raise RuntimeError("crashed before exit")
+            """
+        )
+    )
+
+    result = subprocess.run(
+        [sys.executable, str(script)],
+        capture_output=True,
+        text=True,
+        timeout=30,
+        cwd=os.getcwd(),
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+
+    assert "crashed before exit" in result.stdout
@@ -0,0 +1,22 @@
+from typing import List, Optional
+
+from errlypy.models.ingest import IngestRequest
+
+TEST_API_KEY = "errly_test_0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef"
+
+
+class RecordingClient:
+    """Transport that accepts every batch and keeps it in ``requests``."""
+
+    def __init__(self) -> None:
+        self.requests: List[IngestRequest] = []
+
+    def post(self, url, data) -> Optional[str]:
+        self.requests.append(data)
+        return ""
+
+    def close(self) -> None:
+        pass
+
+    def reset_after_fork(self) -> None:
+        pass
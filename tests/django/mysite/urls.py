@@ -23,6 +23,7 @@ from . import views
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("view-zero-division/", views.view_zero_division, name="view_zero_division"),
+    path("view-ok/", views.view_ok, name="view_ok"),
     path(
         "async-view-zero-division",
         views.async_view_zero_division,
@@ -43,4 +44,23 @@ urlpatterns = [
         views.async_view_ok_sleep_3_sec,
         name="async_view_ok_sleep_3_sec",
     ),
+    path("view-slow/", views.view_slow, name="view_slow"),
+    path("authors/<int:author_id>/slow/", views.view_author_slow, name="view_author_slow"),
+    path("async-view-slow", views.async_view_slow, name="async_view_slow"),
+    path("view-queries/", views.view_queries, name="view_queries"),
+    path(
+        "authors/<int:author_id>/books/",
+        views.view_author_books,
+        name="view_author_books",
+    ),
+    path(
+        "view-queries-zero-division/",
+        views.view_queries_zero_division,
+        name="view_queries_zero_division",
+    ),
+    path(
+        "async-view-queries-zero-division",
+        views.async_view_queries_zero_division,
+        name="async_view_queries_zero_division",
+    ),
 ]
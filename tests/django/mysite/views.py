@@ -1,5 +1,7 @@
 import asyncio
+import time
 
+from django.db import connection
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
@@ -9,6 +11,11 @@ def view_zero_division(request):
     1 / 0  # noqa: B018
 
 
+@csrf_exempt
+def view_ok(request):
+    return HttpResponse("ok")
+
+
 async def async_view_zero_division(request):
     1 / 0  # noqa: B018
 
@@ -25,3 +32,47 @@ async def async_view_ok(request):
 async def async_view_ok_sleep_3_sec(request):
     await asyncio.sleep(3)
     return HttpResponse("ok")
+
+
+def view_slow(request):
+    time.sleep(0.3)
+    return HttpResponse("ok")
+
+
+def view_author_slow(request, author_id):
+    return view_slow(request)
+
+
+async def async_view_slow(request):
+    await asyncio.sleep(0.3)
+    return HttpResponse("ok")
+
+
+def run_queries(count: int) -> None:
+    # One query per "row", as a loop over a queryset without select_related
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        for row_id in range(count):
+            cursor.execute("SELECT %s AS author_id", [row_id])
+
+
+def view_queries(request):
+    run_queries(int(request.GET.get("count", 20)))
+    return HttpResponse("ok")
+
+
+def view_author_books(request, author_id):
+    run_queries(20)
+    return HttpResponse("ok")
+
+
+def view_queries_zero_division(request):
+    run_queries(10)
+    1 / 0  # noqa: B018
+
+
+async def async_view_queries_zero_division(request):
+    from asgiref.sync import sync_to_async
+
+    await sync_to_async(run_queries)(10)
+    1 / 0  # noqa: B018
@@ -7,6 +7,7 @@ from errlypy.django.events import OnDjangoExceptionHasBeenParsedEvent
 from errlypy.django.plugin import DjangoExceptionPlugin
 from errlypy.internal.event.type import EventType
 from errlypy.lib import UninitializedModuleController
+from tests.conftest import TEST_API_KEY
 from tests.django.mysite.asgi import application
 
 
@@ -14,9 +15,11 @@ from tests.django.mysite.asgi import application
 def mock_django_module(monkeypatch):
     django_plugin = DjangoExceptionPlugin()
     mock_module = MagicMock()
-    mock_module.setup.return_value = mock_module
     mock_module.plugins = [django_plugin]
-    monkeypatch.setattr("errlypy.lib.UninitializedDjangoModule", mock_module)
+    monkeypatch.setattr(
+        "errlypy.django.module.UninitializedDjangoModule.setup",
+        MagicMock(return_value=mock_module),
+    )
     return mock_module
 
 
@@ -28,7 +31,7 @@ def on_exc_parsed_fixture():
 @pytest.mark.asyncio
 async def test_asgi_zero_division(mock_django_module):
     communicator = HttpCommunicator(application, "GET", "/async-view-zero-division")
-    UninitializedModuleController.init(base_url="test", api_key="test")
+    UninitializedModuleController.init(base_url="test", api_key=TEST_API_KEY)
 
     resp = await communicator.get_response()
     await communicator.wait()
@@ -39,7 +42,7 @@ async def test_asgi_zero_division(mock_django_module):
 @pytest.mark.asyncio
 async def test_asgi_zero_division_sleep_3_sec(mock_django_module):
     communicator = HttpCommunicator(application, "GET", "/async-view-zero-division-sleep-3-sec")
-    UninitializedModuleController.init(base_url="test", api_key="test")
+    UninitializedModuleController.init(base_url="test", api_key=TEST_API_KEY)
 
     resp = await communicator.get_response(5)
     await communicator.wait(5)
@@ -50,7 +53,7 @@ async def test_asgi_zero_division_sleep_3_sec(mock_django_module):
 @pytest.mark.asyncio
 async def test_asgi_ok(mock_django_module):
     communicator = HttpCommunicator(application, "GET", "/async-view-ok")
-    UninitializedModuleController.init(base_url="test", api_key="test")
+    UninitializedModuleController.init(base_url="test", api_key=TEST_API_KEY)
 
     resp = await communicator.get_response()
     await communicator.wait()
@@ -61,7 +64,7 @@ async def test_asgi_ok(mock_django_module):
 @pytest.mark.asyncio
 async def test_asgi_ok_sleep_3_sec(mock_django_module):
     communicator = HttpCommunicator(application, "GET", "/async-view-ok-sleep-3-sec")
-    UninitializedModuleController.init(base_url="test", api_key="test")
+    UninitializedModuleController.init(base_url="test", api_key=TEST_API_KEY)
 
     resp = await communicator.get_response(5)
     await communicator.wait(5)
@@ -12,6 +12,7 @@ from errlypy.django.events import OnDjangoExceptionHasBeenParsedEvent
 from errlypy.django.plugin import DjangoExceptionPlugin
 from errlypy.internal.event.type import EventType
 from errlypy.lib import UninitializedModuleController
+from tests.conftest import TEST_API_KEY
 
 
 @pytest.fixture
@@ -74,7 +75,7 @@ def test_response_for_exception_trigger(mock_django_module):
     request = MagicMock()
     exc = Exception("Test")
 
-    UninitializedModuleController.init(base_url="test", api_key="test")
+    UninitializedModuleController.init(base_url="test", api_key=TEST_API_KEY)
 
     mpatch = MonkeyPatch()
     mpatch.setattr(django.core.handlers.exception, "get_resolver", get_resolver_mock)
@@ -102,7 +103,7 @@ def test_get_exception_response_trigger(mock_django_module):
     status_code = 500
     exc = Exception("Test")
 
-    UninitializedModuleController.init(base_url="test", api_key="test")
+    UninitializedModuleController.init(base_url="test", api_key=TEST_API_KEY)
 
     mpatch = MonkeyPatch()
     mpatch.setattr(django.core.handlers.exception, "settings", get_settings_mock())
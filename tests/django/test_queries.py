@@ -0,0 +1,143 @@
+from typing import Iterator
+
+import pytest
+from channels.testing import HttpCommunicator  # type: ignore[import-untyped]
+from django.test import Client
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.django import queries
+from errlypy.django.events import OnDjangoExceptionHasBeenParsedEvent
+from errlypy.django.plugin import DjangoExceptionPlugin, DjangoRequestPlugin
+from errlypy.internal.config import QueryConfig
+from errlypy.internal.event.type import EventType
+from tests.django.mysite.asgi import application
+
+N_PLUS_ONE_SHAPE = "SELECT ? AS author_id"
+
+
+@pytest.fixture
+def http_client() -> Iterator[HTTPClient]:
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+    yield http_client
+    http_client.close(timeout=5)
+
+
+@pytest.fixture
+def recording(http_client, monkeypatch) -> Iterator[None]:
+    monkeypatch.setattr(QueryConfig, "enabled", True)
+    on_exc_parsed = EventType[OnDjangoExceptionHasBeenParsedEvent]()
+    on_exc_parsed.subscribe(http_client.enqueue)
+    exception_plugin = DjangoExceptionPlugin()
+    exception_plugin.setup(on_exc_parsed)
+    request_plugin = DjangoRequestPlugin(http_client)
+    request_plugin.setup()
+    yield
+    request_plugin.revert()
+    exception_plugin.revert()
+
+
+def flushed_events(http_client: HTTPClient):
+    assert http_client.flush(timeout=5)
+    assert isinstance(http_client.transport, DryRunClient)
+    return http_client.transport.events()
+
+
+@pytest.mark.parametrize(
+    "sql, shape",
+    [
+        ("SELECT * FROM book WHERE id = 42", "SELECT * FROM book WHERE id = ?"),
+        ("SELECT * FROM book WHERE title = 'It''s'", "SELECT * FROM book WHERE title = ?"),
+        (
+            'SELECT "t1"."id" FROM "t1" WHERE "t1"."id" IN (%s, %s)',
+            'SELECT "t1"."id" FROM "t1" WHERE "t1"."id" IN (...)',
+        ),
+        ("UPDATE book\n   SET price = -1.5", "UPDATE book SET price = ?"),
+    ],
+)
+def test_normalize_strips_literals(sql, shape):
+    assert queries.normalize(sql) == shape
+
+
+def test_recorder_is_bounded():
+    recorder = queries.QueryRecorder()
+    for index in range(queries.MAX_SHAPES + 10):
+        recorder.record(f"SELECT * FROM table_{index}", duration=index / 1000)
+
+    summary = recorder.summary()
+    assert summary["count"] == queries.MAX_SHAPES + 10
+    assert summary["shapes"] == queries.MAX_SHAPES
+    assert summary["dropped"] == 10
+    durations = [query["duration"] for query in summary["slowest"]]
+    assert len(durations) == queries.SLOWEST
+    assert durations == sorted(durations, reverse=True)
+    assert "n_plus_one" not in summary
+
+
+def test_repeated_selects_are_n_plus_one():
+    recorder = queries.QueryRecorder(n_plus_one_threshold=3)
+    for row_id in range(4):
+        recorder.record(f"SELECT * FROM author WHERE id = {row_id}", duration=0.001)
+        recorder.record(f"UPDATE author SET seen = 1 WHERE id = {row_id}", duration=0.001)
+
+    (detection,) = recorder.summary()["n_plus_one"]
+    assert detection["sql"] == "SELECT * FROM author WHERE id = ?"
+    assert detection["count"] == 4
+
+
+def test_wsgi_error_gets_the_queries_of_its_request(recording, http_client):
+    response = Client(raise_request_exception=False).get("/view-queries-zero-division/")
+    assert response.status_code == 500
+
+    (event,) = flushed_events(http_client)
+    summary = event["extra"]["queries"]
+    assert summary["count"] == 11
+    assert summary["shapes"] == 2
+    (detection,) = summary["n_plus_one"]
+    assert (detection["sql"], detection["count"]) == (N_PLUS_ONE_SHAPE, 10)
+    assert len(summary["slowest"]) == queries.SLOWEST
+
+
+@pytest.mark.asyncio
+async def test_asgi_error_gets_queries_run_on_another_thread(recording, http_client):
+    communicator = HttpCommunicator(application, "GET", "/async-view-queries-zero-division")
+    response = await communicator.get_response(5)
+    await communicator.wait(5)
+    assert response["status"] == 500
+
+    (event,) = flushed_events(http_client)
+    assert event["extra"]["queries"]["count"] == 11
+
+
+def test_queries_outside_requests_are_not_recorded(recording):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+    assert queries.current() is None
+
+
+def test_n_plus_one_is_reported_once_per_route(recording, http_client, monkeypatch):
+    monkeypatch.setattr(QueryConfig, "report_n_plus_one", True)
+    client = Client()
+    assert client.get("/view-queries/", {"count": 2}).status_code == 200
+    assert client.get("/view-queries/", {"count": 20}).status_code == 200
+    assert client.get("/view-queries/", {"count": 20}).status_code == 200
+
+    (warning,) = flushed_events(http_client)
+    assert warning["level"] == "warning"
+    assert warning["tags"] == {"n_plus_one": "true", "route": "GET /view-queries/"}
+    assert warning["extra"]["query"]["sql"] == N_PLUS_ONE_SHAPE
+    assert warning["extra"]["query"]["count"] == 20
+
+
+def test_n_plus_one_is_deduplicated_per_url_pattern(recording, http_client, monkeypatch):
+    monkeypatch.setattr(QueryConfig, "report_n_plus_one", True)
+    client = Client()
+    for author_id in (1, 2, 3):
+        assert client.get(f"/authors/{author_id}/books/").status_code == 200
+
+    (warning,) = flushed_events(http_client)
+    assert warning["tags"]["route"] == "GET /authors/<int:author_id>/books/"
+    assert warning["message"].startswith("N+1 queries in GET /authors/<int:author_id>/books/")
@@ -0,0 +1,79 @@
+from typing import Iterator
+
+import pytest
+from channels.testing import HttpCommunicator  # type: ignore[import-untyped]
+from django.test import Client
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.django.plugin import DjangoRequestPlugin
+from errlypy.internal.config import WatchdogConfig
+from errlypy.watchdog import RequestWatchdog
+from tests.django.mysite.asgi import application
+
+
+@pytest.fixture
+def http_client() -> Iterator[HTTPClient]:
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+    yield http_client
+    http_client.close(timeout=5)
+
+
+@pytest.fixture
+def watchdog(http_client, monkeypatch) -> Iterator[RequestWatchdog]:
+    plugin = DjangoRequestPlugin()
+    plugin.setup()
+    watchdog = RequestWatchdog(http_client, threshold=0.1, check_interval=0.01)
+    monkeypatch.setattr(WatchdogConfig, "watchdog", watchdog)
+    watchdog.start()
+    yield watchdog
+    watchdog.stop(timeout=5)
+    plugin.revert()
+
+
+def flushed_events(http_client: HTTPClient):
+    assert http_client.flush(timeout=5)
+    assert isinstance(http_client.transport, DryRunClient)
+    return http_client.transport.events()
+
+
+def test_slow_wsgi_request_is_reported(watchdog, http_client):
+    assert Client().get("/view-ok/").status_code == 200
+    assert Client().get("/view-slow/").status_code == 200
+
+    (event,) = flushed_events(http_client)
+    assert event["level"] == "warning"
+    assert event["tags"]["route"] == "GET /view-slow/"
+    # time.sleep is a builtin, the view is the innermost frame
+    assert event["tags"]["error_function"] == "view_slow"
+    assert watchdog.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_asgi_request_is_reported(watchdog, http_client):
+    communicator = HttpCommunicator(application, "GET", "/async-view-slow")
+    response = await communicator.get_response(5)
+    await communicator.wait(5)
+    assert response["status"] == 200
+
+    (event,) = flushed_events(http_client)
+    assert event["tags"]["route"] == "GET /async-view-slow"
+    assert "in async_view_slow" in event["stack_trace"]
+
+
+def test_requests_are_untracked_without_a_watchdog(http_client):
+    plugin = DjangoRequestPlugin()
+    plugin.setup()
+    try:
+        assert Client().get("/view-ok/").status_code == 200
+    finally:
+        plugin.revert()
+
+    assert flushed_events(http_client) == []
+
+
+def test_slow_request_route_is_the_url_pattern(watchdog, http_client):
+    assert Client().get("/authors/3/slow/").status_code == 200
+
+    (event,) = flushed_events(http_client)
+    assert event["tags"]["route"] == "GET /authors/<int:author_id>/slow/"
@@ -0,0 +1,116 @@
+import asyncio
+import gc
+import threading
+from uuid import uuid4
+
+import pytest
+
+from errlypy.excepthook.events import OnExceptionHasBeenParsedEvent
+from errlypy.excepthook.plugin import AsyncioExceptionHandlerPlugin, ThreadingExceptHookPlugin
+from errlypy.internal.event.type import EventType
+
+
+@pytest.fixture
+def on_exc_parsed_fixture():
+    return EventType[OnExceptionHasBeenParsedEvent]()
+
+
+@pytest.fixture
+def received(on_exc_parsed_fixture):
+    events = []
+    on_exc_parsed_fixture.subscribe(events.append)
+    return events
+
+
+def test_threading_excepthook_captures_and_chains(on_exc_parsed_fixture, received, monkeypatch):
+    chained = []
+    monkeypatch.setattr(threading, "excepthook", chained.append)
+
+    plugin = ThreadingExceptHookPlugin()
+    plugin.setup(on_exc_parsed_fixture)
+
+    def worker():
+        raise RuntimeError("thread failure")
+
+    try:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    finally:
+        plugin.revert()
+
+    assert threading.excepthook == chained.append
+    assert len(chained) == 1
+    (event,) = received
+    assert isinstance(event, OnExceptionHasBeenParsedEvent)
+    assert event.data.content == "thread failure"
+    assert event.data.frames[-1].function == "worker"
+
+
+def test_threading_excepthook_ignores_system_exit(on_exc_parsed_fixture, received, monkeypatch):
+    monkeypatch.setattr(threading, "excepthook", lambda args: None)
+
+    plugin = ThreadingExceptHookPlugin()
+    plugin.setup(on_exc_parsed_fixture)
+
+    def worker():
+        raise SystemExit()
+
+    try:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    finally:
+        plugin.revert()
+
+    assert received == []
+
+
+@pytest.mark.asyncio
+async def test_asyncio_handler_captures_unretrieved_task_exception(on_exc_parsed_fixture, received):
+    loop = asyncio.get_running_loop()
+    chained = []
+    loop.set_exception_handler(lambda loop, context: chained.append(context))
+
+    plugin = AsyncioExceptionHandlerPlugin()
+    plugin.setup(on_exc_parsed_fixture)
+
+    async def background_job():
+        raise KeyError("missing")
+
+    try:
+        task = loop.create_task(background_job())
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        del task
+        gc.collect()
+    finally:
+        plugin.revert()
+
+    assert loop.get_exception_handler() is not plugin
+    assert len(chained) == 1
+    (event,) = received
+    assert event.data.content == "'missing'"
+    assert event.data.frames[-1].function == "background_job"
+    loop.set_exception_handler(None)
+
+
+@pytest.mark.asyncio
+async def test_asyncio_handler_passes_through_contexts_without_exception(
+    on_exc_parsed_fixture, received
+):
+    loop = asyncio.get_running_loop()
+    chained = []
+    loop.set_exception_handler(lambda loop, context: chained.append(context))
+
+    plugin = AsyncioExceptionHandlerPlugin()
+    plugin.setup(on_exc_parsed_fixture)
+
+    try:
+        loop.call_exception_handler({"message": "slow callback", "event_id": uuid4()})
+    finally:
+        plugin.revert()
+
+    assert received == []
+    assert chained[0]["message"] == "slow callback"
+    loop.set_exception_handler(None)
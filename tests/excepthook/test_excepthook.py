@@ -105,4 +105,6 @@ def test_exception_callback_impl_with_invalid_repr_result_frame_detail_body_succ
     except ValueError as err:
         result = sys.excepthook(type(err), err, err.__traceback__)
 
-    assert len(result.frames) == 0
+    frame_detail = cast(FrameDetail, result.frames[0])
+    assert frame_detail.locals["callback"] == "<repr failed: UncaughtExceptionFromRepr>"
+    assert "pytest.monkeypatch.MonkeyPatch object at" in frame_detail.locals["mpatch"]
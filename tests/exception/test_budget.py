@@ -0,0 +1,91 @@
+import sys
+import time
+
+import pytest
+
+from errlypy.client import HTTPClient
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.internal.config import CaptureConfig
+
+
+class SlowRepr:
+    def __repr__(self) -> str:
+        time.sleep(0.01)
+        return "SlowRepr()"
+
+
+@pytest.fixture
+def time_budget(monkeypatch):
+    def set_budget(seconds):
+        monkeypatch.setattr(CaptureConfig, "time_budget", seconds)
+
+    return set_budget
+
+
+def capture(function):
+    callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+    try:
+        function()
+    except Exception:
+        return callback(*sys.exc_info())
+    raise AssertionError("no exception raised")
+
+
+def raise_with_slow_locals():
+    def outer():
+        outer_value = SlowRepr()  # noqa: F841
+        inner()
+
+    def inner():
+        first, second, third = SlowRepr(), SlowRepr(), SlowRepr()  # noqa: F841
+        raise ValueError("slow locals")
+
+    outer()
+
+
+def test_capture_within_budget_is_complete(time_budget):
+    time_budget(None)
+
+    parsed = capture(raise_with_slow_locals)
+
+    assert parsed.skipped_stages == []
+    assert [frame.function for frame in parsed.frames][-2:] == ["outer", "inner"]
+    assert parsed.frames[-1].locals == {
+        "first": "SlowRepr()",
+        "second": "SlowRepr()",
+        "third": "SlowRepr()",
+    }
+    assert parsed.frames[-1].line == 'raise ValueError("slow locals")'
+
+
+def test_capture_over_budget_drops_locals_of_outer_frames_first(time_budget):
+    time_budget(0.015)
+
+    parsed = capture(raise_with_slow_locals)
+
+    inner, outer = parsed.frames[-1], parsed.frames[-2]
+    # The innermost frame is captured first and keeps what fit in the budget
+    assert inner.locals is not None and 0 < len(inner.locals) < 3
+    assert outer.locals is None
+    assert "locals" in parsed.skipped_stages
+
+
+def test_exhausted_budget_truncates_frames_but_keeps_the_innermost(time_budget):
+    time_budget(0.0)
+
+    def recurse(depth):
+        if depth == 0:
+            raise RecursionError("deep")
+        recurse(depth - 1)
+
+    parsed = capture(lambda: recurse(50))
+
+    assert parsed.skipped_stages == ["source_lines", "locals", "frames"]
+    assert len(parsed.frames) == 1
+    assert parsed.truncated_frames > 50
+    assert parsed.frames[0].function == "recurse"
+    assert parsed.frames[0].line is None and parsed.frames[0].locals is None
+
+    event = HTTPClient(client=None)._transform_to_ingest_event(parsed)
+    assert event.extra["capture_skipped"] == ["source_lines", "locals", "frames"]
+    assert event.extra["truncated_frames"] == parsed.truncated_frames
@@ -0,0 +1,38 @@
+import gc
+import sys
+import weakref
+
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+
+
+class Payload:
+    def __repr__(self) -> str:
+        return "Payload()"
+
+
+def fail(payload):
+    request = {"payload": payload}  # noqa: F841
+    raise ValueError("boom")
+
+
+def capture_failure(callback, payload):
+    try:
+        fail(payload)
+    except ValueError:
+        return callback(*sys.exc_info())
+
+
+def test_capture_releases_frames_and_locals():
+    callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+    payload = Payload()
+    payload_ref = weakref.ref(payload)
+
+    parsed = capture_failure(callback, payload)
+    del payload
+    gc.collect()
+
+    assert payload_ref() is None
+    assert parsed.frames[-1].locals == {
+        "payload": "Payload()",
+        "request": "{'payload': Payload()}",
+    }
@@ -0,0 +1,138 @@
+import sys
+
+import pytest
+
+from errlypy.client import HTTPClient
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.exception.scrubber import Scrubber
+from errlypy.internal.config import CaptureConfig
+from errlypy.internal.encoder import MAX_REPR_LENGTH
+
+
+@pytest.fixture(autouse=True)
+def unlimited_budget(monkeypatch):
+    monkeypatch.setattr(CaptureConfig, "time_budget", None)
+
+
+def capture(function, *args):
+    callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+    try:
+        function(*args)
+    except Exception:
+        return callback(*sys.exc_info())
+    raise AssertionError("no exception raised")
+
+
+def stack_trace(parsed):
+    return HTTPClient(client=None)._transform_to_ingest_event(parsed).stack_trace
+
+
+def recurse(depth):
+    if depth == 0:
+        raise ValueError("bottom")
+    recurse(depth - 1)
+
+
+def ping(depth):
+    if depth == 0:
+        raise ValueError("bottom")
+    pong(depth - 1)
+
+
+def pong(depth):
+    ping(depth)
+
+
+def build_chain(length):
+    namespace = {}
+    source = (
+        "\n".join(f"def level_{index}():\n    level_{index + 1}()" for index in range(length))
+        + f"\ndef level_{length}():\n    raise ValueError('bottom')"
+    )
+    exec(compile(source, "<chain>", "exec"), namespace)
+    return namespace["level_0"]
+
+
+def test_recursion_is_collapsed(monkeypatch):
+    monkeypatch.setattr(CaptureConfig, "max_frames", None)
+
+    parsed = capture(recurse, 300)
+
+    functions = [frame.function for frame in parsed.frames]
+    assert functions[-3:] == ["recurse", "recurse", "recurse"]
+    assert functions.count("recurse") == 3
+    (collapsed,) = parsed.collapsed
+    assert (collapsed.count, collapsed.repeat_of) == (298, 1)
+    assert parsed.frames[-1].locals == {"depth": "0"}
+    assert "[Previous frame repeated 298 more times]" in stack_trace(parsed)
+
+
+def test_frame_count_is_the_real_depth(monkeypatch):
+    monkeypatch.setattr(CaptureConfig, "max_frames", 10)
+
+    parsed = capture(build_chain(150))
+    extra = HTTPClient(client=None)._transform_to_ingest_event(parsed).extra
+
+    # capture(), level_0 ... level_150
+    assert extra["frame_count"] == parsed.depth == 152
+    assert extra["frames_kept"] == len(parsed.frames) == 10
+
+
+def test_mutual_recursion_is_collapsed(monkeypatch):
+    monkeypatch.setattr(CaptureConfig, "max_frames", None)
+
+    parsed = capture(ping, 100)
+
+    (collapsed,) = parsed.collapsed
+    assert collapsed.repeat_of == 2
+    assert len(parsed.frames) < 10
+    assert "[Previous 2 frames repeated" in stack_trace(parsed)
+
+
+def test_max_frames_keeps_outermost_and_innermost(monkeypatch):
+    monkeypatch.setattr(CaptureConfig, "max_frames", 10)
+
+    parsed = capture(build_chain(40))
+
+    functions = [frame.function for frame in parsed.frames]
+    assert len(functions) == 10
+    assert functions[-1] == "level_40"
+    assert functions[1:5] == ["level_0", "level_1", "level_2", "level_3"]
+    assert functions[5:] == ["level_36", "level_37", "level_38", "level_39", "level_40"]
+    (omitted,) = parsed.collapsed
+    assert (omitted.index, omitted.count, omitted.repeat_of) == (5, 32, 0)
+    assert "[32 frames omitted]" in stack_trace(parsed)
+
+
+def test_recursion_error_stays_small():
+    def runaway(depth):
+        return runaway(depth + 1)
+
+    parsed = capture(runaway, 0)
+
+    assert len(parsed.frames) <= CaptureConfig.max_frames
+    assert parsed.frames[-1].function == "runaway"
+    assert parsed.collapsed[0].repeat_of == 1
+
+
+class BrokenRepr:
+    def __repr__(self):
+        raise RuntimeError("no repr")
+
+
+def raise_with_awkward_locals():
+    broken = BrokenRepr()  # noqa: F841
+    huge = ["x" * 100] * 100  # noqa: F841
+    raise ValueError("awkward locals")
+
+
+@pytest.mark.parametrize("scrubber", [None, Scrubber()])
+def test_locals_repr_is_guarded_and_capped(monkeypatch, scrubber):
+    monkeypatch.setattr(CaptureConfig, "scrubber", scrubber)
+
+    parsed = capture(raise_with_awkward_locals)
+
+    local_values = parsed.frames[-1].locals
+    assert local_values["broken"] == "<repr failed: RuntimeError>"
+    assert len(local_values["huge"]) == MAX_REPR_LENGTH + len("...")
+    assert parsed.content == "awkward locals"
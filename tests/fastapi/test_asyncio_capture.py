@@ -0,0 +1,55 @@
+import asyncio
+import gc
+from typing import Iterator, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from errlypy.excepthook.events import OnExceptionHasBeenParsedEvent
+from errlypy.excepthook.plugin import AsyncioExceptionHandlerPlugin
+from errlypy.fastapi.events import OnFastAPIExceptionHasBeenParsedEvent
+from errlypy.fastapi.plugin import FastAPIExceptionPlugin
+from errlypy.internal.event.type import EventType
+
+
+@pytest.fixture
+def received() -> Iterator[List[OnExceptionHasBeenParsedEvent]]:
+    received: List[OnExceptionHasBeenParsedEvent] = []
+    on_exc_parsed = EventType[OnExceptionHasBeenParsedEvent]()
+    on_exc_parsed.subscribe(received.append)
+    plugin = AsyncioExceptionHandlerPlugin()
+    # Set up outside any loop, like Errly.init before the server starts
+    plugin.setup(on_exc_parsed)
+    yield received
+    plugin.revert()
+
+
+async def send_reminder() -> None:
+    raise KeyError("missing")
+
+
+def test_serving_loop_gets_the_exception_handler(received):
+    app = FastAPI()
+
+    @app.get("/orders")
+    async def orders():
+        asyncio.get_running_loop().create_task(send_reminder())
+        return {}
+
+    @app.get("/collect")
+    async def collect():
+        await asyncio.sleep(0)
+        gc.collect()
+        return {}
+
+    plugin = FastAPIExceptionPlugin(EventType[OnFastAPIExceptionHasBeenParsedEvent](), app=app)
+    try:
+        with TestClient(app) as client:
+            client.get("/orders")
+            client.get("/collect")
+    finally:
+        plugin.revert()
+
+    (event,) = received
+    assert event.data.frames[-1].function == "send_reminder"
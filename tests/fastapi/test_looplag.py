@@ -0,0 +1,61 @@
+import time
+from typing import Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.fastapi.events import OnFastAPIExceptionHasBeenParsedEvent
+from errlypy.fastapi.plugin import FastAPIExceptionPlugin
+from errlypy.internal.config import WatchdogConfig
+from errlypy.internal.event.type import EventType
+from errlypy.looplag import LoopLagMonitor
+
+
+@pytest.fixture
+def http_client() -> Iterator[HTTPClient]:
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+    yield http_client
+    http_client.close(timeout=5)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/warm")
+    async def warm():
+        return {}
+
+    @app.get("/export")
+    async def export():
+        # A blocking call in an async handler holds up every other request
+        time.sleep(0.3)
+        return {}
+
+    return app
+
+
+def test_blocking_handler_is_reported(http_client, monkeypatch):
+    app = build_app()
+    plugin = FastAPIExceptionPlugin(EventType[OnFastAPIExceptionHasBeenParsedEvent](), app=app)
+    monitor = LoopLagMonitor(http_client, threshold=0.05, interval=0.01)
+    monkeypatch.setattr(WatchdogConfig, "loop_monitor", monitor)
+    monitor.start()
+    try:
+        with TestClient(app) as client:
+            client.get("/warm")
+            # Let the first heartbeats run
+            client.get("/warm")
+            time.sleep(0.05)
+            client.get("/export")
+    finally:
+        monitor.stop(timeout=5)
+        plugin.revert()
+
+    assert http_client.flush(timeout=5)
+    assert isinstance(http_client.transport, DryRunClient)
+    (stall,) = http_client.transport.events()
+    assert stall["tags"]["loop_stall"] == "true"
+    assert stall["tags"]["error_function"] == "export"
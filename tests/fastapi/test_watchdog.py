@@ -0,0 +1,58 @@
+import asyncio
+from typing import Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.fastapi.events import OnFastAPIExceptionHasBeenParsedEvent
+from errlypy.fastapi.plugin import FastAPIExceptionPlugin
+from errlypy.internal.config import WatchdogConfig
+from errlypy.internal.event.type import EventType
+from errlypy.watchdog import RequestWatchdog
+
+
+@pytest.fixture
+def http_client() -> Iterator[HTTPClient]:
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+    yield http_client
+    http_client.close(timeout=5)
+
+
+async def fetch_report() -> None:
+    await asyncio.sleep(0.3)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/reports/{report_id}")
+    async def report(report_id: int):
+        await fetch_report()
+        return {"id": report_id}
+
+    return app
+
+
+def test_slow_request_is_reported_with_the_await_chain(http_client, monkeypatch):
+    app = build_app()
+    plugin = FastAPIExceptionPlugin(EventType[OnFastAPIExceptionHasBeenParsedEvent](), app=app)
+    watchdog = RequestWatchdog(http_client, threshold=0.1, check_interval=0.01)
+    monkeypatch.setattr(WatchdogConfig, "watchdog", watchdog)
+    watchdog.start()
+    try:
+        with TestClient(app) as client:
+            assert client.get("/reports/7").json() == {"id": 7}
+    finally:
+        watchdog.stop(timeout=5)
+
+    assert http_client.flush(timeout=5)
+    assert isinstance(http_client.transport, DryRunClient)
+    (event,) = http_client.transport.events()
+    assert event["tags"]["route"] == "GET /reports/{report_id}"
+    assert "in fetch_report" in event["stack_trace"]
+
+    plugin.revert()
+    assert app.user_middleware == []
@@ -0,0 +1,30 @@
+import json
+
+from errlypy.internal.encoder import MAX_REPR_LENGTH, DataclassJsonEncoder, detach, safe_repr
+
+
+class BrokenRepr:
+    def __repr__(self) -> str:
+        raise RuntimeError("no repr")
+
+
+def test_values_without_json_form_are_encoded_as_repr():
+    encoded = json.loads(json.dumps({"broken": BrokenRepr(), "big": "x"}, cls=DataclassJsonEncoder))
+
+    assert encoded == {"broken": "<repr failed: RuntimeError>", "big": "x"}
+
+
+def test_safe_repr_is_capped():
+    assert len(safe_repr("x" * 5000)) == MAX_REPR_LENGTH + 3
+
+
+def test_detach_copies_cycles_and_odd_keys():
+    cycle: list = [1]
+    cycle.append(cycle)
+    value = {(1, 2): {"items": cycle}, "set": {3}}
+
+    detached = detach(value)
+
+    assert detached["(1, 2)"]["items"][0] == 1
+    assert detached["set"] == [3]
+    json.dumps(detached)
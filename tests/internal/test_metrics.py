@@ -0,0 +1,140 @@
+import os
+import threading
+from typing import Optional
+
+import pytest
+
+from errlypy.client.worker import BatchWorker
+from errlypy.internal.metrics import MetricsRegistry, metric_name, registry, to_prometheus
+from errlypy.lib import Errly
+from errlypy.models.ingest import IngestEvent
+from tests.conftest import RecordingClient
+
+
+def test_counters_are_merged_across_threads():
+    metrics = MetricsRegistry()
+
+    def work():
+        for _ in range(1000):
+            metrics.inc("events")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    metrics.inc("events", 5)
+
+    assert metrics.snapshot()["counters"] == {"events": 8005}
+    # Finished threads are folded into the retired shard on read
+    assert len(metrics._shards) == 1
+    assert metrics.snapshot()["counters"] == {"events": 8005}
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 0.5, 5.0):
+        metrics.observe("latency", value)
+
+    histogram = metrics.snapshot()["histograms"]["latency"]
+    assert histogram["count"] == 4
+    assert histogram["sum"] == 6.05
+    assert histogram["buckets"] == {"0.1": 1, "1.0": 3, "+Inf": 4}
+
+
+def test_gauges_are_read_on_snapshot():
+    metrics = MetricsRegistry()
+    depth = [3]
+    read = lambda: depth[0]  # noqa: E731
+    metrics.register_gauge("queue_depth", read)
+
+    assert metrics.snapshot()["gauges"] == {"queue_depth": 3}
+    depth[0] = 7
+    assert metrics.snapshot()["gauges"] == {"queue_depth": 7}
+
+    metrics.unregister_gauge("queue_depth", read)
+    assert metrics.snapshot()["gauges"] == {}
+
+
+def test_collectors_run_before_snapshot():
+    metrics = MetricsRegistry()
+    pending = [0.1, 0.2]
+
+    def collect() -> None:
+        while pending:
+            metrics.observe("pause", pending.pop())
+
+    metrics.register_collector(collect)
+    assert metrics.snapshot()["histograms"]["pause"]["count"] == 2
+
+    metrics.unregister_collector(collect)
+    pending.append(0.3)
+    assert metrics.snapshot()["histograms"]["pause"]["count"] == 2
+
+
+def test_prometheus_export():
+    metrics = MetricsRegistry(buckets=(0.5,))
+    metrics.inc(metric_name("events_dropped", reason="queue_full"), 2)
+    metrics.observe("send_seconds", 0.25)
+    metrics.register_gauge("queue_depth", lambda: 1)
+
+    assert to_prometheus(metrics.snapshot()).splitlines() == [
+        "# TYPE errlypy_events_dropped_total counter",
+        'errlypy_events_dropped_total{reason="queue_full"} 2',
+        "# TYPE errlypy_queue_depth gauge",
+        "errlypy_queue_depth 1",
+        "# TYPE errlypy_send_seconds histogram",
+        'errlypy_send_seconds_bucket{le="0.5"} 1',
+        'errlypy_send_seconds_bucket{le="+Inf"} 1',
+        "errlypy_send_seconds_sum 0.25",
+        "errlypy_send_seconds_count 1",
+    ]
+
+
+def test_worker_reports_into_stats():
+    registry.reset()
+    worker = BatchWorker(RecordingClient(), max_queue_size=1)
+
+    assert worker.submit(lambda: IngestEvent(message="first", environment="testing"))
+    assert worker.flush(timeout=5)
+    assert "queue_depth" in Errly.stats()["gauges"]
+    assert worker.close(timeout=5)
+    assert not worker.submit(lambda: None)
+
+    stats = Errly.stats()
+    assert stats["counters"]["events_queued"] == 1
+    assert stats["counters"]["events_sent"] == 1
+    assert stats["counters"]['events_dropped{reason="closed"}'] == 1
+    assert stats["histograms"]["event_build_seconds"]["count"] == 1
+    assert "queue_depth" not in stats["gauges"]
+    assert "errlypy_events_sent_total 1" in Errly.prometheus_metrics()
+
+
+class FailingClient(RecordingClient):
+    def post(self, url, data) -> Optional[str]:
+        return None
+
+
+def test_undelivered_events_are_counted_as_failed():
+    registry.reset()
+    worker = BatchWorker(FailingClient())
+
+    assert worker.submit(lambda: IngestEvent(message="lost", environment="testing"))
+    assert worker.close(timeout=5)
+
+    counters = Errly.stats()["counters"]
+    assert counters["events_failed"] == 1
+    assert "events_sent" not in counters
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork_child_gets_a_fresh_lock():
+    with registry._lock:
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if not registry._lock.locked() else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,99 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.cases import build_cases
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.exception.callback import CreateExceptionCallbackMeta, ExceptionCallbackImpl
+from errlypy.internal.wire import (
+    BINARY_CONTENT_TYPE,
+    WIRE_FORMATS,
+    WireFormatError,
+    decode_binary,
+    encode_binary,
+    encode_json,
+)
+from errlypy.models.ingest import ErrorLevel, IngestEvent, IngestRequest
+
+
+def full_event() -> IngestEvent:
+    return IngestEvent(
+        message="naïve — ünïcode ✓",
+        environment="testing",
+        level=ErrorLevel.WARNING,
+        stack_trace='  File "app.py", line 1, in <module>',
+        release_version="1.2.3",
+        user_id="42",
+        user_email="",
+        user_ip="127.0.0.1",
+        browser="curl",
+        os="linux",
+        url="http://localhost/path?q=1",
+        tags={"logger": "app", "empty": ""},
+        extra={"frame_count": 3, "nested": {"list": [1, "two", None]}},
+        timestamp=datetime(2024, 2, 29, 23, 59, 59, 999999),
+        event_id="0123456789abcdef",
+    )
+
+
+@pytest.mark.parametrize(
+    "events",
+    [
+        [],
+        [IngestEvent(message="", environment="")],
+        [full_event()],
+        [full_event(), IngestEvent(message="second", environment="testing", timestamp=None)],
+        [IngestEvent(message="x", environment="e", level=level) for level in ErrorLevel],
+    ],
+)
+def test_round_trip(events):
+    request = IngestRequest(events=events)
+
+    assert decode_binary(encode_binary(request)) == request
+
+
+def test_round_trip_of_captured_exceptions():
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+    callback = ExceptionCallbackImpl.create({}, CreateExceptionCallbackMeta())
+    events = [
+        http_client._transform_to_ingest_event(callback(*exc_info))
+        for exc_info in build_cases().values()
+    ]
+    request = IngestRequest(events=events)
+
+    encoded = encode_binary(request)
+    assert decode_binary(encoded) == request
+    assert len(encoded) < len(encode_json(request))
+
+
+def test_aware_timestamps_are_sent_in_utc():
+    timestamp = datetime(2024, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))
+    request = IngestRequest(events=[IngestEvent(message="", environment="", timestamp=timestamp)])
+
+    (event,) = decode_binary(encode_binary(request)).events
+    assert event.timestamp == datetime(2024, 1, 1, 10)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"",
+        b"JSON" + encode_binary(IngestRequest(events=[]))[4:],
+        encode_binary(IngestRequest(events=[]))[:4] + b"\x02" + b"\x00" * 4,
+        encode_binary(IngestRequest(events=[full_event()]))[:-1],
+    ],
+)
+def test_invalid_payloads_are_rejected(payload):
+    with pytest.raises(WireFormatError):
+        decode_binary(payload)
+
+
+def test_wire_formats_are_selected_by_name():
+    request = IngestRequest(events=[full_event()])
+
+    assert WIRE_FORMATS["binary"][0] == BINARY_CONTENT_TYPE
+    assert json.loads(WIRE_FORMATS["json"][1](request))["events"][0]["message"] == (
+        full_event().message
+    )
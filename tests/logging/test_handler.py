@@ -0,0 +1,141 @@
+import gc
+import logging
+import threading
+import weakref
+from typing import Optional
+
+import pytest
+
+from errlypy.client import HTTPClient
+from errlypy.logging.handler import ErrlyLoggingHandler
+from errlypy.models.ingest import ErrorLevel
+from tests.conftest import RecordingClient
+
+
+class LoggingClient(RecordingClient):
+    def post(self, url, data) -> Optional[str]:
+        # Transports log from the worker thread; this must not feed back into Errly
+        logging.getLogger("tests.transport").error("posting %s", url)
+        return super().post(url, data)
+
+
+@pytest.fixture
+def client():
+    return LoggingClient()
+
+
+@pytest.fixture
+def test_logger(client, request):
+    handler = ErrlyLoggingHandler(HTTPClient(client=client), level=logging.WARNING)
+    logger = logging.getLogger("tests.logging.handler")
+    logger.propagate = False
+    logger.addHandler(handler)
+    request.addfinalizer(lambda: logger.removeHandler(handler))
+    logging.getLogger("tests.transport").addHandler(handler)
+    request.addfinalizer(lambda: logging.getLogger("tests.transport").removeHandler(handler))
+
+    return logger, handler
+
+
+def sent_events(client: RecordingClient):
+    return [event for request in client.requests for event in request.events]
+
+
+def test_handler_maps_levels(client, test_logger):
+    logger, handler = test_logger
+
+    logger.warning("disk %s", "almost full")
+    logger.critical("disk full")
+    assert handler._http_client.flush(timeout=5)
+
+    # Errors may overtake the warning in the worker queue
+    events = {event.message: event for event in sent_events(client)}
+    assert events["disk almost full"].level == ErrorLevel.WARNING
+    assert events["disk full"].level == ErrorLevel.ERROR
+    assert events["disk full"].tags["logger"] == "tests.logging.handler"
+
+
+def test_handler_rejects_filtered_level_before_building(client, test_logger, monkeypatch):
+    logger, handler = test_logger
+    submitted = []
+    monkeypatch.setattr(handler._http_client, "submit", submitted.append)
+
+    record = logger.makeRecord(logger.name, logging.INFO, __file__, 1, "ignored", (), None)
+
+    assert handler.handle(record) is False
+    assert submitted == []
+
+
+def test_handler_builds_event_off_thread(client, test_logger, monkeypatch):
+    logger, handler = test_logger
+    build_threads = []
+    original_build = handler._build_event
+
+    def build(record):
+        build_threads.append(threading.current_thread())
+        return original_build(record)
+
+    monkeypatch.setattr(handler, "_build_event", build)
+
+    try:
+        raise ValueError("broken")
+    except ValueError:
+        logger.exception("handled failure")
+
+    assert handler._http_client.flush(timeout=5)
+
+    assert build_threads and threading.current_thread() not in build_threads
+    (event,) = sent_events(client)
+    assert event.message == "handled failure"
+    assert event.extra["exception"] == "broken"
+    assert "raise ValueError" in event.stack_trace
+
+
+def test_handler_ignores_own_and_transport_records(client, test_logger):
+    logger, handler = test_logger
+
+    logging.getLogger("errlypy.client.urllib").addHandler(handler)
+    try:
+        logging.getLogger("errlypy.client.urllib").error("transport failure")
+        logger.error("first")
+        assert handler._http_client.flush(timeout=5)
+        logger.error("second")
+        assert handler._http_client.flush(timeout=5)
+    finally:
+        logging.getLogger("errlypy.client.urllib").removeHandler(handler)
+
+    assert [event.message for event in sent_events(client)] == ["first", "second"]
+
+
+class Payload:
+    pass
+
+
+def test_handler_does_not_keep_traceback_while_queued(client, test_logger):
+    logger, handler = test_logger
+    client.release = threading.Event()
+    client.post = lambda url, data: (client.release.wait(), client.requests.append(data))
+
+    def fail(payload):
+        raise ValueError("boom")
+
+    def log_failure(payload):
+        try:
+            fail(payload)
+        except ValueError:
+            logger.exception("failed with %r", payload)
+
+    payload = Payload()
+    payload_ref = weakref.ref(payload)
+    log_failure(payload)
+    del payload
+    gc.collect()
+
+    # The event is still queued, but the frames and arguments are gone
+    assert payload_ref() is None
+
+    client.release.set()
+    assert handler._http_client.flush(timeout=5)
+    (event,) = sent_events(client)
+    assert event.message.startswith("failed with <")
+    assert "fail" in event.stack_trace
@@ -8,9 +8,7 @@ from pact.matchers import EachLike, Like, Term  # type: ignore
 
 from errlypy.client.urllib import URLLibClient
 from errlypy.models.ingest import ErrorLevel, IngestEvent, IngestRequest
-
-# Test API key constant
-TEST_API_KEY = "errly_test_0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef"
+from tests.conftest import TEST_API_KEY
 
 # Pact setup
 pact = Consumer("ErrlyPythonSDK").has_pact_with(
@@ -0,0 +1,73 @@
+from benchmarks import capture, django_queries, gcpause, profiler, runner, wire
+
+
+def test_capture_benchmarks_run():
+    benchmarks = capture.build_benchmarks()
+
+    assert {name.split(".")[0] for name in benchmarks} == {
+        "callback",
+        "stack_extract",
+        "transform",
+        "encode",
+        "pipeline",
+    }
+    for operation in benchmarks.values():
+        operation()
+
+
+def test_wire_benchmarks_run():
+    benchmarks = wire.build_benchmarks()
+
+    assert {name.split(".")[0] for name in benchmarks} == {
+        "encode_json",
+        "encode_binary",
+        "decode_json",
+        "decode_binary",
+    }
+    for operation in benchmarks.values():
+        operation()
+
+    for sizes in wire.payload_sizes().values():
+        assert sizes["binary"] < sizes["json"]
+
+
+def test_profiler_benchmarks_run():
+    benchmarks = profiler.build_benchmarks()
+
+    assert {name.split(".")[0] for name in benchmarks} == {"sample"}
+    for operation in benchmarks.values():
+        operation()
+
+
+def test_gc_benchmarks_run():
+    benchmarks = gcpause.build_benchmarks()
+
+    assert {name.split(".")[0] for name in benchmarks} == {"callback", "attach"}
+    for operation in benchmarks.values():
+        operation()
+
+
+def test_django_query_benchmarks_run():
+    benchmarks = django_queries.build_benchmarks()
+
+    assert {name.split(".")[0] for name in benchmarks} == {"normalize", "request"}
+    for operation in benchmarks.values():
+        operation()
+
+
+def test_compare_flags_regressions():
+    def document(**medians):
+        return {"benchmarks": {name: {"median_us": value} for name, value in medians.items()}}
+
+    rows = runner.compare(
+        document(stable=10.0, slower=15.0, faster=5.0, added=1.0),
+        document(stable=10.5, slower=10.0, faster=10.0),
+        threshold=0.1,
+    )
+
+    assert {row["name"]: row["status"] for row in rows} == {
+        "stable": "same",
+        "slower": "slower",
+        "faster": "faster",
+        "added": "new",
+    }
@@ -0,0 +1,95 @@
+import gc
+import threading
+from datetime import datetime, timedelta
+from typing import Iterator
+
+import pytest
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.gcmonitor import GCMonitor
+from errlypy.internal.metrics import registry
+from errlypy.models.ingest import IngestEvent
+
+
+@pytest.fixture
+def http_client() -> Iterator[HTTPClient]:
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+    yield http_client
+    http_client.close(timeout=5)
+
+
+@pytest.fixture
+def monitor(http_client) -> Iterator[GCMonitor]:
+    monitor = GCMonitor(http_client)
+    monitor.start()
+    yield monitor
+    monitor.stop()
+
+
+def flushed_events(http_client: HTTPClient):
+    assert http_client.flush(timeout=5)
+    assert isinstance(http_client.transport, DryRunClient)
+    return http_client.transport.events()
+
+
+def test_collections_are_timed_per_generation(monitor):
+    registry.reset()
+    gc.collect(2)
+
+    histograms = registry.snapshot()["histograms"]
+    assert histograms['gc_pause{generation="2"}']["count"] >= 1
+    assert any(entry[1] == 2 for entry in monitor.recent(until=datetime.now().timestamp()))
+
+
+def test_events_get_recent_collections(monitor, http_client):
+    gc.collect(2)
+    http_client.submit(lambda: IngestEvent(message="timeout", environment="testing"))
+
+    (event,) = flushed_events(http_client)
+    context = event["extra"]["gc"]
+    assert context["collections"]["2"] >= 1
+    assert context["pause_max"] <= context["pause_total"]
+    latest = context["recent"][0]
+    assert latest["ago"] >= 0
+    assert {"generation", "pause", "collected"} <= set(latest)
+
+
+def test_collections_outside_the_window_are_left_out(monitor, http_client):
+    gc.collect(2)
+    earlier = datetime.now() - timedelta(seconds=monitor.window + 1)
+
+    def build():
+        return IngestEvent(message="timeout", environment="testing", timestamp=earlier)
+
+    http_client.submit(build)
+
+    (event,) = flushed_events(http_client)
+    assert "gc" not in event["extra"]
+
+
+def test_stop_removes_the_callback(http_client):
+    monitor = GCMonitor(http_client)
+    monitor.start()
+    monitor.start()
+    monitor.stop()
+
+    assert monitor._callback not in gc.callbacks
+    gc.collect(2)
+    assert monitor.recent(until=datetime.now().timestamp()) == []
+
+
+def test_collection_under_the_registry_lock_does_not_deadlock(monitor):
+    # As when a thread's first metrics call is snapshot(), e.g. a /metrics
+    # handler, and a collection happens while it merges the shards
+    done = threading.Event()
+
+    def read_metrics() -> None:
+        with registry._lock:
+            gc.collect(0)
+        registry.snapshot()
+        done.set()
+
+    threading.Thread(target=read_metrics, daemon=True).start()
+    assert done.wait(5)
+    assert registry.snapshot()["histograms"]['gc_pause{generation="0"}']["count"] >= 1
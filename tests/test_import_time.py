@@ -0,0 +1,70 @@
+import subprocess
+import sys
+from typing import Dict
+
+from tests.conftest import TEST_API_KEY
+
+# About twice the usual import time, so slow CI machines pass, but importing
+# the transport (http.client, ssl) at module level again does not.
+IMPORT_BUDGET_US = 50_000
+LAZY_MODULES = ("django", "fastapi", "starlette", "aiohttp", "asyncio")
+# Imported by init or the calls that need them
+DEFERRED_MODULES = (
+    "http.client",
+    "ssl",
+    "errlypy.capture",
+    "errlypy.client",
+    "errlypy.aggregate",
+    "errlypy.profiler",
+    "errlypy.watchdog",
+    "errlypy.looplag",
+    "errlypy.gcmonitor",
+)
+
+
+def run_importtime(code: str) -> Dict[str, int]:
+    """Runs ``code`` under ``python -X importtime`` and returns cumulative us per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = int(cumulative)
+
+    return timings
+
+
+def test_import_does_not_load_frameworks():
+    timings = run_importtime("import errlypy.lib")
+
+    loaded = [name for name in timings if name.split(".")[0] in LAZY_MODULES]
+    assert loaded == []
+
+
+def test_import_defers_the_transport_and_monitors():
+    timings = run_importtime("import errlypy.lib")
+
+    assert [name for name in DEFERRED_MODULES if name in timings] == []
+
+
+def test_import_time_budget():
+    timings = run_importtime("import errlypy.lib")
+
+    assert timings["errlypy.lib"] < IMPORT_BUDGET_US
+
+
+def test_init_without_frameworks_does_not_load_them():
+    timings = run_importtime(
+        "from errlypy.lib import UninitializedModuleController;"
+        f"UninitializedModuleController.init(base_url='http://localhost', api_key='{TEST_API_KEY}')"
+    )
+
+    loaded = [name for name in timings if name.split(".")[0] in LAZY_MODULES]
+    assert loaded == []
@@ -0,0 +1,324 @@
+import asyncio
+import gc
+import logging
+import threading
+import time
+
+import pytest
+
+from errlypy.client import HTTPClient
+from errlypy.lib import Errly, ModuleController, UninitializedModuleController
+from errlypy.models.ingest import ErrorLevel
+from tests.conftest import TEST_API_KEY, RecordingClient
+
+
+@pytest.fixture
+def recording_client(monkeypatch):
+    client = RecordingClient()
+    monkeypatch.setattr(
+        "errlypy.client.UninitializedHTTPClient.setup",
+        lambda **kwargs: HTTPClient(client=client, environment=kwargs["environment"]),
+    )
+    return client
+
+
+@pytest.fixture
+def controller(recording_client, monkeypatch, request):
+    monkeypatch.setattr(threading, "excepthook", lambda args: None)
+
+    controller = UninitializedModuleController.init(
+        base_url="http://localhost",
+        api_key=TEST_API_KEY,
+        environment="testing",
+        logging_level=logging.ERROR,
+    )
+    request.addfinalizer(controller.revert)
+
+    assert isinstance(controller, ModuleController)
+    return controller
+
+
+def test_init_rejects_invalid_api_key():
+    with pytest.raises(ValueError):
+        UninitializedModuleController.init(base_url="http://localhost", api_key="test")
+
+
+def test_modules_publish_into_one_batch_stream(controller, recording_client):
+    def worker():
+        raise RuntimeError("thread failure")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    logging.getLogger("tests.lib").error("logged failure")
+
+    assert controller.flush(timeout=5)
+
+    (request,) = recording_client.requests
+    assert [event.message for event in request.events] == ["thread failure", "logged failure"]
+    assert {event.environment for event in request.events} == {"testing"}
+    assert request.events[0].level == ErrorLevel.ERROR
+
+
+def test_revert_detaches_modules(controller, recording_client):
+    controller.revert()
+
+    logging.getLogger("tests.lib").error("after revert")
+    assert controller.flush(timeout=5)
+
+    assert recording_client.requests == []
+
+
+def test_errly_close_flushes_and_detaches(recording_client, monkeypatch):
+    monkeypatch.setattr(Errly, "_module_controller", None)
+    Errly.init(url="http://localhost/", api_key=TEST_API_KEY, logging_level=logging.ERROR)
+
+    logging.getLogger("tests.lib").error("before close")
+    assert Errly.close(timeout=5)
+    logging.getLogger("tests.lib").error("after close")
+
+    assert Errly.flush(timeout=1)
+    assert [event.message for r in recording_client.requests for event in r.events] == [
+        "before close"
+    ]
+
+
+@pytest.fixture
+def errly(recording_client, monkeypatch):
+    monkeypatch.setattr(Errly, "_module_controller", None)
+    Errly.init(url="http://localhost/", api_key=TEST_API_KEY, logging_level=logging.ERROR)
+    yield
+    Errly.close(timeout=5)
+
+
+def test_capture_exception_queues_handled_exception(errly, recording_client):
+    def lookup():
+        raise KeyError("missing")
+
+    try:
+        lookup()
+    except KeyError:
+        event_id, delivered = Errly.capture_exception(
+            level=ErrorLevel.WARNING,
+            tags={"component": "cache"},
+            extra={"attempt": 2, "password": "hunter2"},
+            delivery=True,
+        )
+
+    assert delivered.result(timeout=5) is True
+
+    (event,) = [event for request in recording_client.requests for event in request.events]
+    assert event.event_id == event_id
+    assert event.message == "'missing'"
+    assert event.level == ErrorLevel.WARNING
+    assert event.tags["component"] == "cache"
+    assert event.tags["error_function"] == "lookup"
+    assert event.extra["attempt"] == 2
+    assert event.extra["password"] == "[Filtered]"
+
+
+def test_capture_message_returns_event_id_immediately(errly, recording_client):
+    extra = {"user": "alice"}
+    event_id = Errly.capture_message("cache miss", extra=extra)
+    extra["user"] = "bob"
+
+    assert isinstance(event_id, str)
+    assert Errly.flush(timeout=5)
+
+    (event,) = [event for request in recording_client.requests for event in request.events]
+    assert (event.event_id, event.message, event.level) == (event_id, "cache miss", ErrorLevel.INFO)
+    assert event.extra == {"user": "alice"}
+
+
+def test_capture_without_init_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(Errly, "_module_controller", None)
+
+    assert Errly.capture_exception(ValueError("ignored")) is None
+    event_id, delivered = Errly.capture_message("ignored", delivery=True)
+    assert event_id is None
+    assert delivered.result(timeout=0) is False
+
+
+def test_aggregate_sends_one_sample_per_fingerprint(errly, recording_client):
+    def validate(record: int) -> None:
+        if record % 50 == 0:
+            raise ValueError(f"invalid record {record}")
+        if record % 7 == 0:
+            raise TypeError(f"bad type in {record}")
+
+    with Errly.aggregate(tags={"job": "etl"}) as errors:
+        for record in range(1, 1001):
+            try:
+                validate(record)
+            except (ValueError, TypeError) as exc:
+                errors.capture_exception(exc)
+
+    assert Errly.flush(timeout=5)
+
+    events = [event for request in recording_client.requests for event in request.events]
+    summaries = {event.message: event.extra["aggregate"] for event in events}
+    assert set(summaries) == {"invalid record 50", "bad type in 7"}
+    assert summaries["invalid record 50"]["count"] == 20
+    assert summaries["bad type in 7"]["count"] == 140
+    assert summaries["bad type in 7"]["first_seen"] <= summaries["bad type in 7"]["last_seen"]
+    assert {event.tags["job"] for event in events} == {"etl"}
+    assert {event.tags["error_function"] for event in events} == {"validate"}
+
+
+def test_aggregate_bounds_the_number_of_fingerprints(errly, recording_client):
+    exceptions = []
+    for exc_type in (KeyError, ValueError, TypeError, IndexError, LookupError):
+        try:
+            raise exc_type("invalid")
+        except Exception as exc:
+            exceptions.append(exc)
+
+    aggregator = Errly.aggregate(max_fingerprints=2)
+    aggregator.capture_many(exceptions + exceptions)
+    assert len(aggregator._groups) == 2
+    assert len(aggregator.flush()) == 2
+    assert aggregator._groups == {}
+
+    assert Errly.flush(timeout=5)
+    events = [event for request in recording_client.requests for event in request.events]
+    assert [event.extra["aggregate"]["count"] for event in events] == [2, 2]
+    assert events[0].extra["aggregate"]["ungrouped"] == 6
+
+
+def test_capture_many(errly, recording_client):
+    exceptions = [ValueError(index) for index in range(3)]
+
+    (event_id,) = Errly.capture_many(exceptions)
+    assert Errly.flush(timeout=5)
+
+    (event,) = [event for request in recording_client.requests for event in request.events]
+    assert event.event_id == event_id
+    assert event.extra["aggregate"]["count"] == 3
+
+
+def test_dry_mode_records_events_instead_of_sending(monkeypatch):
+    monkeypatch.setattr(Errly, "_module_controller", None)
+    Errly.init(url="http://unreachable.invalid", api_key=TEST_API_KEY, dry_mode=True)
+    try:
+        Errly.capture_message("contact alice@example.com", extra={"api_key": "abc"})
+        assert Errly.flush(timeout=5)
+
+        (event,) = Errly.captured_events()
+        assert event["message"] == "contact [Filtered]"
+        assert event["extra"] == {"api_key": "[Filtered]"}
+        assert event["level"] == "info"
+    finally:
+        Errly.close(timeout=5)
+
+    assert Errly.captured_events() == []
+
+
+def test_nested_extra_and_tags_are_scrubbed(monkeypatch):
+    monkeypatch.setattr(Errly, "_module_controller", None)
+    Errly.init(url="http://unreachable.invalid", api_key=TEST_API_KEY, dry_mode=True)
+    try:
+        Errly.capture_message(
+            "login failed",
+            tags={"user": "alice@example.com", "auth_token": "abc"},
+            extra={"user": {"password": "p"}, "attempts": [{"secret": "s"}]},
+        )
+        assert Errly.flush(timeout=5)
+
+        (event,) = Errly.captured_events()
+        assert event["tags"]["user"] == "[Filtered]"
+        assert event["tags"]["auth_token"] == "[Filtered]"
+        assert event["extra"] == {
+            "user": {"password": "[Filtered]"},
+            "attempts": [{"secret": "[Filtered]"}],
+        }
+    finally:
+        Errly.close(timeout=5)
+
+
+def test_unserializable_extra_does_not_lose_the_batch(monkeypatch):
+    monkeypatch.setattr(Errly, "_module_controller", None)
+    Errly.init(url="http://unreachable.invalid", api_key=TEST_API_KEY, dry_mode=True)
+    try:
+        nested = {"ids": [1, 2]}
+        Errly.capture_message("first", extra={"obj": object(), "nested": nested, 3: "three"})
+        nested["ids"].append(3)
+        Errly.capture_message("second")
+        assert Errly.flush(timeout=5)
+
+        first, second = Errly.captured_events()
+        assert first["extra"]["obj"].startswith("<object object at")
+        assert first["extra"]["nested"] == {"ids": [1, 2]}
+        assert first["extra"]["3"] == "three"
+        assert second["message"] == "second"
+    finally:
+        Errly.close(timeout=5)
+
+
+def test_profiler_runs_while_initialized(monkeypatch):
+    monkeypatch.setattr(Errly, "_module_controller", None)
+    Errly.init(
+        url="http://unreachable.invalid", api_key=TEST_API_KEY, dry_mode=True, profile_interval=0.01
+    )
+    controller = Errly._module_controller
+    assert isinstance(controller, ModuleController)
+    profiler = controller.profiler
+    assert profiler is not None
+    try:
+        while not profiler.hot_stacks():
+            time.sleep(0.01)
+        Errly.capture_message("pool exhausted")
+        assert Errly.flush(timeout=5)
+
+        (event,) = Errly.captured_events()
+        assert event["extra"]["hot_stacks"]
+    finally:
+        Errly.close(timeout=5)
+
+    assert "profiler_overhead" not in Errly.stats()["gauges"]
+
+
+def test_loops_started_after_init_can_be_registered(monkeypatch):
+    monkeypatch.setattr(Errly, "_module_controller", None)
+    Errly.init(url="http://unreachable.invalid", api_key=TEST_API_KEY, dry_mode=True)
+
+    async def background_job():
+        raise KeyError("missing")
+
+    async def main():
+        Errly.register_loop()
+        loop = asyncio.get_running_loop()
+        loop.create_task(background_job())
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        gc.collect()
+
+    try:
+        asyncio.run(main())
+        assert Errly.flush(timeout=5)
+        (event,) = Errly.captured_events()
+        assert event["message"] == "'missing'"
+    finally:
+        Errly.close(timeout=5)
+
+
+def test_init_again_replaces_the_previous_setup(recording_client, monkeypatch):
+    monkeypatch.setattr(Errly, "_module_controller", None)
+    root_handlers = list(logging.getLogger().handlers)
+    Errly.init(url="http://localhost/", api_key=TEST_API_KEY, logging_level=logging.ERROR)
+    first = Errly._module_controller
+    assert isinstance(first, ModuleController)
+    logging.getLogger("tests.lib").error("before init again")
+    worker_thread = first.http_client._worker._thread
+    Errly.init(url="http://localhost/", api_key=TEST_API_KEY, logging_level=logging.ERROR)
+    try:
+        assert worker_thread is not None and not worker_thread.is_alive()
+        assert len(logging.getLogger().handlers) == len(root_handlers) + 1
+
+        logging.getLogger("tests.lib").error("logged once")
+        assert Errly.flush(timeout=5)
+        messages = [event.message for r in recording_client.requests for event in r.events]
+        assert messages == ["before init again", "logged once"]
+    finally:
+        Errly.close(timeout=5)
+
+    assert logging.getLogger().handlers == root_handlers
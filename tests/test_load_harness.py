@@ -0,0 +1,59 @@
+import json
+import urllib.request
+from urllib.error import HTTPError
+
+import pytest
+
+from benchmarks.load.harness import LoadConfig, run_scenario
+from benchmarks.load.stub_server import Faults, StubIngestServer
+
+
+@pytest.fixture
+def stub_server(request):
+    faults = getattr(request, "param", Faults())
+    server = StubIngestServer(faults).start()
+    yield server
+    server.stop()
+
+
+def post(url: str, events: int) -> int:
+    body = json.dumps({"events": [{"message": "m"}] * events}).encode()
+    request = urllib.request.Request(f"{url}/api/v1/ingest", data=body, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except HTTPError as exc:
+        return exc.code
+
+
+def test_stub_server_counts_events(stub_server):
+    assert post(stub_server.url, 3) == 200
+    assert post(stub_server.url, 2) == 200
+
+    assert stub_server.snapshot() == {"requests": 2, "events": 5, "errors": 0, "resets": 0}
+
+
+@pytest.mark.parametrize("stub_server", [Faults(error_rate=1.0)], indirect=True)
+def test_stub_server_injects_errors(stub_server):
+    assert post(stub_server.url, 1) == 503
+    assert stub_server.snapshot()["events"] == 0
+
+
+@pytest.mark.parametrize("stub_server", [Faults(reset_rate=1.0)], indirect=True)
+def test_stub_server_injects_resets(stub_server):
+    with pytest.raises(OSError):
+        post(stub_server.url, 1)
+
+    assert stub_server.snapshot()["resets"] == 1
+
+
+def test_fastapi_scenario_delivers_every_event():
+    report = run_scenario(
+        "fastapi",
+        LoadConfig(requests=40, concurrency=4, error_rate=0.25, warmup=2, flush_timeout=10),
+        Faults(),
+    )
+
+    assert report["events"]["captured"] > 0
+    assert report["events"]["delivered"] == report["events"]["captured"]
+    assert report["errlypy"]["requests"] == 40
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from errlypy import looplag
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.looplag import LoopLagMonitor
+
+
+@pytest.fixture
+def http_client() -> Iterator[HTTPClient]:
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+    yield http_client
+    http_client.close(timeout=5)
+
+
+@pytest.fixture
+def monitor(http_client) -> Iterator[LoopLagMonitor]:
+    monitor = LoopLagMonitor(http_client, threshold=0.05, interval=0.01)
+    monitor.start()
+    yield monitor
+    monitor.stop(timeout=5)
+
+
+def flushed_events(http_client: HTTPClient):
+    assert http_client.flush(timeout=5)
+    assert isinstance(http_client.transport, DryRunClient)
+    return http_client.transport.events()
+
+
+def block_loop() -> None:
+    time.sleep(0.25)
+
+
+@pytest.mark.asyncio
+async def test_blocking_stack_is_reported_once(monitor, http_client):
+    monitor.watch(asyncio.get_running_loop())
+    await asyncio.sleep(0.05)
+
+    for _ in range(2):
+        block_loop()
+        await asyncio.sleep(0.05)
+
+    (stall,) = flushed_events(http_client)
+    assert stall["level"] == "warning"
+    assert stall["tags"]["loop_stall"] == "true"
+    assert stall["extra"]["blocked"] >= 0.05
+    assert "in test_blocking_stack_is_reported_once" in stall["stack_trace"]
+    # time.sleep is a builtin, the blocking function is the innermost frame
+    assert stall["tags"]["error_function"] == "block_loop"
+
+    assert monitor.percentiles()["max"] >= 0.2
+    monitor.report()
+    report = flushed_events(http_client)[-1]
+    assert report["tags"]["loop_lag"] == "true"
+    lag = report["extra"]["loop_lag"]
+    assert lag["stalls"] == 2
+    assert lag["distinct_stalls"] == 1
+    assert lag["p50"] <= lag["p99"] <= lag["max"]
+
+    # A new window reports the same stack again
+    block_loop()
+    await asyncio.sleep(0.05)
+    assert len(flushed_events(http_client)) == 3
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_is_not_reported(monitor, http_client):
+    monitor.watch(asyncio.get_running_loop())
+    monitor.watch(asyncio.get_running_loop())
+    await asyncio.sleep(0.2)
+
+    assert flushed_events(http_client) == []
+    assert monitor.percentiles()["samples"] >= 5
+    assert monitor.percentiles()["p50"] < 0.05
+
+
+def test_closed_loops_are_forgotten(http_client):
+    monitor = LoopLagMonitor(http_client, threshold=0.05, interval=0.01)
+    loop = asyncio.new_event_loop()
+    monitor.watch(loop)
+    loop.run_until_complete(asyncio.sleep(0.05))
+    loop.close()
+
+    assert monitor.check() == 0
+    assert monitor._loops == {}
+    assert monitor.report() is not None
+
+
+def test_stalls_past_the_fingerprint_table_are_only_counted(http_client, monkeypatch):
+    monkeypatch.setattr(looplag, "_MAX_FINGERPRINTS", 1)
+    monitor = LoopLagMonitor(http_client, threshold=0.05, interval=0.01)
+    monitor._window.lags.append(0.2)
+
+    def first_stack():
+        return monitor._stalled(threading.get_ident(), 0.2)
+
+    def second_stack():
+        return monitor._stalled(threading.get_ident(), 0.2)
+
+    assert first_stack() == 1
+    assert [second_stack() for _ in range(3)] == [0, 0, 0]
+    assert len(flushed_events(http_client)) == 1
+
+    monitor.report()
+    lag = flushed_events(http_client)[-1]["extra"]["loop_lag"]
+    assert (lag["stalls"], lag["distinct_stalls"], lag["other_stalls"]) == (4, 1, 3)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork_child_gets_a_fresh_monitor(http_client):
+    monitor = LoopLagMonitor(http_client, threshold=0.05, interval=0.01)
+    loop = asyncio.new_event_loop()
+    monitor.watch(loop)
+    monitor.start()
+    try:
+        with monitor._lock:
+            pid = os.fork()
+            if pid == 0:
+                thread = monitor._thread
+                ok = (
+                    thread is not None
+                    and thread.is_alive()
+                    and monitor._loops == {}
+                    and not monitor._lock.locked()
+                )
+                os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+    finally:
+        monitor.stop(timeout=5)
+        loop.close()
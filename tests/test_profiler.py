@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from typing import Callable, Iterator
+
+import pytest
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.models.ingest import IngestEvent
+from errlypy.profiler import SamplingProfiler
+
+
+def park(depth: int, ready: threading.Event, release: threading.Event) -> None:
+    if depth:
+        park(depth - 1, ready, release)
+        return
+
+    ready.set()
+    release.wait()
+
+
+@pytest.fixture
+def parked() -> Iterator[Callable[[int], None]]:
+    """Returns a function that parks a thread ``depth`` calls deep in ``park``."""
+    release = threading.Event()
+    threads = []
+
+    def start(depth: int) -> None:
+        ready = threading.Event()
+        thread = threading.Thread(target=park, args=(depth, ready, release))
+        thread.start()
+        threads.append(thread)
+        ready.wait()
+
+    yield start
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.fixture
+def http_client() -> Iterator[HTTPClient]:
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+    yield http_client
+    http_client.close(timeout=5)
+
+
+def flushed_events(http_client: HTTPClient):
+    assert http_client.flush(timeout=5)
+    assert isinstance(http_client.transport, DryRunClient)
+    return http_client.transport.events()
+
+
+def parked_stacks(profiler: SamplingProfiler):
+    return [
+        entry
+        for entry in profiler.hot_stacks(top=100)
+        if any(" in park" in frame for frame in entry["stack"])
+    ]
+
+
+def test_recursion_depths_add_up_to_one_stack(http_client, parked):
+    parked(20)
+    parked(30)
+    profiler = SamplingProfiler(http_client)
+
+    profiler.sample()
+    profiler.sample()
+
+    (stack,) = parked_stacks(profiler)
+    assert stack["count"] == 4
+    assert "[recursion]" in stack["stack"]
+    # The innermost frame is kept although it is in the standard library
+    assert "threading.py" in stack["stack"][-1]
+
+
+def test_deep_stacks_are_cut_in_the_middle(http_client, parked):
+    parked(3)
+    profiler = SamplingProfiler(http_client, max_depth=4)
+
+    profiler.sample()
+
+    (stack,) = parked_stacks(profiler)
+    assert "[frames omitted]" in stack["stack"]
+
+
+def test_table_is_bounded(http_client, parked):
+    parked(1)
+    profiler = SamplingProfiler(http_client, max_stacks=1)
+
+    profiler.sample()
+    profiler.report()
+
+    (profile,) = [event["extra"]["profile"] for event in flushed_events(http_client)]
+    assert profile["samples"] == 1
+    assert len(profile["stacks"]) == 1
+    assert profile["other"] >= 1
+
+
+def test_errlypy_threads_are_not_sampled(http_client):
+    http_client.submit(lambda: None)
+    profiler = SamplingProfiler(http_client)
+
+    profiler.sample()
+
+    stacks = [frame for entry in profiler.hot_stacks(top=100) for frame in entry["stack"]]
+    assert not any("errlypy/client/worker.py" in frame for frame in stacks)
+
+
+def test_events_get_hot_stacks_and_reports_do_not(http_client, parked):
+    parked(5)
+    profiler = SamplingProfiler(http_client, interval=0.005)
+    profiler.start()
+    try:
+        while profiler.hot_stacks() == []:
+            time.sleep(0.005)
+        http_client.submit(lambda: IngestEvent(message="timeout", environment="testing"))
+        profiler.report()
+    finally:
+        profiler.stop(timeout=5)
+
+    error, report = flushed_events(http_client)
+    assert error["message"] == "timeout"
+    assert any(
+        " in park" in frame for entry in error["extra"]["hot_stacks"] for frame in entry["stack"]
+    )
+    assert report["tags"]["profile"] == "true"
+    assert "hot_stacks" not in report["extra"]
+
+    # Stopped profilers don't add anything
+    http_client.submit(lambda: IngestEvent(message="later", environment="testing"))
+    assert "hot_stacks" not in flushed_events(http_client)[-1]["extra"]
+
+
+def test_interval_backs_off_when_sampling_is_too_costly(http_client):
+    profiler = SamplingProfiler(http_client, interval=0.001, max_overhead=1e-9)
+    profiler.start()
+    try:
+        while profiler.interval == 0.001:
+            time.sleep(0.001)
+    finally:
+        profiler.stop(timeout=5)
+
+    assert profiler.interval >= 0.002
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork_child_samples_its_own_threads(http_client, parked):
+    parked(3)
+    profiler = SamplingProfiler(http_client, interval=0.01)
+    profiler.start()
+    try:
+        profiler.sample()
+        assert parked_stacks(profiler)
+
+        with profiler._lock:
+            pid = os.fork()
+            if pid == 0:
+                thread = profiler._thread
+                ok = (
+                    not profiler._lock.locked()
+                    and not parked_stacks(profiler)
+                    and thread is not None
+                    and thread.is_alive()
+                )
+                os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+    finally:
+        profiler.stop(timeout=5)
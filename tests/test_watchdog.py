@@ -0,0 +1,136 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from errlypy.client import HTTPClient
+from errlypy.client.dry import DryRunClient
+from errlypy.watchdog import RequestWatchdog
+
+
+@pytest.fixture
+def http_client() -> Iterator[HTTPClient]:
+    http_client = HTTPClient(client=DryRunClient(), environment="testing")
+    yield http_client
+    http_client.close(timeout=5)
+
+
+def flushed_events(http_client: HTTPClient):
+    assert http_client.flush(timeout=5)
+    assert isinstance(http_client.transport, DryRunClient)
+    return http_client.transport.events()
+
+
+def handle_stuck_request(watchdog: RequestWatchdog, started: threading.Event, release) -> None:
+    token = watchdog.begin("GET /stuck")
+    started.set()
+    release.wait()
+    watchdog.end(token)
+
+
+def test_slow_request_is_reported_once_with_its_stack(http_client):
+    watchdog = RequestWatchdog(http_client, threshold=0.01)
+    started, release = threading.Event(), threading.Event()
+    thread = threading.Thread(target=handle_stuck_request, args=(watchdog, started, release))
+    thread.start()
+    started.wait()
+    try:
+        time.sleep(0.02)
+        assert watchdog.check() == 1
+        assert watchdog.check() == 0
+    finally:
+        release.set()
+        thread.join()
+
+    (event,) = flushed_events(http_client)
+    assert event["level"] == "warning"
+    assert event["message"].startswith("Slow request: GET /stuck has been running for")
+    assert event["tags"]["route"] == "GET /stuck"
+    assert event["extra"]["elapsed"] >= 0.01
+    assert "in handle_stuck_request" in event["stack_trace"]
+    # The innermost frame is where the request waits, even in the standard library
+    assert event["tags"]["error_function"] == "wait"
+    assert watchdog.in_flight() == 0
+
+
+def test_requests_within_the_threshold_are_not_reported(http_client):
+    watchdog = RequestWatchdog(http_client, threshold=60)
+    tokens = [watchdog.begin(f"GET /{index}") for index in range(3)]
+
+    assert watchdog.check() == 0
+    watchdog.end(tokens[1])
+    assert watchdog.in_flight() == 2
+
+    for token in tokens:
+        watchdog.end(token)
+    assert watchdog.in_flight() == 0
+
+
+def test_async_requests_report_the_await_chain(http_client):
+    watchdog = RequestWatchdog(http_client, threshold=0.01)
+
+    async def query_database() -> None:
+        await asyncio.sleep(0.05)
+
+    async def handle_request() -> None:
+        token = watchdog.begin("GET /async", asyncio.current_task())
+        try:
+            await query_database()
+        finally:
+            watchdog.end(token)
+
+    async def main() -> None:
+        task = asyncio.ensure_future(handle_request())
+        await asyncio.sleep(0.02)
+        # Checked from another thread, like the watchdog thread does
+        await asyncio.get_running_loop().run_in_executor(None, watchdog.check)
+        await task
+
+    asyncio.run(main())
+
+    (event,) = flushed_events(http_client)
+    assert "in handle_request" in event["stack_trace"]
+    assert "in query_database" in event["stack_trace"]
+    assert event["tags"]["error_function"] == "sleep"
+
+
+def test_watchdog_thread_checks_periodically(http_client):
+    watchdog = RequestWatchdog(http_client, threshold=0.01, check_interval=0.005)
+    watchdog.start()
+    token = watchdog.begin("GET /stuck")
+    try:
+        while not flushed_events(http_client):
+            time.sleep(0.005)
+    finally:
+        watchdog.end(token)
+        watchdog.stop(timeout=5)
+
+    assert len(flushed_events(http_client)) == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork_child_gets_a_fresh_watchdog(http_client):
+    watchdog = RequestWatchdog(http_client, threshold=1)
+    watchdog.start()
+    try:
+        watchdog.begin("GET /in-parent")
+        with watchdog._lock:
+            pid = os.fork()
+            if pid == 0:
+                thread = watchdog._thread
+                # The lock must be free, or the child's first request would hang
+                ok = (
+                    thread is not None
+                    and thread.is_alive()
+                    and watchdog.in_flight() == 0
+                    and not watchdog._lock.locked()
+                )
+                os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+    finally:
+        watchdog.stop(timeout=5)